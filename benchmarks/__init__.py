@@ -0,0 +1,6 @@
+"""
+Reproducible, seeded microbenchmarks for the evolution loop.
+Run with ``python -m benchmarks``; results are emitted as JSON so runs can be compared over time.
+"""
+
+from .suite import BENCHMARKS, benchmark, run_benchmarks, compare_results
@@ -0,0 +1,47 @@
+"""
+Command line entry point: ``python -m benchmarks [-k NAME ...] [-o results.json] [--compare baseline.json]``.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.suite import BENCHMARKS, run_benchmarks, compare_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the NEAT microbenchmarks.")
+    parser.add_argument("-k", "--name", action="append", choices=sorted(BENCHMARKS),
+                        help="Benchmark to run (may be repeated; default: all)")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Repeats per benchmark (default: 5)")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("-o", "--output", help="Write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Slowdown fraction counted as a regression (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.name, repeat=args.repeat, seed=args.seed, log=lambda s: print(s, file=sys.stderr))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = 0
+        for c in compare_results(baseline, results, tolerance=args.tolerance):
+            flag = "REGRESSION" if c["regression"] else "ok"
+            print(f"{c['name']} {c['params']}: x{c['ratio']:.2f} {flag}", file=sys.stderr)
+            regressions += c["regression"]
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
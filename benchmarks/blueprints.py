@@ -0,0 +1,96 @@
+"""
+Blueprints and genome factories shared by the benchmarks.
+"""
+
+from dataclasses import replace
+import random
+
+from neat.blueprints import *
+from neat.model import Genome
+
+
+def make_blueprint(pop_size=150, num_inputs=2, num_outputs=1) -> GenerationalBP:
+    """ A blueprint matching the XOR example configuration. """
+    return GenerationalBP(
+
+        # Reproduction parameters
+        elitism = 2,
+        survival_threshold = 0.2,
+        min_species_size = 2,
+
+        # Population blueprint
+        population = PopulationBP(
+            pop_size = pop_size,
+
+            # Species blueprint
+            species = SpeciesBP(
+                compat_threshold_initial = 3.0,
+                compat_threshold_modifier = 0.1,
+                compat_threshold_min = 0.1,
+                target_num_species = 20,
+                species_fitness_func = "mean",
+                max_stagnation = 20,
+                species_elitism = 2,
+                reset_on_extinction = True,
+            ),
+
+            # Genome blueprint
+            genome = GenomeBP(
+                node = NodeBP(
+                    activation = StringBP(default="sigmoid", mutate_rate=0.0, options=["sigmoid"]),
+                    aggregation = StringBP(default="sum", mutate_rate=0.0, options=["sum"]),
+                    bias = FloatBP(init_mean=0.0, init_stdev=1.0, max_value=30.0, min_value=-30.0,
+                                   mutate_power=0.5, mutate_rate=0.7, replace_rate=0.1),
+                    response = FloatBP(init_mean=1.0, init_stdev=0.0, max_value=30.0, min_value=-30.0,
+                                       mutate_power=0.0, mutate_rate=0.0, replace_rate=0.0),
+                ),
+                conn = ConnBP(
+                    enabled = BoolBP(default=True, mutate_rate=0.01),
+                    weight = FloatBP(init_mean=0.0, init_stdev=1.0, max_value=30.0, min_value=-30.0,
+                                     mutate_power=0.5, mutate_rate=0.8, replace_rate=0.1),
+                ),
+                num_inputs = num_inputs,
+                num_outputs = num_outputs,
+                conn_add_prob = 0.5,
+                conn_delete_prob = 0.5,
+                node_add_prob = 0.2,
+                node_delete_prob = 0.2,
+                compatibility_disjoint_coefficient = 1.0,
+                compatibility_weight_coefficient = 0.5,
+                single_structural_mutation = False,
+                structural_mutation_surer = False,
+            ),
+        ),
+    )
+
+
+def grow_genome(genome_bp: GenomeBP, genome: Genome, hidden_nodes: int) -> Genome:
+    """ Grow a genome in place by structural mutations until it has at least the given number of hidden nodes. """
+    grower = replace(genome_bp, node_add_prob=1.0, conn_add_prob=1.0, node_delete_prob=0.0, conn_delete_prob=0.0)
+    num_pins = len(genome_bp.input_ids) + len(genome_bp.output_ids)
+    while len(genome.nodes) - num_pins < hidden_nodes:
+        grower.mutate(genome)
+    return genome
+
+
+def make_genomes(genome_bp: GenomeBP, n: int, hidden_nodes: int) -> 'list[Genome]':
+    """ Create n genomes grown to the given number of hidden nodes. """
+    return [grow_genome(genome_bp, genome_bp.create(), hidden_nodes) for _ in range(n)]
+
+
+XOR_INPUTS = ((0.0, 0.0), (0.0, 1.0), (1.0, 0.0), (1.0, 1.0))
+XOR_OUTPUTS = (0.0, 1.0, 1.0, 0.0)
+
+
+def xor_fitness_func(genome_bp: GenomeBP):
+    """ Return an XOR fitness function for agents of the given genome blueprint. """
+    from neat.nn import FeedForwardNetwork
+
+    def eval_fitness(agent):
+        brain = FeedForwardNetwork.create(agent.genome, genome_bp.input_ids, genome_bp.output_ids)
+        fitness = 4.0
+        for xi, xo in zip(XOR_INPUTS, XOR_OUTPUTS):
+            fitness -= (brain.activate(xi)[0] - xo) ** 2
+        return fitness
+
+    return eval_fitness
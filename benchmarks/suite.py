@@ -0,0 +1,395 @@
+"""
+Benchmark registry, runner and result comparison.
+"""
+
+from typing import *
+from dataclasses import replace
+import itertools
+import multiprocessing
+import platform
+import random
+import statistics
+import time
+
+import numpy as np
+
+from neat.model import Agent
+from neat.nn import FeedForwardNetwork, CompiledNetwork, BatchedNetwork
+from neat.nn.codegen import CodeCache
+from neat.nn.incremental import PhenotypePlan
+from neat.util.sharedmem import SharedMemoryEvaluator
+from neat.util.multiobjective import crowded_order
+from benchmarks.blueprints import make_blueprint, make_genomes, xor_fitness_func
+
+
+# --------------- REGISTRY ---------------
+
+BENCHMARKS = {}
+
+
+def benchmark(**param_grid):
+    """
+    Register a benchmark, run once for every combination of the given parameter values.
+    The decorated function receives the parameters as keyword arguments, does any (untimed) setup,
+    and returns (run, number): a zero-argument callable to be timed and the number of operations it performs.
+    It may return (run, number, teardown) instead, to release resources (e.g. processes) after timing.
+    """
+    def decorator(func):
+        BENCHMARKS[func.__name__] = (func, param_grid)
+        return func
+    return decorator
+
+
+GENOME_SIZES = (0, 10, 50)  # Hidden nodes
+POP_SIZES = (50, 150, 500)
+ACTIVATIONS = ("sigmoid", "tanh", "sin", "gauss", "identity")  # Options in tests/default.py
+AGGREGATIONS = ("sum", "product", "max", "min")
+
+
+# --------------- PHENOTYPES ---------------
+
+@benchmark(hidden_nodes=GENOME_SIZES)
+def nn_create(hidden_nodes):
+    bp = make_blueprint().population.genome
+    genomes = make_genomes(bp, 20, hidden_nodes)
+
+    def run():
+        for g in genomes:
+            FeedForwardNetwork.create(g, bp.input_ids, bp.output_ids)
+    return run, len(genomes)
+
+
+@benchmark(hidden_nodes=GENOME_SIZES)
+def nn_activate(hidden_nodes):
+    bp = make_blueprint(num_inputs=8, num_outputs=4).population.genome
+    net = FeedForwardNetwork.create(make_genomes(bp, 1, hidden_nodes)[0], bp.input_ids, bp.output_ids)
+    inputs = [[random.uniform(-1, 1) for _ in bp.input_ids] for _ in range(1000)]
+
+    def run():
+        for x in inputs:
+            net.activate(x)
+    return run, len(inputs)
+
+
+@benchmark(hidden_nodes=GENOME_SIZES, cached=(False, True))
+def nn_create_compiled(hidden_nodes, cached):
+    bp = make_blueprint().population.genome
+    genomes = make_genomes(bp, 20, hidden_nodes)
+    cache = None
+    if cached:
+        cache = CodeCache()
+        for g in genomes:
+            CompiledNetwork.create(g, bp.input_ids, bp.output_ids, cache=cache)
+
+    def run():
+        for g in genomes:
+            CompiledNetwork.create(g, bp.input_ids, bp.output_ids, cache=cache)
+    return run, len(genomes)
+
+
+@benchmark(hidden_nodes=GENOME_SIZES)
+def nn_activate_compiled(hidden_nodes):
+    bp = make_blueprint(num_inputs=8, num_outputs=4).population.genome
+    net = CompiledNetwork.create(make_genomes(bp, 1, hidden_nodes)[0], bp.input_ids, bp.output_ids, cache=None)
+    inputs = [[random.uniform(-1, 1) for _ in bp.input_ids] for _ in range(1000)]
+
+    def run():
+        for x in inputs:
+            net.activate(x)
+    return run, len(inputs)
+
+
+def _diversify(genomes, diversity):
+    """ Give the genomes' nodes random activations and aggregations out of the first diversity options. """
+    for g in genomes:
+        for n in g.nodes.values():
+            n.activation = random.choice(ACTIVATIONS[:diversity])
+            n.aggregation = random.choice(AGGREGATIONS[:diversity])
+    return genomes
+
+
+@benchmark(hidden_nodes=GENOME_SIZES, diversity=(1, 4), dtype=("float64", "float32"))
+def nn_activate_batched(hidden_nodes, diversity, dtype):
+    bp = make_blueprint(num_inputs=8, num_outputs=4).population.genome
+    genome = _diversify(make_genomes(bp, 1, hidden_nodes), diversity)[0]
+    net = BatchedNetwork.create(genome, bp.input_ids, bp.output_ids, dtype=dtype)
+    inputs = np.random.default_rng(0).uniform(-1, 1, (1000, len(bp.input_ids))).astype(dtype)
+
+    def run():
+        net.activate_batch(inputs)
+    return run, len(inputs)
+
+
+@benchmark(hidden_nodes=GENOME_SIZES, mutate_rate=(0.8, 0.1), derived=(False, True))
+def nn_create_incremental(hidden_nodes, mutate_rate, derived):
+    bp = make_blueprint().population.genome
+    bp.conn.weight.mutate_rate = bp.node.bias.mutate_rate = mutate_rate
+    parents = make_genomes(bp, 20, hidden_nodes)
+    plans = {g.id: PhenotypePlan.build(g, bp.input_ids, bp.output_ids) for g in parents}
+    bp.record_diffs = True
+    children = []
+    for _ in range(50):
+        a, b = random.choice(parents), random.choice(parents)
+        child = bp.crossover(a, b)
+        bp.mutate(child)
+        children.append(child)
+
+    def run():
+        for g in children:
+            if derived:
+                plans[g.diff.parent].derive(g, g.diff).network()
+            else:
+                PhenotypePlan.build(g, bp.input_ids, bp.output_ids).network()
+    return run, len(children)
+
+
+# --------------- GENOMES ---------------
+
+@benchmark(hidden_nodes=GENOME_SIZES)
+def genome_crossover(hidden_nodes):
+    bp = make_blueprint().population.genome
+    genomes = make_genomes(bp, 20, hidden_nodes)
+    pairs = [(random.choice(genomes), random.choice(genomes)) for _ in range(200)]
+
+    def run():
+        for a, b in pairs:
+            bp.crossover(a, b)
+    return run, len(pairs)
+
+
+@benchmark(hidden_nodes=GENOME_SIZES)
+def genome_mutate(hidden_nodes):
+    bp = make_blueprint().population.genome
+    genomes = make_genomes(bp, 200, hidden_nodes)
+
+    def run():
+        for g in genomes:
+            bp.mutate(g)
+    return run, len(genomes)
+
+
+@benchmark(hidden_nodes=GENOME_SIZES, mutate_rate=(0.8, 0.1), copy_on_write=(False, True))
+def genome_offspring(hidden_nodes, mutate_rate, copy_on_write):
+    bp = replace(make_blueprint().population.genome, copy_on_write=copy_on_write)
+    bp.conn.weight.mutate_rate = bp.node.bias.mutate_rate = mutate_rate
+    # Parents from one species: offspring of a common ancestor
+    ancestor = make_genomes(bp, 1, hidden_nodes)[0]
+    parents = []
+    for _ in range(10):
+        parents.append(bp.crossover(ancestor, ancestor))
+        bp.mutate(parents[-1])
+    pairs = [(random.choice(parents), random.choice(parents)) for _ in range(200)]
+
+    def run():
+        for a, b in pairs:
+            bp.mutate(bp.crossover(a, b))
+    return run, len(pairs)
+
+
+@benchmark(hidden_nodes=GENOME_SIZES, feed_forward=(False, True))
+def genome_add_conn(hidden_nodes, feed_forward):
+    bp = replace(make_blueprint().population.genome, feed_forward=feed_forward)
+    genomes = make_genomes(bp, 200, hidden_nodes)
+    # The add-connection mutation alone, without the parameter mutations of GenomeBP.mutate
+    add_conn = bp._GenomeBP__mutate_add_conn
+
+    def run():
+        for g in genomes:
+            add_conn(g)
+    return run, len(genomes)
+
+
+@benchmark(hidden_nodes=GENOME_SIZES, feed_forward=(False, True))
+def offspring_add_conn(hidden_nodes, feed_forward):
+    bp = replace(make_blueprint().population.genome, feed_forward=feed_forward)
+    # Parents that have been through mutation, as in a running simulation
+    parents = make_genomes(bp, 20, hidden_nodes)
+    for g in parents:
+        bp._GenomeBP__mutate_add_conn(g)
+    pairs = [(random.choice(parents), random.choice(parents)) for _ in range(200)]
+    add_conn = bp._GenomeBP__mutate_add_conn
+
+    def run():
+        for a, b in pairs:
+            add_conn(bp.crossover(a, b))
+    return run, len(pairs)
+
+
+@benchmark(hidden_nodes=GENOME_SIZES)
+def genome_distance(hidden_nodes):
+    bp = make_blueprint().population.genome
+    genomes = make_genomes(bp, 20, hidden_nodes)
+    pairs = [(random.choice(genomes), random.choice(genomes)) for _ in range(1000)]
+
+    def run():
+        for a, b in pairs:
+            bp.distance(a, b)
+    return run, len(pairs)
+
+
+# --------------- POPULATIONS ---------------
+
+def _evaluated_population(bp):
+    """ Create a population, evolve it for a couple of generations, and leave it evaluated. """
+    fitness_func = xor_fitness_func(bp.population.genome)
+    population = bp.population.create()
+    for _ in range(2):
+        bp.evaluate(population, fitness_func)
+        bp.next_generation(population)
+    bp.evaluate(population, fitness_func)
+    return population
+
+
+@benchmark(pop_size=POP_SIZES)
+def population_speciate(pop_size):
+    bp = make_blueprint(pop_size=pop_size)
+    population = _evaluated_population(bp)
+    bp.reproduce(population)
+
+    def run():
+        bp.population.speciate(population, new_mascots=True)
+    return run, 1
+
+
+@benchmark(pop_size=POP_SIZES)
+def generational_reproduce(pop_size):
+    bp = make_blueprint(pop_size=pop_size)
+    population = _evaluated_population(bp)
+
+    def run():
+        bp.reproduce(population)
+    return run, 1
+
+
+@benchmark(pop_size=(1000, 10000), num_objectives=(2, 3, 4))
+def pareto_sort(pop_size, num_objectives):
+    # Fitness-like continuous objective, then size- and depth-like integer ones
+    rng = np.random.default_rng(0)
+    columns = [rng.normal(size=pop_size), -rng.integers(3, 40, pop_size), -rng.integers(1, 6, pop_size),
+               rng.normal(size=pop_size)]
+    objectives = np.stack(columns[:num_objectives], axis=1).astype(np.float64)
+
+    def run():
+        crowded_order(objectives)
+    return run, 1
+
+
+@benchmark(pop_size=POP_SIZES, generations=(10,))
+def xor_end_to_end(pop_size, generations):
+    bp = make_blueprint(pop_size=pop_size)
+    fitness_func = xor_fitness_func(bp.population.genome)
+    population = bp.population.create()
+
+    def run():
+        for _ in range(generations):
+            bp.evaluate(population, fitness_func)
+            bp.next_generation(population)
+    return run, generations
+
+
+# --------------- PARALLEL EVALUATION ---------------
+
+def _genome_size(agent) -> float:
+    """ A trivial fitness function, so that evaluation benchmarks time the dispatch only. """
+    return float(len(agent.genome.nodes) + len(agent.genome.conns))
+
+
+def _population_agents(hidden_nodes, pop_size=200):
+    bp = make_blueprint().population.genome
+    return bp, [Agent(genome=g) for g in make_genomes(bp, pop_size, hidden_nodes)]
+
+
+@benchmark(hidden_nodes=GENOME_SIZES)
+def evaluate_pickled(hidden_nodes):
+    _, agents = _population_agents(hidden_nodes)
+    pool = multiprocessing.Pool(2)
+    pool.map(_genome_size, agents[:2])  # Warm up the workers
+
+    def run():
+        for agent, fitness in zip(agents, pool.map(_genome_size, agents, chunksize=25)):
+            agent.fitness = fitness
+    return run, len(agents), pool.terminate
+
+
+@benchmark(hidden_nodes=GENOME_SIZES)
+def evaluate_shared_memory(hidden_nodes):
+    bp, agents = _population_agents(hidden_nodes)
+    evaluator = SharedMemoryEvaluator(bp, num_workers=2, chunk_size=25)
+    evaluator.evaluate(agents[:2], _genome_size)  # Warm up the workers
+
+    def run():
+        evaluator.evaluate(agents, _genome_size)
+    return run, len(agents), evaluator.close
+
+
+# --------------- RUNNER ---------------
+
+def run_benchmarks(names: 'Iterable[str]' = None, repeat: int = 5, seed: int = 0, log=None) -> dict:
+    """
+    Run the selected benchmarks (all by default) and return a JSON-able results dict.
+    Every repeat re-runs the setup from the same seed, so repeats and separate runs time identical work.
+    """
+    results = []
+    for name in (names or BENCHMARKS):
+        func, param_grid = BENCHMARKS[name]
+        keys = list(param_grid)
+        for values in itertools.product(*(param_grid[k] for k in keys)):
+            params = dict(zip(keys, values))
+            times = []
+            for _ in range(repeat):
+                random.seed(seed)
+                run, number, *teardown = func(**params)
+                start = time.perf_counter()
+                run()
+                times.append((time.perf_counter() - start) / number)
+                for t in teardown:
+                    t()
+
+            result = {
+                "name": name,
+                "params": params,
+                "repeat": repeat,
+                "min": min(times),
+                "median": statistics.median(times),
+            }
+            results.append(result)
+            if log is not None:
+                log(f"{name} {params}: {result['min'] * 1e6:.1f} us/op (median {result['median'] * 1e6:.1f})")
+
+    return {
+        "meta": {
+            "time": time.time(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def _key(result: dict) -> str:
+    return result["name"] + repr(sorted(result["params"].items()))
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float = 0.1) -> 'list[dict]':
+    """
+    Compare two results dicts by best (min) time per operation.
+    Returns one entry per benchmark present in both, flagged as a regression if slower by more than tolerance.
+    """
+    base = {_key(r): r for r in baseline["results"]}
+    comparisons = []
+    for r in current["results"]:
+        b = base.get(_key(r))
+        if b is None:
+            continue
+        ratio = r["min"] / b["min"] if b["min"] > 0 else float("inf")
+        comparisons.append({
+            "name": r["name"],
+            "params": r["params"],
+            "baseline": b["min"],
+            "current": r["min"],
+            "ratio": ratio,
+            "regression": ratio > 1.0 + tolerance,
+        })
+    return comparisons
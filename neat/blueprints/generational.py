@@ -2,13 +2,18 @@
 Defines blueprint for a generational NEAT simulation.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import random
 from typing import *
 import math
 
 from neat.model import *
 from neat.blueprints.population import PopulationBP
+from neat.util.checkpoint import save_checkpoint
+from neat.util.evaluation import Evaluator, SERIAL_EVALUATOR
+from neat.util.multiobjective import objective_matrix, crowded_order
+from neat.util.instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from neat.util.reporting import Reporter, ReporterSet, NULL_REPORTER
 
 
 # --------------- SIMULATION CONFIGURABLES ---------------
@@ -29,19 +34,60 @@ class GenerationalBP:
     survival_threshold: float  # The fraction of members for each species allowed to reproduce each generation
     min_species_size: int  # The minimum number of genomes per species after reproduction
 
+    instrumentation: Instrumentation = field(default=NULL_INSTRUMENTATION, init=False, repr=False)
+    reporter: Reporter = field(default=NULL_REPORTER, init=False, repr=False)
+    evaluator: Evaluator = field(default=SERIAL_EVALUATOR, init=False, repr=False)
+    objectives: 'list[Callable[[Agent], float]]' = field(default=None, init=False, repr=False)
+
+    def set_instrumentation(self, instrumentation: Instrumentation):
+        """ Record per-phase timings and counters of this simulation to the given instrumentation. """
+        self.instrumentation = instrumentation
+        self.population.instrumentation = instrumentation
+        self.population.genome.instrumentation = instrumentation
+
+    def add_reporter(self, reporter: Reporter):
+        """ Report simulation events to the given reporter, in addition to any already added. """
+        if self.reporter is NULL_REPORTER:
+            self.reporter = ReporterSet()
+            self.population.reporter = self.reporter
+        self.reporter.add(reporter)
+
+    def set_evaluator(self, evaluator: Evaluator):
+        """ Assign fitnesses with the given evaluator (e.g. a DistributedEvaluator) instead of serially. """
+        self.evaluator = evaluator
+
+    def set_objectives(self, objectives: 'list[Callable[[Agent], float]]'):
+        """
+        Select elites and parents within each species by Pareto front and crowding distance over the given
+        objectives (each maximized, e.g. neat.util.multiobjective.fitness_objective and size_objective)
+        instead of by fitness alone. Species' offspring counts are still proportional to fitness.
+        """
+        self.objectives = list(objectives) if objectives else None
+
+    def rank_members(self, species: Species) -> 'list[Agent]':
+        """ Return the species' members best first: by fitness, or in crowded order over the objectives. """
+        members = list(species.members.values())
+        if self.objectives is None:
+            return sorted(members, reverse=True, key=lambda a: a.fitness)
+        return [members[i] for i in crowded_order(objective_matrix(members, self.objectives)).tolist()]
+
     def evaluate(self, population: Population, fitness_func):
         """ Evaluate the fitness of all agents in the population. """
+        self.instrumentation.begin(population.ticks)
+        self.reporter.start_generation(population)
         
         # Evaluate agents and assign fitness scores
-        fittest, least_fit = None, None
-        for agent in population.agents.values():
-            agent.fitness = fitness_func(agent)
-
-            # Keep track of max and min fitness
-            if fittest is None or agent.fitness > fittest.fitness:
-                fittest = agent
-            if least_fit is None or agent.fitness < least_fit.fitness:
-                least_fit = agent
+        with self.instrumentation.phase("evaluate"):
+            self.evaluator.evaluate(list(population.agents.values()), fitness_func)
+
+            fittest, least_fit = None, None
+            for agent in population.agents.values():
+                # Keep track of max and min fitness
+                if fittest is None or agent.fitness > fittest.fitness:
+                    fittest = agent
+                if least_fit is None or agent.fitness < least_fit.fitness:
+                    least_fit = agent
+        self.instrumentation.count("evaluations", len(population.agents))
         
         population.fittest = fittest
         population.least_fit = least_fit
@@ -49,11 +95,14 @@ class GenerationalBP:
         # Compute species' adjusted fitnesses
         # Do not allow the fitness range to be zero, as we divide by it below.
         # TODO: The ``1.0`` below is rather arbitrary, and should be configurable.
-        fitness_range = max(1.0, fittest.fitness - least_fit.fitness)
-        for species in population.species.values():
-            msf = sum(species.get_fitnesses()) / species.size()
-            af = (msf - least_fit.fitness) / fitness_range
-            species.adjusted_fitness = af
+        with self.instrumentation.phase("adjusted_fitness"):
+            fitness_range = max(1.0, fittest.fitness - least_fit.fitness)
+            for species in population.species.values():
+                msf = sum(species.get_fitnesses()) / species.size()
+                af = (msf - least_fit.fitness) / fitness_range
+                species.adjusted_fitness = af
+
+        self.reporter.post_evaluate(population)
 
     def compute_spawn(self, population: Population):
         """
@@ -107,9 +156,8 @@ class GenerationalBP:
             species = population.species[sid]
             assert spawn > 0
 
-            # Sort members in order of descending fitness.
-            old_members = species.members
-            species.members.sort(reverse=True, key=lambda a: a.fitness)
+            # Sort members best first (in order of descending fitness, unless selecting on multiple objectives).
+            old_members = self.rank_members(species)
 
             # Transfer elites to new generation.
             if self.elitism > 0:
@@ -125,6 +173,8 @@ class GenerationalBP:
             # Use at least two parents no matter what the threshold fraction result is.
             repro_cutoff = max(repro_cutoff, 2)
             old_members = old_members[:repro_cutoff]
+            if self.objectives is not None:
+                position = {m: i for i, m in enumerate(old_members)}
 
             # Randomly choose parents and produce the number of offspring allotted to the species.
             while spawn > 0:
@@ -133,8 +183,9 @@ class GenerationalBP:
                 parent1 = random.choice(old_members)
                 parent2 = random.choice(old_members)
 
-                # Parent 1 must be fitter parent
-                if parent1.fitness < parent2.fitness:
+                # Parent 1 must be fitter parent (earlier in the crowded order, with multiple objectives)
+                if (parent1.fitness < parent2.fitness if self.objectives is None
+                        else position[parent1] > position[parent2]):
                     parent2, parent1 = parent1, parent2
 
                 # Note that if the parents are not distinct, crossover will produce a
@@ -143,7 +194,7 @@ class GenerationalBP:
                 self.population.genome.mutate(new_genome)
                 next_gen_agents[new_genome.id] = Agent(genome=new_genome)
 
-                population.ancestors[new_genome.id] = (parent1.genome.id, parent2.genome.id)
+                population.lineage.record(new_genome.id, parent1.genome.id, parent2.genome.id, population.ticks)
         
         # Replace old agents with new agents
         population.agents = next_gen_agents
@@ -179,33 +230,69 @@ class GenerationalBP:
 
     def next_generation(self, population: Population):
         """ Create the next generation of agents and their species. """
+        instrumentation = self.instrumentation
+        instrumentation.begin(population.ticks)
 
         # Stagnation step
-        self.population.check_stagnation(population)
+        with instrumentation.phase("stagnation"):
+            self.population.check_stagnation(population)
 
         # Check for complete extinction
         if len(population.species) == 0:
             if self.population.species.reset_on_extinction:
                 self.population.reset(population)
-                print("Reset on total extinction")
+                instrumentation.count("extinctions")
+                self.reporter.extinction(population)
             else:
                 raise TotalExtinctionException()
         
         # Reproduce next generation
-        self.reproduce(population)
+        with instrumentation.phase("reproduction"):
+            self.reproduce(population)
+        with instrumentation.phase("lineage"):
+            population.lineage.maintain(population.agents.keys())
         
         # Adjust dynamic compatibility threshold
-        self.population.adjust_compat_threshold(population)
+        with instrumentation.phase("compat_threshold"):
+            self.population.adjust_compat_threshold(population)
 
         # Speciate agents, assigning new mascots to existing species
-        self.population.speciate(population, new_mascots=True)
+        with instrumentation.phase("speciation"):
+            self.population.speciate(population, new_mascots=True)
         
+        self.reporter.end_generation(population, instrumentation.end())
         population.ticks += 1
     
-    def run(self, population: Population, fitness_func=None, max_generations=20000, fitness_threshold=None):
-        """ Run a generational NEAT simulation. """
+    def run(self, population: Population, fitness_func=None, max_generations=20000, fitness_threshold=None,
+            checkpoint_path=None, checkpoint_frequency=1, hall_of_fame=None, run_db=None, profiler=None):
+        """
+        Run a generational NEAT simulation.
+        If checkpoint_path is given, the population is checkpointed there every checkpoint_frequency generations.
+        If hall_of_fame is given (e.g. a GenomeArchive), the fittest genome of every generation is appended to it.
+        If run_db is given (a RunDatabase), the stats of every evaluated generation are recorded to it.
+        If profiler is given (an EvolutionProfiler), every generation is profiled, split into fitness and framework time.
+        """
+        if profiler is not None:
+            assert self.evaluator.in_process, "Profiling requires an evaluator that calls fitness_func in this process"
+            fitness_func = profiler.wrap_fitness(fitness_func)
+
         g = 1
-        while g <= max_generations and (fitness_threshold is None or population.fittest.fitness < fitness_threshold):
-            self.evaluate(population, fitness_func=fitness_func)
-            self.next_generation(population)
-            g += 1
+        try:
+            while g <= max_generations and (fitness_threshold is None or population.fittest is None or population.fittest.fitness < fitness_threshold):
+                if profiler is not None:
+                    profiler.start_generation(population.ticks)
+                self.evaluate(population, fitness_func=fitness_func)
+                if hall_of_fame is not None:
+                    hall_of_fame.append(population.fittest.genome, population.ticks, population.fittest.fitness)
+                if run_db is not None:
+                    run_db.record(population)
+                self.next_generation(population)
+                if profiler is not None:
+                    profiler.end_generation(population.ticks - 1)
+                if checkpoint_path is not None and population.ticks % checkpoint_frequency == 0:
+                    save_checkpoint(checkpoint_path, self.population, population)
+                g += 1
+        finally:
+            # Don't lose the generations profiled since the last periodic dump
+            if profiler is not None:
+                profiler.close()
@@ -2,12 +2,88 @@
 Defines blueprints for configuration and functions applied to node and connection genes, plus counter for node id's.
 """
 
-from itertools import count
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import *
 
 from neat.model import Gene, NodeGene, ConnGene
-from neat.blueprints.primitives import Blueprint, FloatBP, BoolBP, StringBP
+from neat.blueprints.primitives import Blueprint, IdCounter, FloatBP, BoolBP, StringBP
+
+
+# --------------- GENE OPERATORS ---------------
+
+class _GeneOps:
+    """
+    The operators of a gene blueprint class, compiled once per class to straight-line functions over its
+    configurable attributes, so that no call reflects over annotations or builds kwargs dicts.
+    The functions take the blueprint as first argument and look up its attribute blueprints on every call,
+    so these may still be replaced on an instance.
+    """
+
+    def __init__(self, bp_class: type):
+        self.primary_keys = tuple(bp_class.__primary_keys__)
+        # Configurable attributes are the annotated attributes holding blueprints, inherited ones included
+        annotations = {}
+        for cls in reversed(bp_class.__mro__):
+            annotations.update(cls.__dict__.get("__annotations__", {}))
+        self.configs = tuple(k for k, t in annotations.items() if isinstance(t, type) and issubclass(t, Blueprint))
+
+        namespace = {"C": bp_class.__constructor__}
+        exec(self.__generate_source(), namespace)
+        for name in ("create", "mutate", "mutated", "copy", "crossover", "inherit", "distance"):
+            setattr(self, name, namespace[name])
+
+    def __generate_source(self) -> str:
+        keys, configs = self.primary_keys, self.configs
+        homologous = " and ".join(f"a.{k} == b.{k}" for k in keys) or "True"
+
+        def construct(key_source: str, values: 'Iterable[str]') -> str:
+            args = [f"{k}={key_source}.{k}" for k in keys] + [f"{k}={v}" for k, v in zip(configs, values)]
+            return f"C({', '.join(args)})"
+
+        lines = ["def create(self, kwargs):"]
+        lines += [f"    if {k!r} not in kwargs: kwargs[{k!r}] = self.{k}.create()" for k in configs]
+        lines += ["    return C(**kwargs)", ""]
+
+        lines += ["def mutate(self, gene):", "    changed = False"]
+        for k in configs:
+            lines += [f"    v = gene.{k}",
+                      f"    if (new := self.{k}.mutate(v)) != v:",
+                      f"        gene.{k} = new",
+                      f"        changed = True"]
+        lines += ["    return changed", ""]
+
+        lines.append("def mutated(self, gene):")
+        lines += [f"    v{i} = gene.{k}; n{i} = self.{k}.mutate(v{i})" for i, k in enumerate(configs)]
+        unchanged = " and ".join(f"n{i} == v{i}" for i in range(len(configs))) or "True"
+        lines += [f"    if {unchanged}:",
+                  f"        return gene",
+                  f"    return {construct('gene', (f'self.{k}.copy(v{i}) if n{i} == v{i} else n{i}' for i, k in enumerate(configs)))}",
+                  ""]
+
+        lines += ["def copy(self, gene):",
+                  f"    return {construct('gene', (f'self.{k}.copy(gene.{k})' for k in configs))}", ""]
+
+        lines += ["def crossover(self, a, b):",
+                  f"    assert {homologous}, 'You can only crossover matching/homologous genes'",
+                  f"    return {construct('a', (f'self.{k}.crossover(a.{k}, b.{k})' for k in configs))}", ""]
+
+        lines += ["def inherit(self, a, b):",
+                  "    if a is b:",
+                  "        return a",
+                  f"    assert {homologous}, 'You can only crossover matching/homologous genes'"]
+        lines += [f"    v{i} = self.{k}.crossover(a.{k}, b.{k})" for i, k in enumerate(configs)]
+        for parent in ("a", "b"):
+            same = " and ".join(f"v{i} == {parent}.{k}" for i, k in enumerate(configs)) or "True"
+            lines += [f"    if {same}:", f"        return {parent}"]
+        lines += [f"    return {construct('a', (f'v{i}' for i in range(len(configs))))}", ""]
+
+        lines += ["def distance(self, a, b):",
+                  f"    assert {homologous}, 'You can only find distance between matching/homologous genes'",
+                  f"    return {' + '.join(f'self.{k}.distance(a.{k}, b.{k})' for k in configs) or '0'}", ""]
+        return "\n".join(lines)
+
+
+_GENE_OPS: 'dict[type, _GeneOps]' = {}
 
 
 # --------------- GENE CONFIGURABLES ---------------
@@ -17,66 +93,84 @@ class GeneBP(Blueprint):
     
     __constructor__ = None
     __primary_keys__ = ()
+
+    def __ops(self) -> _GeneOps:
+        """ The compiled operators of this blueprint's class. """
+        ops = _GENE_OPS.get(type(self))
+        if ops is None:
+            ops = _GENE_OPS[type(self)] = _GeneOps(type(self))
+        return ops
     
-    def __are_homologous(self, a: Gene, b: Gene) -> bool:
-        return all(getattr(a, k) == getattr(b, k) for k in self.__primary_keys__)
-
-    def __iter_configs(self) -> Iterator[Tuple[str, Blueprint]]:
-        """ Iterate over all configurable attributes of this gene. """
-        for k, t in self.__annotations__.items():
-            if issubclass(t, Blueprint):
-                yield k, getattr(self, k)
-    
+    def get_configs(self) -> 'list[Tuple[str, Blueprint]]':
+        """ Return (attribute name, blueprint) pairs for all configurable attributes of this gene. """
+        return [(k, getattr(self, k)) for k in self.__ops().configs]
+
     def create(self, **kwargs) -> Gene:
         """
         Create a new gene with the given attributes.
         Pre-condition: all primary keys are specified
         """
         assert all(k in kwargs for k in self.__primary_keys__), "You can only create a gene with all primary keys specified"
-
-        for k, cfg in self.__iter_configs():
-            if k not in kwargs:
-                kwargs[k] = cfg.create()
-        
+        return self.__ops().create(self, kwargs)
+
+    def mutate(self, gene: Gene) -> bool:
+        """ Mutate a gene by mutating each of its configurable attribute. Returns whether any attribute changed. """
+        return self.__ops().mutate(self, gene)
+
+    def mutated(self, gene: Gene) -> Gene:
+        """ Like mutate, but returns the gene itself if unchanged and a mutated copy otherwise, never modifying it. """
+        if type(self).mutate is not GeneBP.mutate:
+            # Respect subclasses customizing mutate, at the cost of always copying
+            gene = self.copy(gene)
+            self.mutate(gene)
+            return gene
+        return self.__ops().mutated(self, gene)
+
+    def replace(self, gene: Gene, **changes) -> Gene:
+        """ Return a copy of a gene with the given attributes changed. """
+        if type(self).copy is not GeneBP.copy:
+            # Respect subclasses customizing copy
+            gene = self.copy(gene)
+            for k, v in changes.items():
+                setattr(gene, k, v)
+            return gene
+        ops = self.__ops()
+        kwargs = {k: getattr(gene, k) for k in ops.primary_keys}
+        for k in ops.configs:
+            kwargs[k] = changes[k] if k in changes else getattr(self, k).copy(getattr(gene, k))
         return self.__constructor__(**kwargs)
 
-    def mutate(self, gene: Gene):
-        """ Mutate a gene by mutating each of its configurable attribute. """
-        for k, cfg in self.__iter_configs():
-            v = getattr(gene, k)
-            setattr(gene, k, cfg.mutate(v))
-
     def copy(self, gene: Gene) -> Gene:
         """ Copy a gene by copying each of its configurable attribute. """
-        kwargs = {k: getattr(gene, k) for k in self.__primary_keys__}
-        for k, cfg in self.__iter_configs():
-            kwargs[k] = cfg.copy(getattr(gene, k))
-        return self.__constructor__(**kwargs)
+        return self.__ops().copy(self, gene)
 
     def crossover(self, a: Gene, b: Gene) -> Gene:
         """ 
         Create a new gene randomly inheriting attributes from its parents. 
         Pre-condition: a and b are homologous
         """
-        assert self.__are_homologous(a, b), "You can only crossover matching/homologous genes"
+        return self.__ops().crossover(self, a, b)
 
-        kwargs = {k: getattr(a, k) for k in self.__primary_keys__}
-        for k, cfg in self.__iter_configs():
-            kwargs[k] = cfg.crossover(getattr(a, k), getattr(b, k))
-        return self.__constructor__(**kwargs)
+    def inherit(self, a: Gene, b: Gene) -> Gene:
+        """
+        Like crossover, but returns a parent itself if the child would be identical to it, for genomes sharing genes.
+        Pre-condition: a and b are homologous
+        """
+        if type(self).crossover is not GeneBP.crossover:
+            # Respect subclasses customizing crossover, at the cost of never sharing
+            return self.crossover(a, b)
+        return self.__ops().inherit(self, a, b)
 
     def distance(self, a: Gene, b: Gene) -> float:
         """
         Calculate the genomic distance between two genes. 
         Pre-condition: a and b are homologous
         """
-        assert self.__are_homologous(a, b), "You can only find distance between matching/homologous genes"
-
-        return sum(cfg.distance(getattr(a, k), getattr(b, k)) for k, cfg in self.__iter_configs())
+        return self.__ops().distance(self, a, b)
 
 
 @dataclass
-class NodeBP(GeneBP):
+class NodeBP(GeneBP, IdCounter):
     """ Blueprint for node genes. """
 
     __constructor__ = NodeGene
@@ -87,13 +181,11 @@ class NodeBP(GeneBP):
     activation: StringBP
     aggregation: StringBP
 
-    __id_counter: count = field(default_factory=count)
-
     def create(self, **kwargs) -> NodeGene:
         """ Create a new node gene with the given attributes. """
 
         if "id" not in kwargs:
-            kwargs["id"] = next(self.__id_counter)
+            kwargs["id"] = self.new_id()
         
         return super().create(**kwargs)
 
@@ -3,21 +3,27 @@ Defines blueprint for configuration and functions applied to genomes, plus count
 Holds methods for creating, mutating, copying, crossover, and calculating genomic distance.
 """
 
-from itertools import count
 from dataclasses import dataclass, field
 import random
 from typing import *
 import itertools
 
 from neat.model import *
-from neat.blueprints.primitives import Blueprint
+from neat.blueprints.primitives import Blueprint, IdCounter
 from neat.blueprints.genes import GeneBP, NodeBP, ConnBP
+from neat.util.instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from neat.nn.graphs import ancestors, feed_forward_layers
 
 
 # --------------- GENOME CONFIGURABLES ---------------
 
+# With copy_on_write, offspring share their parents' genes unless a moving average (with this smoothing factor)
+# of the fraction of genes mutation changes is above the threshold: then nearly every shared gene would be
+# replaced right away, and copying genes up front is faster
+_CHANGE_RATE_SMOOTHING = 0.1
+_MAX_SHARED_CHANGE_RATE = 0.5
 @dataclass
-class GenomeBP(Blueprint):
+class GenomeBP(Blueprint, IdCounter):
     """ Contains genome configuration and counters for a simulation """
 
     __constructor__ = Genome
@@ -44,15 +50,34 @@ class GenomeBP(Blueprint):
     compatibility_disjoint_coefficient: float # c2, takes the place of both c1 and c2
     compatibility_weight_coefficient: float  # c3
 
-    # Genome ID counter and input/output node IDs
-    __id_counter: count = field(default_factory=count)
+    # Genome hygiene
+    prune_unexpressed_after: int = None  # If set, delete genes left unexpressed for this many generations
+
+    # Network topology
+    feed_forward: bool = False  # If enabled, structural mutations never create cycles (self-connections included)
+
+    # Phenotypes
+    record_diffs: bool = False  # If enabled, offspring record how their genes differ from their fitter parent's
+
+    # Memory
+    # If enabled, offspring share the genes they inherit unchanged, which are then never modified in place.
+    # While mutation changes most genes anyway, sharing would only add work, so offspring copy their genes instead
+    copy_on_write: bool = False
+
+    __change_rate: float = field(default=0.0, init=False, repr=False)  # Moving average fraction of genes mutation changes
+
+    # Input/output node IDs
     input_ids: list = field(init=False)
     output_ids: list = field(init=False)
+    instrumentation: Instrumentation = field(default=NULL_INSTRUMENTATION, init=False, repr=False)
 
     def __post_init__(self):
         # By convention, input pins have negative keys, and the output pins have keys 0,1,...
         self.input_ids = [-i - 1 for i in range(self.num_inputs)]
         self.output_ids = [i for i in range(self.num_outputs)]
+        # Hidden node ids come from the node counter, so it must start past the output ids
+        if self.node.get_next_id() < self.num_outputs:
+            self.node.set_next_id(self.num_outputs)
 
     def create(self, **kwargs) -> Genome:
         """ 
@@ -61,7 +86,8 @@ class GenomeBP(Blueprint):
         """
 
         if "id" not in kwargs:
-            kwargs["id"] = next(self.__id_counter)
+            kwargs["id"] = self.new_id()
+        self.instrumentation.count("genomes_created")
         
         # Create input and output nodes
         if "nodes" not in kwargs:
@@ -73,65 +99,98 @@ class GenomeBP(Blueprint):
                 
         return Genome(**kwargs)
 
+    @staticmethod
+    def __modify(genome: Genome, genes: 'dict[Any, Gene]', key, gene_bp: GeneBP, **changes):
+        """ Change attributes of a gene, replacing it rather than modifying it if it may be shared. """
+        if genome.shared:
+            genes[key] = gene_bp.replace(genes[key], **changes)
+        else:
+            for k, v in changes.items():
+                setattr(genes[key], k, v)
+
+    @staticmethod
+    def __record(genome: Genome, nodes=(), conns=()):
+        """ Record changed gene keys in the genome's diff, if it keeps one (see neat.nn.incremental). """
+        if genome.diff is not None:
+            genome.diff.nodes.update(nodes)
+            genome.diff.conns.update(conns)
+
     def __mutate_add_node(self, genome: Genome):
         """
         Attempt to add a new node by splitting a connection.
         Surer: if no connections are available, add a connection.
+        Returns whether the genome was changed.
         """
         if not genome.conns:
             # Mutation FAIL if there are no connections to split
             # Alternative mutation: add connection instead of node
             if self.structural_mutation_surer:
                 return self.__mutate_add_conn(genome)
-            return
+            return False
 
         # Mutation SUCCESS
         (i, o), conn_to_split = random.choice(list(genome.conns.items()))
-        conn_to_split.enabled = False
+        self.__modify(genome, genome.conns, (i, o), self.conn, enabled=False)
 
         node = self.node.create()
         genome.nodes[node.id] = node
         genome.conns[(i, node.id)] = self.conn.create(in_node=i, out_node=node.id, weight=1)
         genome.conns[(node.id, o)] = self.conn.create(in_node=node.id, out_node=o, weight=conn_to_split.weight)
-        return
+        self.__record(genome, nodes=(node.id,), conns=((i, o), (i, node.id), (node.id, o)))
+        return True
 
     def __mutate_add_conn(self, genome: Genome):
         """
         Attempt to add a new connection, the only restriction being that the output
-        node cannot be one of the network input pins.
+        node cannot be one of the network input pins, and in feed-forward mode that
+        it must not create a cycle.
         Fails if the randomly generated connection already exists.
         Surer: If randomly generated connection already exists, but is disabled,
         enable it.
+        Returns whether the genome was changed.
         """
-        # Note: This allows for nodes to connect to themselves.
+        # Note: Unless feed-forward, this allows for nodes to connect to themselves.
 
         # Any node (input, hidden, or output) can be the in node
-        possible_inputs = list(genome.nodes.keys())
+        possible_inputs = list(genome.nodes)
         # Only output and hidden nodes may be the out node
-        possible_outputs = list(set(possible_inputs) - set(self.input_ids))
+        inputs = set(self.input_ids)
+        possible_outputs = [n for n in possible_inputs if n not in inputs]
 
         in_node = random.choice(possible_inputs)
+        if self.feed_forward:
+            # Connecting to the in node itself or to any of its ancestors would create a cycle
+            excluded = ancestors(genome.conns, in_node)
+            excluded.add(in_node)
+            possible_outputs = [n for n in possible_outputs if n not in excluded]
+            if not possible_outputs:
+                # Mutation FAIL if every connection from the in node would create a cycle
+                # No alternative mutation
+                return False
         out_node = random.choice(possible_outputs)
         key = (in_node, out_node)
 
         if key in genome.conns:
             # Mutation FAIL if connection already exists
             # Alternative mutation: set existing connection enabled instead of adding a new connection
-            if self.structural_mutation_surer:
-                genome.conns[key].enabled = True
-            return
+            if self.structural_mutation_surer and not genome.conns[key].enabled:
+                self.__modify(genome, genome.conns, key, self.conn, enabled=True)
+                self.__record(genome, conns=(key,))
+                return True
+            return False
 
         if in_node in self.output_ids and out_node in self.output_ids:
             # Mutation FAIL if tried to connect two output nodes (not allowed)
             # No alternative mutation
-            return
+            return False
 
         # Mutation SUCCESS
         genome.conns[key] = self.conn.create(in_node=in_node, out_node=out_node)
-        return key
+        self.__record(genome, conns=(key,))
+        return True
 
     def __mutate_delete_node(self, genome: Genome):
-        """ Attempt to delete a random hidden node. Fails if no hidden nodes exist. """
+        """ Attempt to delete a random hidden node. Fails if no hidden nodes exist. Returns whether the genome was changed. """
         # NOTE: This may? delete the only connection
 
         available_nodes = [i for i in genome.nodes.keys()
@@ -139,7 +198,7 @@ class GenomeBP(Blueprint):
         if not available_nodes:
             # Mutation FAIL if no hidden nodes to delete
             # No alternative mutation
-            return -1
+            return False
 
         # Mutation SUCCESS
         del_id = random.choice(available_nodes)
@@ -152,68 +211,165 @@ class GenomeBP(Blueprint):
         for key in conns_to_delete:
             del genome.conns[key]
         del genome.nodes[del_id]
-
-        return del_id
+        self.__record(genome, nodes=(del_id,), conns=conns_to_delete)
+        return True
 
     def __mutate_delete_conn(self, genome: Genome):
-        """ Attempt to delete a random connection. Fails if no connections exist. """
+        """ Attempt to delete a random connection. Fails if no connections exist. Returns whether the genome was changed. """
         # NOTE: This may? leave nodes with no connections
         # NOTE: This may delete the only connection
         if genome.conns:
             # Mutation SUCCESS
             key = random.choice(list(genome.conns.keys()))
             del genome.conns[key]
-            return key
+            self.__record(genome, conns=(key,))
+            return True
         # Mutation FAIL if no connections to delete
-        return -1
+        return False
 
     def mutate(self, genome: Genome):
         """ Mutate a genome. """
-
         # Structural mutations
         mutations = (self.__mutate_add_node, self.__mutate_delete_node, self.__mutate_add_conn, self.__mutate_delete_conn)
         probs = (self.node_add_prob, self.node_delete_prob, self.conn_add_prob, self.conn_delete_prob)
+        names = ("mutate_add_node", "mutate_delete_node", "mutate_add_conn", "mutate_delete_conn")
         
         if self.single_structural_mutation:
             div = max(1, sum(probs))
             cum = 0
             r = random.random()
-            for mut, prob in zip(mutations, probs):
+            for mut, prob, name in zip(mutations, probs, names):
                 if r < (cum := cum + prob / div):
-                    mut(genome)
+                    if mut(genome):
+                        self.instrumentation.count(name)
                     break
         else:
-            for mut, prob in zip(mutations, probs):
+            for mut, prob, name in zip(mutations, probs, names):
                 if random.random() < prob:
-                    mut(genome)
+                    if mut(genome):
+                        self.instrumentation.count(name)
 
         # Parameter/weight mutations
-        for conn in genome.conns.values():
-            self.conn.mutate(conn)
-        for node in genome.nodes.values():
-            self.node.mutate(node)
+        # Genes may be shared, in which case those that change are replaced instead of mutated
+        mutate_genes = self.__mutate_shared if genome.shared else self.__mutate_owned
+        diff = genome.diff
+        num_changed = mutate_genes(genome.conns, self.conn, None if diff is None else diff.conns)
+        num_changed += mutate_genes(genome.nodes, self.node, None if diff is None else diff.nodes)
+        num_genes = len(genome.conns) + len(genome.nodes)
+        if num_genes:
+            self.__change_rate += _CHANGE_RATE_SMOOTHING * (num_changed / num_genes - self.__change_rate)
+        self.instrumentation.count("genes_mutated", num_changed)
+
+        if self.prune_unexpressed_after is not None:
+            self.collect_garbage(genome)
+
+    @staticmethod
+    def __mutate_owned(genes: 'dict[Any, Gene]', gene_bp: GeneBP, changed: set = None) -> int:
+        """ Mutate genes in place. Returns the number changed, adding their keys to changed if given. """
+        num_changed = 0
+        for k, gene in genes.items():
+            # Gene blueprints not reporting whether they changed a gene (returning None) are assumed to have changed it
+            if gene_bp.mutate(gene) is not False:
+                num_changed += 1
+                if changed is not None:
+                    changed.add(k)
+        return num_changed
+
+    @staticmethod
+    def __mutate_shared(genes: 'dict[Any, Gene]', gene_bp: GeneBP, changed: set = None) -> int:
+        """ Mutate possibly shared genes by replacing those that change. Returns the number replaced, as above. """
+        num_changed = 0
+        for k, gene in genes.items():
+            if (new := gene_bp.mutated(gene)) is not gene:
+                genes[k] = new
+                num_changed += 1
+                if changed is not None:
+                    changed.add(k)
+        return num_changed
+
+    def get_expressed(self, genome: Genome) -> 'Tuple[set, set]':
+        """ Return the keys of the node and connection genes expressed in the genome's feed-forward phenotype. """
+        conns = [cg.key for cg in genome.conns.values() if cg.enabled]
+        evaluated = set()
+        for layer in feed_forward_layers(self.input_ids, self.output_ids, conns):
+            evaluated |= layer
+        return evaluated | set(self.input_ids) | set(self.output_ids), {k for k in conns if k[1] in evaluated}
+
+    def collect_garbage(self, genome: Genome):
+        """
+        Genome hygiene: count the consecutive generations each gene has been unexpressed, and delete
+        genes unexpressed for prune_unexpressed_after generations. Input and output nodes are never deleted.
+        """
+        expressed_nodes, expressed_conns = self.get_expressed(genome)
+        idle, limit = genome.idle, self.prune_unexpressed_after
+        deleted = 0
+
+        for key in list(genome.conns):
+            if key in expressed_conns:
+                idle.pop(key, None)
+            elif (n := idle.get(key, 0) + 1) >= limit:
+                del genome.conns[key]
+                self.__record(genome, conns=(key,))
+                idle.pop(key, None)
+                deleted += 1
+            else:
+                idle[key] = n
+
+        for key in list(genome.nodes):
+            if key in expressed_nodes:
+                idle.pop(key, None)
+            elif (n := idle.get(key, 0) + 1) >= limit:
+                # Unexpressed nodes only have unexpressed connections, so delete those too
+                for conn_key in [k for k in genome.conns if key in k]:
+                    del genome.conns[conn_key]
+                    self.__record(genome, conns=(conn_key,))
+                    idle.pop(conn_key, None)
+                    deleted += 1
+                del genome.nodes[key]
+                self.__record(genome, nodes=(key,))
+                idle.pop(key, None)
+                deleted += 1
+            else:
+                idle[key] = n
+
+        self.instrumentation.count("genes_collected", deleted)
         
     def copy(self, genome: Genome) -> Genome:
-        """ Copy a genome. """
+        """ Copy a genome. With copy_on_write, the copy shares the genome's genes. """
+        shared = self.copy_on_write
+        if shared:
+            nodes, conns = dict(genome.nodes), dict(genome.conns)
+            genome.shared = True
+        else:
+            nodes = {k: self.node.copy(node) for k, node in genome.nodes.items()}
+            conns = {k: self.conn.copy(conn) for k, conn in genome.conns.items()}
         return Genome(
             id=genome.id,
-            nodes={k: self.node.copy(node) for k, node in genome.nodes.items()},
-            conns={k: self.conn.copy(conn) for k, conn in genome.conns.items()},
+            nodes=nodes,
+            conns=conns,
+            idle=dict(genome.idle),
+            shared=shared,
         )
+
     
-    def __crossover_genes(self, a: 'dict[Any, Gene]', b: 'dict[Any, Gene]', gene_bp: GeneBP) -> 'dict[Any, Gene]':
+    def __crossover_genes(self, a: 'dict[Any, Gene]', b: 'dict[Any, Gene]', gene_bp: GeneBP,
+                          changed: set = None, shared: bool = False) -> 'dict[Any, Gene]':
         """
         Crossover two maps of the same type of gene.
+        If changed is given, the keys of genes differing from a's are added to it.
+        If shared, genes identical to a parent's are shared with it instead of copied.
         Pre-condition: a is from the parent with higher fitness
         """
         c = {}
         for id_, gene1 in a.items():
             if (gene2 := b.get(id_)) is None:
                 # Excess or disjoint gene; copy from the fittest parent
-                c[id_] = gene_bp.copy(gene1)
+                c[id_] = gene1 if shared else gene_bp.copy(gene1)
             else:
                 # Matching/Homologous gene; combine genes from both parents.
-                c[id_] = gene_bp.crossover(gene1, gene2)
+                gene = c[id_] = gene_bp.inherit(gene1, gene2) if shared else gene_bp.crossover(gene1, gene2)
+                if changed is not None and gene is not gene1 and gene != gene1:
+                    changed.add(id_)
         return c
 
     def crossover(self, a: Genome, b: Genome) -> Genome:
@@ -222,9 +378,16 @@ class GenomeBP(Blueprint):
         Pre-condition: a is fitter than b
         """
 
-        conns = self.__crossover_genes(a.conns, b.conns, self.conn)
-        nodes = self.__crossover_genes(a.nodes, b.nodes, self.node)
-        return self.create(conns=conns, nodes=nodes)
+        diff = GeneDiff(parent=a.id) if self.record_diffs else None
+        shared = self.copy_on_write and self.__change_rate <= _MAX_SHARED_CHANGE_RATE
+        if shared:
+            # The parents' genes are now shared too, so they mustn't be modified in place either
+            a.shared = b.shared = True
+        conns = self.__crossover_genes(a.conns, b.conns, self.conn, None if diff is None else diff.conns, shared)
+        nodes = self.__crossover_genes(a.nodes, b.nodes, self.node, None if diff is None else diff.nodes, shared)
+        # Genes are inherited from a, and so are their idle counts (for genome hygiene)
+        idle = {k: n for k, n in a.idle.items() if k in nodes or k in conns}
+        return self.create(conns=conns, nodes=nodes, idle=idle, diff=diff, shared=shared)
 
     def __compare_genes(self, a: 'dict[Any, Gene]', b: 'dict[Any, Gene]', gene_bp: GeneBP):
         """ Compare two maps of the same type of gene. """
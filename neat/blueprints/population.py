@@ -2,12 +2,14 @@
 Defines blueprint for configuration and functions applied to populations.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import *
 
 from neat.model import *
 from neat.blueprints.genome import GenomeBP
 from neat.blueprints.species import SpeciesBP
+from neat.util.instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from neat.util.reporting import Reporter, ReporterSet, NULL_REPORTER
 
 @dataclass
 class PopulationBP:
@@ -22,6 +24,9 @@ class PopulationBP:
     # Species config
     species: SpeciesBP
 
+    instrumentation: Instrumentation = field(default=NULL_INSTRUMENTATION, init=False, repr=False)
+    reporter: Reporter = field(default=NULL_REPORTER, init=False, repr=False)
+
     def create_new_agents(self) -> Dict[int, Agent]:
         """ Create a new map of randomly initialized agents. """
         agents = {}
@@ -53,6 +58,9 @@ class PopulationBP:
             dist = self.genome.distance(a, b)
             cache[a.id, b.id] = dist
             cache[b.id, a.id] = dist
+            self.instrumentation.count("distance_calls")
+        else:
+            self.instrumentation.count("distance_cache_hits")
         return dist
 
     def speciate(self, population: Population, new_mascots=True):
@@ -62,12 +70,23 @@ class PopulationBP:
         distance_cache = {}
 
         if new_mascots:
-            # If mascots are old (from the last generation), find the best mascot for each existing species.
+            # Release all agents first, since elites carried over from the last generation
+            # still belong to their old species.
             for species in population.species.values():
-                # The new mascot is the genome closest to the current mascot.
+                species.clear()
+
+            # If mascots are old (from the last generation), find the best mascot for each existing species.
+            for species in list(population.species.values()):
+                # The new mascot is the unassigned genome closest to the current mascot.
                 new_mascot = min(
-                    population.agents.values(), 
-                    key=lambda a: self.__get_distance_with_cache(species.mascot.genome, a.genome, cache=distance_cache))
+                    (a for a in population.agents.values() if a.species_id is None),
+                    key=lambda a: self.__get_distance_with_cache(species.mascot.genome, a.genome, cache=distance_cache),
+                    default=None)
+                if new_mascot is None:
+                    # More species than agents; nothing left to inherit this species
+                    del population.species[species.id]
+                    self.reporter.species_removed(population, species)
+                    continue
                 species.reset(new_mascot)
         else:
             # Reset all species, preserving mascots
@@ -92,6 +111,7 @@ class PopulationBP:
             if not found:
                 s = self.species.create(mascot=agent, created_at=population.ticks)
                 population.species[s.id] = s
+                self.reporter.species_created(population, s)
     
     def check_stagnation(self, population: Population):
         """ Check if any species has not improved in a while. If so, remove them. """
@@ -116,6 +136,7 @@ class PopulationBP:
         for species in all_species:
             if species.last_improved is not None and population.ticks - species.last_improved >= self.species.max_stagnation:
                 population.remove_species(species.id)
+                self.reporter.species_removed(population, species)
 
     def adjust_compat_threshold(self, population: Population):
         """ Adjust dynamic compatibility threshold to better fit target number of species. """
@@ -1,8 +1,9 @@
 """
-Defines blueprints for creating, modifying, and applying functions to float, bool, and string values.
+Defines blueprints for creating, modifying, and applying functions to float, bool, and string values,
+plus the id counter shared by blueprints that number what they create.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import random
 from typing import *
 
@@ -20,6 +21,27 @@ class Blueprint:
     def distance(self, a, b): return abs(a - b)
 
 
+@dataclass
+class IdCounter:
+    """ Mixin for blueprints that give everything they create a new id, counting up from 0. """
+
+    __next_id: int = field(default=0, init=False, repr=False)
+
+    def new_id(self) -> int:
+        """ Return a new id. """
+        n = self.__next_id
+        self.__next_id = n + 1
+        return n
+
+    def get_next_id(self) -> int:
+        """ Return the id that will be given next, without consuming it. """
+        return self.__next_id
+
+    def set_next_id(self, n: int):
+        """ Set the id that will be given next. """
+        self.__next_id = n
+
+
 # --------------- PRIMITIVE CONTROLLERS ---------------
 
 @dataclass
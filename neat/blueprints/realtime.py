@@ -2,11 +2,13 @@
 Defines blueprint for a real-time NEAT simulation.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import *
 
 from neat.model import *
 from neat.blueprints.population import PopulationBP
+from neat.util.instrumentation import Instrumentation, NULL_INSTRUMENTATION
+from neat.util.reporting import Reporter, ReporterSet, NULL_REPORTER
 
 
 # --------------- SIMULATION CONFIGURABLES ---------------
@@ -32,12 +34,31 @@ class RealtimeBP:
     reorganization_frequency: int  # Adjust compat threshold & reassign species every _ replacements (=5 in NERO)
     replacement_frequency: int = None  # The number of ticks between replacements
 
+    instrumentation: Instrumentation = field(default=NULL_INSTRUMENTATION, init=False, repr=False)
+    reporter: Reporter = field(default=NULL_REPORTER, init=False, repr=False)
+
     def __post_init__(self):
         if self.replacement_frequency is None:
             self.replacement_frequency = round(self.minimum_age / (self.population.pop_size * self.ineligibility_fraction))
 
-    def do_replacement(self, population: Population):
-        """ Replace one eligible bad agent with the offspring of two good agents """
+    def set_instrumentation(self, instrumentation: Instrumentation):
+        """ Record per-phase timings and counters of this simulation to the given instrumentation. """
+        self.instrumentation = instrumentation
+        self.population.instrumentation = instrumentation
+        self.population.genome.instrumentation = instrumentation
+
+    def add_reporter(self, reporter: Reporter):
+        """ Report simulation events to the given reporter, in addition to any already added. """
+        if self.reporter is NULL_REPORTER:
+            self.reporter = ReporterSet()
+            self.population.reporter = self.reporter
+        self.reporter.add(reporter)
+
+    def do_replacement(self, population: Population) -> 'Optional[Tuple[Agent, Agent]]':
+        """
+        Replace one eligible bad agent with the offspring of two good agents.
+        Returns (removed agent, offspring agent), or None if no agent was eligible for removal.
+        """
 
         # Sort agents with age >= minimum_age by fitness in ascending order
         eligible_agents = [a for a in population.agents.values() if a.age >= self.minimum_age]
@@ -46,7 +67,7 @@ class RealtimeBP:
         
         # Cancel when no agents are eligible to be removed
         if len(eligible_agents) == 0:
-            return
+            return None
 
         # Remove agent with age >= minimum_age and lowest fitness
         worst = eligible_agents[0]
@@ -61,11 +82,13 @@ class RealtimeBP:
         # Crossover and mutate parent genomes to create child genome
         child = self.population.genome.crossover(parent1.genome, parent2.genome)
         self.population.genome.mutate(child)
+        population.lineage.record(child.id, parent1.genome.id, parent2.genome.id, population.ticks)
 
         # Create offspring agent and set species
         agent = Agent(genome=child)
         parent_species.add(agent)
         population.agents[child.id] = agent
+        return worst, agent
 
     def do_reorganization(self, population: Population):
         """ Reorganize agents into species using dynamic compatibility threshold """
@@ -81,35 +104,61 @@ class RealtimeBP:
 
         # Remove any empty species (cleanup routine)
         # After reassigning, some empty species may be left, so delete them
+        before = dict(population.species)
         population.remove_empty_species()
+        for sid, species in before.items():
+            if sid not in population.species:
+                self.reporter.species_removed(population, species)
 
     def update(self, population: Population):
         """
         Call every tick of simulation. 
         Assumes agents have already been evaluated and fitness assigned.
+        Reporters' tick hook is called every tick, and their generation hooks every pop_size replacements.
         """
 
+        instrumentation = self.instrumentation
+        instrumentation.begin(population.ticks)
+        replacing = population.ticks % self.replacement_frequency == 0
+        generation_boundary = replacing and population.replacements % self.population.pop_size == 0
+        if generation_boundary:
+            self.reporter.start_generation(population)
+
         population.fittest = max(population.agents.values(), key=lambda a: a.fitness)
+        if generation_boundary:
+            self.reporter.post_evaluate(population)
 
         # Stagnation step
-        self.population.check_stagnation(population)
+        with instrumentation.phase("stagnation"):
+            self.population.check_stagnation(population)
 
         # Check for complete extinction
         if self.population.species.reset_on_extinction and len(population.agents) == 0:
             self.population.reset(population)
-            print("Reset on total extinction")
+            instrumentation.count("extinctions")
+            self.reporter.extinction(population)
 
         # Replace (reproduction step)
-        if population.ticks % self.replacement_frequency == 0:
-            self.do_replacement(population)
-            print("Replacement")
+        if replacing:
+            with instrumentation.phase("replacement"):
+                replaced = self.do_replacement(population)
+            if replaced is not None:
+                instrumentation.count("replacements")
+                self.reporter.replacement(population, *replaced)
 
             # Reorganization (speciation step)
             if population.replacements % self.reorganization_frequency == 0:
-                self.do_reorganization(population)
-                print("Reorganization")
+                with instrumentation.phase("reorganization"):
+                    self.do_reorganization(population)
+                    population.lineage.maintain(population.agents.keys())
+                instrumentation.count("reorganizations")
+                self.reporter.reorganization(population)
 
             population.replacements += 1
 
+        stats = instrumentation.end()
+        self.reporter.tick(population, stats)
+        if generation_boundary:
+            self.reporter.end_generation(population, stats)
         population.ticks += 1
 
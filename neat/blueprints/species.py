@@ -2,18 +2,18 @@
 Defines blueprint for configuration and functions applied to species.
 """
 
-from itertools import count
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import *
 
 from neat.model import *
+from neat.blueprints.primitives import IdCounter
 from neat.util.funcs import stat_functions
 
 
 # --------------- POPULATION/SPECIES CONFIGURABLES ---------------
 
 @dataclass
-class SpeciesBP:
+class SpeciesBP(IdCounter):
     """ Blueprint for species. """
 
     # Dynamic compatibility threshold
@@ -28,14 +28,11 @@ class SpeciesBP:
     species_elitism: int  # number of species with highest species-fitness are protected from stagnation
     reset_on_extinction: bool  # init new population if all species simultaneously become extinct due to stagnation
 
-    # Species ID counter
-    __id_counter: count = field(default_factory=count)
-
     def create(self, **kwargs):
         """ Create a new Species with the given attributes. """
 
         if "id" not in kwargs:
-            kwargs["id"] = next(self.__id_counter)
+            kwargs["id"] = self.new_id()
 
         return Species(**kwargs)
     
@@ -1,6 +1,7 @@
 
 from .genes import NodeGene, ConnGene, Gene
-from .genome import Genome
+from .genome import Genome, GeneDiff
 from .agent import Agent
+from .lineage import Lineage
 from .population import Population
 from .species import Species
@@ -3,8 +3,9 @@ from dataclasses import dataclass
 
 from neat.model.genome import Genome
 
-@dataclass
+@dataclass(eq=False)
 class Agent:
+    """ An agent, compared and hashed by identity so that membership tests never walk genomes. """
     genome: Genome
     species_id: int = None
     fitness: float = None
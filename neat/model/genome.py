@@ -6,11 +6,22 @@ from neat.model.genes import NodeGene, ConnGene
 
 
 @dataclass
+class GeneDiff:
+    """ The genes in which a genome may differ from the genome it was derived from. """
+    parent: int  # Id of the genome it was derived from
+    nodes: set = field(default_factory=set)  # Keys of node genes added, removed or changed
+    conns: set = field(default_factory=set)  # Keys of connection genes added, removed or changed
+
+
+@dataclass(eq=False)
 class Genome:
-    """ Base class for genomes. """
+    """ Base class for genomes. Compared and hashed by identity, not by genes. """
     id: int
     nodes: 'dict[int, NodeGene]'
     conns: 'dict[tuple(int, int), ConnGene]'
+    idle: 'dict[Any, int]' = field(default_factory=dict)  # Consecutive generations each gene key has been unexpressed
+    diff: GeneDiff = field(default=None, repr=False)  # Recorded if GenomeBP.record_diffs is enabled
+    shared: bool = field(default=False, repr=False)  # Whether genes may be shared with other genomes (copy-on-write)
     
     def size(self) -> int:
         """ Returns genome 'complexity', taken to be number of nodes + number of connections. """
@@ -0,0 +1,170 @@
+from typing import *
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import os
+import tempfile
+
+
+# Columns stored for every birth: child genome id, parent ids, and generation (tick) of birth.
+COLUMNS = ("child", "parent1", "parent2", "generation")
+
+
+def _empty_columns() -> 'list[array]':
+    return [array("q") for _ in COLUMNS]
+
+
+@dataclass
+class LineageChunk:
+    """ A block of lineage rows that has been spilled to disk. """
+    path: str
+    first_child: int
+    last_child: int
+    num_rows: int
+
+    def load(self) -> 'list[array]':
+        """ Read the chunk's columns back from disk. """
+        columns = _empty_columns()
+        with open(self.path, "rb") as f:
+            for col in columns:
+                col.fromfile(f, self.num_rows)
+        return columns
+
+
+@dataclass
+class Lineage:
+    """
+    Compact record of which parents produced which child genome.
+    Rows are kept in columnar int64 arrays, ordered by child id (genome ids only ever increase).
+    Once there are more than max_rows rows in memory, rows not on the ancestry of a living agent are
+    pruned, and if spill_dir is given, the oldest remaining rows are spilled to disk in chunks. The most recently
+    read chunks are kept in memory, as ancestry lookups tend to hit the same chunks over and over.
+    """
+
+    max_rows: int = 100000  # Maximum number of rows held in memory before pruning/spilling
+    spill_dir: str = None  # Directory for spilled chunks; if None, rows are only pruned, never spilled
+    max_cached_chunks: int = 4  # Number of spilled chunks kept loaded for lookups
+
+    columns: 'list[array]' = field(default_factory=_empty_columns)
+    chunks: 'list[LineageChunk]' = field(default_factory=list)
+
+    __chunk_cache: 'OrderedDict[str, list[array]]' = field(default_factory=OrderedDict, init=False, repr=False)
+    __maintained_rows: int = field(default=0, init=False, repr=False)  # In-memory rows left by the last maintenance
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) + sum(c.num_rows for c in self.chunks)
+
+    # Accessors
+
+    def __find(self, columns: 'list[array]', child: int) -> Optional[Tuple[int, int]]:
+        children = columns[0]
+        i = bisect_left(children, child)
+        if i < len(children) and children[i] == child:
+            return columns[1][i], columns[2][i]
+        return None
+
+    def get_parents(self, child: int) -> Optional[Tuple[int, int]]:
+        """ Return the (parent1, parent2) ids of a genome, or None if unknown. """
+        parents = self.__find(self.columns, child)
+        if parents is None:
+            for chunk in reversed(self.chunks):
+                if chunk.first_child <= child <= chunk.last_child:
+                    return self.__find(self.__load(chunk), child)
+        return parents
+
+    def __load(self, chunk: LineageChunk) -> 'list[array]':
+        """ Return a spilled chunk's columns, reading them from disk only if they aren't cached. """
+        cache = self.__chunk_cache
+        columns = cache.get(chunk.path)
+        if columns is None:
+            columns = cache[chunk.path] = chunk.load()
+            if len(cache) > self.max_cached_chunks:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(chunk.path)
+        return columns
+
+    def get_ancestors(self, child: int, max_depth: int = None) -> 'list[int]':
+        """ Return ids of all known ancestors of a genome, nearest first, up to max_depth generations back. """
+        ancestors, seen = [], {child}
+        frontier, depth = [child], 0
+        while frontier and (max_depth is None or depth < max_depth):
+            next_frontier = []
+            for c in frontier:
+                parents = self.get_parents(c)
+                if parents is None:
+                    continue
+                for p in parents:
+                    if p not in seen:
+                        seen.add(p)
+                        ancestors.append(p)
+                        next_frontier.append(p)
+            frontier, depth = next_frontier, depth + 1
+        return ancestors
+
+    # Mutators
+
+    def record(self, child: int, parent1: int, parent2: int, generation: int):
+        """ Record the birth of a child genome. """
+        children = self.columns[0]
+        assert not children or child > children[-1], "Lineage rows must be recorded in increasing child id order"
+
+        for col, v in zip(self.columns, (child, parent1, parent2, generation)):
+            col.append(v)
+
+    def prune(self, live_ids: Iterable[int]):
+        """ Drop in-memory rows that are not on the ancestry of any of the given living genomes. """
+        children, parents1, parents2, _ = self.columns
+        rows = {c: i for i, c in enumerate(children)}
+
+        # Walk the ancestry graph from the living genomes. Parent ids aren't necessarily smaller than their
+        # children's, e.g. immigrants from islands with other id namespaces, so id order can't be relied on.
+        keep = bytearray(len(children))
+        stack = [rows[c] for c in live_ids if c in rows]
+        while stack:
+            i = stack.pop()
+            if keep[i]:
+                continue
+            keep[i] = 1
+            for p in (parents1[i], parents2[i]):
+                j = rows.get(p)
+                if j is not None and not keep[j]:
+                    stack.append(j)
+
+        self.columns = [array("q", (v for v, k in zip(col, keep) if k)) for col in self.columns]
+
+    def spill(self, num_rows: int):
+        """ Move the oldest num_rows in-memory rows to a new chunk on disk. """
+        num_rows = min(num_rows, len(self.columns[0]))
+        if num_rows == 0:
+            return
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        # A unique name, so that populations (or restarts of one) sharing a spill_dir don't overwrite each other
+        fd, path = tempfile.mkstemp(prefix=f"lineage-{len(self.chunks):06d}-", suffix=".bin", dir=self.spill_dir)
+        with os.fdopen(fd, "wb") as f:
+            for col in self.columns:
+                col[:num_rows].tofile(f)
+
+        children = self.columns[0]
+        self.chunks.append(LineageChunk(
+            path=path, first_child=children[0], last_child=children[num_rows - 1], num_rows=num_rows))
+        for col in self.columns:
+            del col[:num_rows]
+
+    def maintain(self, live_ids: Iterable[int]):
+        """ Keep in-memory rows under max_rows by pruning dead ancestry, then spilling if configured. """
+        num_rows = len(self.columns[0])
+        # Without spilling, the live ancestry alone can exceed max_rows. Pruning costs a pass over all rows, so
+        # only prune again once half as many rows as were left have been added since
+        if num_rows <= self.max_rows or num_rows < self.__maintained_rows * 3 // 2:
+            return
+
+        self.prune(live_ids)
+
+        # Spill down to half capacity so that we don't spill again on the very next generation
+        excess = len(self.columns[0]) - self.max_rows // 2
+        if self.spill_dir is not None and excess > 0:
+            self.spill(excess)
+        self.__maintained_rows = len(self.columns[0])
@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 
 from neat.model.agent import Agent
 from neat.model.species import Species
+from neat.model.lineage import Lineage
 
 
 @dataclass
@@ -18,15 +19,15 @@ class Population:
 
     ticks: int = 0
     replacements: int = 0
-    ancestors: 'dict[int, list]' = field(default_factory=dict)
+    lineage: Lineage = field(default_factory=Lineage)
     fittest: Agent = None
     least_fit: Agent = None
 
     # Accessors
 
-    def get_ancestors(self, agent_id):
-        """ Get the ancestors of an agent. """
-        return self.ancestors.get(agent_id, [])
+    def get_ancestors(self, agent_id, max_depth=None) -> 'list[int]':
+        """ Get the genome ids of the ancestors of an agent, nearest first. """
+        return self.lineage.get_ancestors(agent_id, max_depth=max_depth)
     
     def get_random_species(self, k=1, weighted=False) -> 'list[Species]':
         """ Return species chosen randomly or probabilistically weighted by adjusted fitness. """
@@ -51,11 +52,11 @@ class Population:
         """ Remove species with given id. """
         species = self.species.pop(sid)
         for a_id in species.members:
-            self.agents.pop(a_id)
+            self.agents.pop(a_id, None)
     
     def remove_empty_species(self):
         """ Remove all empty species. """
-        for sid, s in self.species.items():
+        for sid, s in list(self.species.items()):
             if s.is_empty():
                 del self.species[sid]
     
@@ -8,7 +8,7 @@ from neat.model import Agent
 class Species:
     id: int
     mascot: Agent
-    members: 'list[Agent]' = field(default_factory=list)
+    members: 'dict[int, Agent]' = field(default_factory=dict)  # Keyed by genome id, in insertion order
 
     # Statistics
     
@@ -28,14 +28,15 @@ class Species:
 
     def get_fitnesses(self) -> 'list[float]':
         """ Return fitnesses of members. """
-        return [m.fitness for m in self.members]
+        return [m.fitness for m in self.members.values()]
 
     def get_random_members(self, k=1, weighted=False) -> 'list[Agent]':
         """ Return k members chosen randomly or probabilistically based on fitness. """
+        members = list(self.members.values())
         if weighted:
-            return random.choices(self.members, weights=self.get_fitnesses(), k=k)
+            return random.choices(members, weights=self.get_fitnesses(), k=k)
         else:
-            return random.sample(self.members, k=k)
+            return random.sample(members, k=k)
 
     def get_random_member(self, weighted=False) -> Agent:
         """ Return member chosen randomly or probabilistically based on fitness. """
@@ -43,7 +44,7 @@ class Species:
 
     def get_best(self) -> Agent:
         """ Return best member. """
-        return max(self.members, key=lambda m: m.fitness)
+        return max(self.members.values(), key=lambda m: m.fitness)
     
     def size(self) -> int:
         """ Returns number of members. """
@@ -53,6 +54,10 @@ class Species:
         """ Returns True if no members. """
         return self.size() == 0
 
+    def has_member(self, agent: Agent) -> bool:
+        """ Returns True if agent is a member. """
+        return self.members.get(agent.genome.id) is agent
+
     # Mutators
 
     def add(self, agent: Agent):
@@ -60,21 +65,24 @@ class Species:
         assert agent.species_id is None, "Agent already belongs to a species"
 
         agent.species_id = self.id
-        if agent not in self.members:
-            self.members.append(agent)
+        self.members[agent.genome.id] = agent
     
     def remove(self, agent: Agent):
         """ Remove a member. """
         assert agent is not self.mascot, "Cannot remove mascot"
 
         agent.species_id = None
-        self.members.remove(agent)
+        del self.members[agent.genome.id]
 
-    def reset(self, new_mascot: Agent = None):
-        """ Remove all members except mascot. Or, set new mascot if given. """
-        for m in self.members:
+    def clear(self):
+        """ Remove all members, including mascot. """
+        for m in self.members.values():
             m.species_id = None
         self.members.clear()
+
+    def reset(self, new_mascot: Agent = None):
+        """ Remove all members except mascot. Or, set new mascot if given. """
+        self.clear()
         if new_mascot is None:
             self.add(self.mascot)
         else:
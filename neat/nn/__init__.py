@@ -1,3 +1,5 @@
 
 from .feed_forward import FeedForwardNetwork
 from .recurrent import RecurrentNetwork
+from .codegen import CompiledNetwork
+from .batched import BatchedNetwork
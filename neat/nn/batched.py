@@ -0,0 +1,183 @@
+"""
+Batched NumPy backend for feed-forward phenotypes.
+
+A network's node evaluations are planned once into groups: nodes are levelled by longest path from the inputs,
+and each level is partitioned into groups of nodes sharing an (activation, aggregation) pair. At activation
+time every group costs a fixed number of array operations regardless of its size and of the batch size:
+    sum groups       one gather and one matmul with a dense (sources x nodes) weight matrix
+    other groups     one gather, one multiply and one segment reduction (see neat.util.vfuncs)
+followed by one vectorized activation. A diverse network thus only costs more groups, never per-node Python calls.
+
+Networks compute in float64 by default, matching FeedForwardNetwork up to rounding. They can compute in a
+smaller dtype instead (e.g. float32, for half the memory traffic and twice the SIMD width), within
+DTYPE_TOLERANCES of the float64 reference for the built-in functions' clamped ranges; use validate_precision
+to check a given genome, as large weights or unclamped activations (exp, square, cube, inv) amplify rounding.
+"""
+
+from typing import *
+from dataclasses import dataclass
+import numpy as np
+
+from neat.model import Genome
+from neat.util import funcs, vfuncs
+from .feed_forward import FeedForwardNetwork
+
+
+# Typical maximum absolute output error versus float64, for networks of moderate weights and depth
+DTYPE_TOLERANCES = {
+    np.dtype(np.float64): 1e-12,
+    np.dtype(np.float32): 1e-3,
+    np.dtype(np.float16): 1e-1,
+}
+
+
+@dataclass
+class NodeGroup:
+    """ Nodes of one level sharing an activation and aggregation, evaluated together. """
+    slots: np.ndarray  # Value slots written by the group, one per node
+    activation: Callable[[np.ndarray], np.ndarray]
+    aggregation: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    bias: np.ndarray
+    response: np.ndarray
+    sources: np.ndarray  # Value slots read by the group
+    weights: np.ndarray = None  # Per-link weights, with links of node j in offsets[j]:offsets[j + 1]
+    offsets: np.ndarray = None
+    matrix: np.ndarray = None  # For sum groups, the (sources x nodes) weight matrix instead
+
+    def evaluate(self, values: np.ndarray):
+        """ Evaluate the group on a (batch x slots) array of values, in place. """
+        if self.matrix is not None:
+            s = values[:, self.sources] @ self.matrix
+        else:
+            s = self.aggregation(values[:, self.sources] * self.weights, self.offsets)
+        values[:, self.slots] = self.activation(self.bias + self.response * s)
+
+
+_activation_names = {f: name for name, f in funcs.activation_defs.items()}
+_aggregation_names = {f: name for name, f in funcs.aggregation_defs.items()}
+
+
+def _vectorized(act_func, agg_func):
+    """ The vectorized counterparts of scalar activation and aggregation functions. """
+    name = _activation_names.get(act_func)
+    activation = vfuncs.get_activation(name) if name is not None else vfuncs.vectorize_activation(act_func)
+    name = _aggregation_names.get(agg_func)
+    aggregation = vfuncs.get_aggregation(name) if name is not None else vfuncs.vectorize_aggregation(agg_func)
+    return activation, aggregation
+
+
+def plan_node_evals(node_evals: list, input_ids: list, output_ids: list, constants: dict = None, dtype=np.float64):
+    """
+    Plan topologically ordered (node, act_func, agg_func, bias, response, links) node evaluations into groups,
+    with parameters of the given dtype.
+    Returns (num_slots, slots, groups), where slots maps node ids (inputs first) to value slots.
+    """
+    constants = constants or {}
+    slots = {k: i for i, k in enumerate(input_ids)}
+    for k in list(constants) + [ev[0] for ev in node_evals] + list(output_ids):
+        slots.setdefault(k, len(slots))
+
+    # Level every node by its longest path from the inputs and constants
+    level = {k: 0 for k in slots}
+    levels = {}
+    for ev in node_evals:
+        node, act_func, agg_func, links = ev[0], ev[1], ev[2], ev[5]
+        level[node] = 1 + max((level[i] for i, _ in links), default=0)
+        levels.setdefault(level[node], {}).setdefault((act_func, agg_func), []).append(ev)
+
+    groups = []
+    for lvl in sorted(levels):
+        for (act_func, agg_func), evs in levels[lvl].items():
+            activation, aggregation = _vectorized(act_func, agg_func)
+            group = NodeGroup(
+                slots=np.array([slots[ev[0]] for ev in evs], dtype=np.intp),
+                activation=activation,
+                aggregation=aggregation,
+                bias=np.array([ev[3] for ev in evs], dtype=dtype),
+                response=np.array([ev[4] for ev in evs], dtype=dtype),
+                sources=None,
+            )
+            if agg_func is funcs.sum_aggregation:
+                sources = sorted({slots[i] for ev in evs for i, _ in ev[5]})
+                rows = {s: r for r, s in enumerate(sources)}
+                group.matrix = np.zeros((len(sources), len(evs)), dtype=dtype)
+                for j, ev in enumerate(evs):
+                    for i, w in ev[5]:
+                        group.matrix[rows[slots[i]], j] += w
+                group.sources = np.array(sources, dtype=np.intp)
+            else:
+                group.sources = np.array([slots[i] for ev in evs for i, _ in ev[5]], dtype=np.intp)
+                group.weights = np.array([w for ev in evs for _, w in ev[5]], dtype=dtype)
+                group.offsets = np.cumsum([0] + [len(ev[5]) for ev in evs])
+            groups.append(group)
+
+    return len(slots), slots, groups
+
+
+class BatchedNetwork:
+    """ A feed-forward phenotype evaluated on batches of inputs with grouped NumPy operations. """
+
+    def __init__(self, inputs, outputs, num_slots: int, slots: dict, groups: 'list[NodeGroup]', constants: dict = None,
+                 dtype=np.float64):
+        self.input_nodes = inputs
+        self.output_nodes = outputs
+        self.dtype = np.dtype(dtype)
+        self.num_slots = num_slots
+        self.groups = groups
+
+        constants = constants or {}
+        self.const_slots = np.array([slots[k] for k in constants], dtype=np.intp)
+        self.const_values = np.array(list(constants.values()), dtype=self.dtype)
+        self.output_slots = np.array([slots[k] for k in outputs], dtype=np.intp)
+
+    def activate_batch(self, inputs) -> np.ndarray:
+        """ Activate on a (batch x inputs) array, returning a (batch x outputs) array of the network's dtype. """
+        inputs = np.asarray(inputs, dtype=self.dtype)
+        if inputs.ndim != 2 or inputs.shape[1] != len(self.input_nodes):
+            raise RuntimeError("Expected (batch, {0:n}) inputs, got {1}".format(len(self.input_nodes), inputs.shape))
+
+        values = np.zeros((inputs.shape[0], self.num_slots), dtype=self.dtype)
+        values[:, :inputs.shape[1]] = inputs
+        values[:, self.const_slots] = self.const_values
+        for group in self.groups:
+            group.evaluate(values)
+        return values[:, self.output_slots]
+
+    def activate(self, inputs):
+        if len(self.input_nodes) != len(inputs):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), len(inputs)))
+        return self.activate_batch([inputs])[0].tolist()
+
+    @staticmethod
+    def create(genome: Genome, input_ids: list, output_ids: list, minimize=True, dtype=np.float64):
+        """
+        Receives a genome and returns its batched phenotype (a BatchedNetwork), computing in the given dtype.
+        If minimize is set, the network is minimized first (see neat.nn.minimize).
+        """
+        net = FeedForwardNetwork.create(genome, input_ids, output_ids, minimize=minimize)
+        num_slots, slots, groups = plan_node_evals(net.node_evals, input_ids, output_ids, net.constants, dtype)
+        return BatchedNetwork(input_ids, output_ids, num_slots, slots, groups, net.constants, dtype)
+
+
+def validate_precision(genome: Genome, input_ids: list, output_ids: list, dtype=np.float32, num_samples: int = 1000,
+                       low: float = -1.0, high: float = 1.0, tolerance: float = None, seed: int = None) -> float:
+    """
+    Compare a genome's batched phenotype in the given dtype to the float64 FeedForwardNetwork reference,
+    on num_samples inputs drawn uniformly from [low, high). Returns the maximum absolute output error.
+    Raises a ValueError if it exceeds tolerance (DTYPE_TOLERANCES for the dtype by default).
+    """
+    rng = np.random.default_rng(seed)
+    inputs = rng.uniform(low, high, (num_samples, len(input_ids)))
+
+    reference = FeedForwardNetwork.create(genome, input_ids, output_ids)
+    expected = np.array([reference.activate(x) for x in inputs.tolist()], dtype=np.float64)
+    net = BatchedNetwork.create(genome, input_ids, output_ids, minimize=False, dtype=dtype)
+    actual = net.activate_batch(inputs).astype(np.float64)
+
+    error = float(np.max(np.abs(actual - expected), initial=0.0))
+    if tolerance is None:
+        tolerance = DTYPE_TOLERANCES.get(np.dtype(dtype), 0.0)
+    if error > tolerance:
+        raise ValueError("Maximum output error {0:.3g} in {1} exceeds tolerance {2:.3g}".format(
+            error, np.dtype(dtype).name, tolerance))
+    return error
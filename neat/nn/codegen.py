@@ -0,0 +1,154 @@
+"""
+Source-code generation backend for feed-forward phenotypes.
+
+Each phenotype is compiled to one straight-line Python function with weights, biases and responses inlined
+as literals and activation/aggregation functions bound directly, so activation does no per-node dispatch
+or dict lookups. Compiled functions are cached by genome fingerprint, so identical phenotypes (elites,
+clones) are only compiled once.
+"""
+
+from typing import *
+from collections import OrderedDict
+import math
+
+from neat.model import Genome
+from neat.util.funcs import identity_activation, sum_aggregation
+from .feed_forward import FeedForwardNetwork
+
+
+class CodeCache:
+    """ Least-recently-used cache of compiled activation functions, keyed by genome fingerprint. """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key):
+        func = self.__entries.get(key)
+        if func is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.__entries.move_to_end(key)
+        return func
+
+    def put(self, key, func):
+        self.__entries[key] = func
+        if len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+
+    def clear(self):
+        self.__entries.clear()
+
+
+DEFAULT_CACHE = CodeCache()
+
+
+def genome_fingerprint(genome: Genome, input_ids: list, output_ids: list) -> tuple:
+    """ A hashable key that is equal for genomes with identical expressed genes (and pins). """
+    nodes = tuple(sorted((n.id, n.bias, n.response, n.activation, n.aggregation) for n in genome.nodes.values()))
+    conns = tuple(sorted((cg.key, cg.weight) for cg in genome.conns.values() if cg.enabled))
+    return tuple(input_ids), tuple(output_ids), nodes, conns
+
+
+def generate_source(input_ids: list, output_ids: list, node_evals: list, constants: dict = None) -> 'Tuple[str, dict]':
+    """
+    Generate the source of an ``activate(inputs)`` function from node evaluations.
+    Returns (source, namespace), where namespace binds the activation/aggregation functions used by the source,
+    and any non-finite numbers, which have no literal form.
+    """
+    namespace = {}
+    func_names = {}
+    const_names = {}
+
+    def bind(func) -> str:
+        name = func_names.get(func)
+        if name is None:
+            name = func_names[func] = f"_f{len(func_names)}"
+            namespace[name] = func
+        return name
+
+    def literal(value) -> str:
+        if math.isfinite(value):
+            return repr(value)
+        # repr gives 'inf'/'nan', which are not Python literals
+        key = repr(value)
+        name = const_names.get(key)
+        if name is None:
+            name = const_names[key] = f"_c{len(const_names)}"
+            namespace[name] = value
+        return name
+
+    names = {k: f"x{i}" for i, k in enumerate(input_ids)}
+    for node, *_ in node_evals:
+        names[node] = f"v{len(names)}"
+
+    lines = [
+        "def activate(inputs):",
+        f"    if len(inputs) != {len(input_ids)}:",
+        f"        raise RuntimeError('Expected {len(input_ids)} inputs, got {{0:n}}'.format(len(inputs)))",
+    ]
+    if input_ids:
+        lines.append(f"    {', '.join(names[k] for k in input_ids)}, = inputs")
+    for k, v in (constants or {}).items():
+        if k not in names:
+            names[k] = f"v{len(names)}"
+        lines.append(f"    {names[k]} = {literal(v)}")
+
+    for node, act_func, agg_func, bias, response, links in node_evals:
+        terms = [f"{names[i]} * {literal(w)}" for i, w in links]
+        if agg_func is sum_aggregation:
+            agg = " + ".join(terms) if terms else "0.0"
+        else:
+            agg = f"{bind(agg_func)}(({', '.join(terms)},))"
+
+        expr = f"{literal(bias)} + {literal(response)} * ({agg})"
+        if act_func is not identity_activation:
+            expr = f"{bind(act_func)}({expr})"
+        lines.append(f"    {names[node]} = {expr}")
+
+    outputs = ", ".join(names.get(k, "0.0") for k in output_ids)
+    lines.append(f"    return [{outputs}]")
+    return "\n".join(lines) + "\n", namespace
+
+
+def compile_activate(input_ids: list, output_ids: list, node_evals: list, constants: dict = None):
+    """ Compile node evaluations into an ``activate(inputs)`` function. """
+    source, namespace = generate_source(input_ids, output_ids, node_evals, constants)
+    exec(compile(source, "<neat-phenotype>", "exec"), namespace)
+    return namespace["activate"]
+
+
+class CompiledNetwork:
+    """ A feed-forward phenotype compiled to a single straight-line Python function. """
+
+    def __init__(self, inputs, outputs, func):
+        self.input_nodes = inputs
+        self.output_nodes = outputs
+        self.activate = func
+
+    @staticmethod
+    def create(genome: Genome, input_ids: list, output_ids: list, minimize=True, cache: CodeCache = DEFAULT_CACHE):
+        """
+        Receives a genome and returns its compiled phenotype (a CompiledNetwork).
+        If minimize is set, the network is minimized first (see neat.nn.minimize).
+        Pass cache=None to always compile.
+        """
+        key = None
+        if cache is not None:
+            key = (genome_fingerprint(genome, input_ids, output_ids), minimize)
+            func = cache.get(key)
+            if func is not None:
+                return CompiledNetwork(input_ids, output_ids, func)
+
+        net = FeedForwardNetwork.create(genome, input_ids, output_ids, minimize=minimize)
+        func = compile_activate(input_ids, output_ids, net.node_evals, net.constants)
+
+        if cache is not None:
+            cache.put(key, func)
+        return CompiledNetwork(input_ids, output_ids, func)
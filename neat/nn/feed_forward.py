@@ -3,14 +3,17 @@
 from neat.model import Genome
 from neat.util.funcs import activation_defs, aggregation_defs
 from .graphs import feed_forward_layers
+from .minimize import minimize_node_evals
 
 
 class FeedForwardNetwork(object):
-    def __init__(self, inputs, outputs, node_evals):
+    def __init__(self, inputs, outputs, node_evals, constants=None):
         self.input_nodes = inputs
         self.output_nodes = outputs
         self.node_evals = node_evals
+        self.constants = constants or {}
         self.values = {key: 0.0 for key in inputs + outputs}
+        self.values.update(self.constants)
 
     def activate(self, inputs):
         if len(self.input_nodes) != len(inputs):
@@ -29,8 +32,11 @@ class FeedForwardNetwork(object):
         return [self.values[i] for i in self.output_nodes]
 
     @staticmethod
-    def create(genome: Genome, input_ids: list, output_ids: list):
-        """ Receives a genome and returns its phenotype (a FeedForwardNetwork). """
+    def create(genome: Genome, input_ids: list, output_ids: list, minimize=False):
+        """
+        Receives a genome and returns its phenotype (a FeedForwardNetwork).
+        If minimize is set, constant nodes and linear chains are folded away (see neat.nn.minimize).
+        """
 
         # Gather expressed connections.
         connections = [cg.key for cg in genome.conns.values() if cg.enabled]
@@ -53,4 +59,8 @@ class FeedForwardNetwork(object):
                 activation_function = activation_defs.get(ng.activation)
                 node_evals.append((node, activation_function, aggregation_function, ng.bias, ng.response, inputs))
 
+        if minimize:
+            node_evals, constants = minimize_node_evals(node_evals, input_ids, output_ids)
+            return FeedForwardNetwork(input_ids, output_ids, node_evals, constants)
+
         return FeedForwardNetwork(input_ids, output_ids, node_evals)
@@ -27,6 +27,25 @@ def creates_cycle(connections, test):
             return False
 
 
+def ancestors(connections, node):
+    """
+    Collect the nodes with a path to the given node, not including the node itself (unless it is on a cycle).
+    :param connections: list of (input, output) connections in the network.
+    """
+    inputs_of = {}
+    for a, b in connections:
+        inputs_of.setdefault(b, []).append(a)
+
+    found = set()
+    stack = [node]
+    while stack:
+        for a in inputs_of.get(stack.pop(), ()):
+            if a not in found:
+                found.add(a)
+                stack.append(a)
+    return found
+
+
 def required_for_output(inputs, outputs, connections):
     """
     Collect the nodes whose state is required to compute the final network output(s).
@@ -0,0 +1,315 @@
+"""
+Incremental phenotypes: batched phenotypes (see neat.nn.batched) of offspring derived from their fitter parent's,
+by applying the gene diff recorded during crossover and mutation (see GenomeBP.record_diffs), rather than
+rebuilt from scratch.
+
+A PhenotypePlan keeps, next to its node groups, each node's level and group and where each node and connection
+lives in its group's arrays. Deriving a child's plan from its parent's:
+    - weight, bias and response changes patch copies of the affected groups' arrays;
+    - connections added, removed, enabled or disabled, and nodes added or removed, re-level only the nodes
+      downstream of the change, and activation or aggregation changes only regroup the node itself;
+    - groups whose members or links changed are rebuilt, and all others are shared with the parent's plan,
+      as plans are never modified once built.
+The Python work is thus proportional to the diff (plus shallow copies of the plan's maps), not to the genome.
+Plans are built from scratch instead when the diff covers most of the genome, where patching costs more than
+building, and when too many value slots of nodes no longer evaluated have built up along a lineage.
+
+Every node computable from the inputs is evaluated, whether or not an output depends on it, so that levels
+can be maintained locally; outputs are equal to FeedForwardNetwork's up to floating point rounding.
+"""
+
+from typing import *
+from collections import OrderedDict, deque
+import numpy as np
+
+from neat.model import Genome, GeneDiff
+from neat.util import funcs
+from .batched import NodeGroup, BatchedNetwork, _vectorized
+
+
+# Build instead of deriving if the diff holds more genes than this fraction of the genome
+_MAX_DIFF_FRACTION = 0.7
+# Build instead of deriving if dead value slots outnumber this fraction of live ones
+_MAX_DEAD_SLOTS = 0.5
+
+
+class _GroupPlan:
+    """ A node group, with the position of each of its nodes and connections in its arrays. """
+
+    def __init__(self, group: NodeGroup, nodes: list, index: dict, links: dict):
+        self.group = group
+        self.nodes = nodes  # Node ids, in group order
+        self.index = index  # Node id -> column
+        self.links = links  # Connection key -> (row, column) of the matrix of sum groups, or position in weights
+
+    def copy(self) -> '_GroupPlan':
+        """ Copy the group's parameter arrays, for patching; the layout is shared. """
+        g = self.group
+        group = NodeGroup(
+            slots=g.slots, activation=g.activation, aggregation=g.aggregation,
+            bias=g.bias.copy(), response=g.response.copy(), sources=g.sources,
+            weights=None if g.weights is None else g.weights.copy(), offsets=g.offsets,
+            matrix=None if g.matrix is None else g.matrix.copy())
+        return _GroupPlan(group, self.nodes, self.index, self.links)
+
+
+class PhenotypePlan:
+    """ The plan of a genome's batched phenotype, from which its offspring's plans can be derived. """
+
+    def __init__(self, input_ids: list, output_ids: list, dtype=np.float64):
+        self.input_ids = input_ids
+        self.output_ids = output_ids
+        self.dtype = np.dtype(dtype)
+        self.in_conns: 'dict[int, list]' = {}  # Node -> keys of its enabled incoming connections
+        self.out_nodes: 'dict[int, list]' = {}  # Node -> nodes its enabled connections lead to
+        self.levels: 'dict[int, int]' = {}  # Evaluated node -> longest path from the inputs
+        self.slots: 'dict[int, int]' = {}  # Node -> value slot
+        self.node_groups: 'dict[int, tuple]' = {}  # Evaluated node -> (level, act_func, agg_func) of its group
+        self.groups: 'dict[tuple, _GroupPlan]' = {}
+        self.__network = None
+
+    @staticmethod
+    def build(genome: Genome, input_ids: list, output_ids: list, dtype=np.float64) -> 'PhenotypePlan':
+        """ Plan a genome's phenotype from scratch. """
+        plan = PhenotypePlan(input_ids, output_ids, dtype)
+        plan.in_conns = {k: [] for k in genome.nodes}
+        plan.out_nodes = {k: [] for k in genome.nodes}
+        for key, cg in genome.conns.items():
+            if cg.enabled:
+                plan.in_conns[key[1]].append(key)
+                plan.out_nodes[key[0]].append(key[1])
+        plan.slots = {k: i for i, k in enumerate(list(input_ids) + list(output_ids))}
+
+        # Level nodes by Kahn's algorithm: a node is evaluated once all its inputs are
+        remaining = {k: len(c) for k, c in plan.in_conns.items()}
+        plan.levels = {k: 0 for k in input_ids}
+        ready = deque(input_ids)
+        while ready:
+            node = ready.popleft()
+            for m in plan.out_nodes.get(node, ()):
+                plan.levels[m] = max(plan.levels.get(m, 0), plan.levels[node] + 1)
+                remaining[m] -= 1
+                if remaining[m] == 0:
+                    ready.append(m)
+        for k in [k for k, n in remaining.items() if n > 0]:
+            plan.levels.pop(k, None)  # Downstream of a node that can't be evaluated
+
+        members = {}
+        for node, level in plan.levels.items():
+            if level > 0:
+                plan.node_groups[node] = key = plan.__group_key(genome, node)
+                members.setdefault(key, []).append(node)
+        for key, nodes in members.items():
+            plan.groups[key] = plan.__build_group(genome, key, nodes)
+        return plan
+
+    def __group_key(self, genome: Genome, node: int) -> tuple:
+        ng = genome.nodes[node]
+        return self.levels[node], funcs.activation_defs.get(ng.activation), funcs.aggregation_defs.get(ng.aggregation)
+
+    def __build_group(self, genome: Genome, key: tuple, nodes: list) -> _GroupPlan:
+        _, act_func, agg_func = key
+        activation, aggregation = _vectorized(act_func, agg_func)
+        slot = lambda n: self.slots.setdefault(n, len(self.slots))  # Assigned to nodes when first evaluated
+        group = NodeGroup(
+            slots=np.array([slot(n) for n in nodes], dtype=np.intp),
+            activation=activation,
+            aggregation=aggregation,
+            bias=np.array([genome.nodes[n].bias for n in nodes], dtype=self.dtype),
+            response=np.array([genome.nodes[n].response for n in nodes], dtype=self.dtype),
+            sources=None,
+        )
+        links = {}
+        if agg_func is funcs.sum_aggregation:
+            sources = sorted({slot(k[0]) for n in nodes for k in self.in_conns[n]})
+            rows = {s: r for r, s in enumerate(sources)}
+            group.matrix = np.zeros((len(sources), len(nodes)), dtype=self.dtype)
+            for j, n in enumerate(nodes):
+                for k in self.in_conns[n]:
+                    links[k] = (rows[self.slots[k[0]]], j)
+                    group.matrix[links[k]] = genome.conns[k].weight
+            group.sources = np.array(sources, dtype=np.intp)
+        else:
+            keys = [k for n in nodes for k in self.in_conns[n]]
+            links = {k: i for i, k in enumerate(keys)}
+            group.sources = np.array([slot(k[0]) for k in keys], dtype=np.intp)
+            group.weights = np.array([genome.conns[k].weight for k in keys], dtype=self.dtype)
+            group.offsets = np.cumsum([0] + [len(self.in_conns[n]) for n in nodes])
+        return _GroupPlan(group, nodes, {n: j for j, n in enumerate(nodes)}, links)
+
+    def derive(self, genome: Genome, diff: GeneDiff) -> 'PhenotypePlan':
+        """ Plan the phenotype of a genome differing from this plan's genome only in the genes listed in diff. """
+        if len(diff.nodes) + len(diff.conns) > _MAX_DIFF_FRACTION * (len(genome.nodes) + len(genome.conns)):
+            return PhenotypePlan.build(genome, self.input_ids, self.output_ids, self.dtype)
+
+        plan = PhenotypePlan(self.input_ids, self.output_ids, self.dtype)
+        plan.in_conns = dict(self.in_conns)
+        plan.out_nodes = dict(self.out_nodes)
+        plan.levels = dict(self.levels)
+        plan.slots = dict(self.slots)
+        plan.node_groups = dict(self.node_groups)
+        plan.groups = dict(self.groups)
+
+        touched = set()  # Nodes whose level, links or group may have changed
+        patched_nodes, patched_conns = [], []
+        for node in diff.nodes:
+            if node in genome.nodes and node not in plan.in_conns:
+                plan.in_conns[node] = []
+                plan.out_nodes[node] = []
+                touched.add(node)
+        for key in diff.conns:
+            i, o = key
+            was_enabled = key in self.in_conns.get(o, ())
+            cg = genome.conns.get(key)
+            if cg is not None and cg.enabled:
+                if was_enabled:
+                    patched_conns.append(key)
+                    continue
+                plan.in_conns[o] = plan.in_conns[o] + [key]
+                plan.out_nodes[i] = plan.out_nodes[i] + [o]
+            elif was_enabled:
+                if o in plan.in_conns:
+                    plan.in_conns[o] = [k for k in plan.in_conns[o] if k != key]
+                if i in plan.out_nodes:
+                    plan.out_nodes[i] = [m for m in plan.out_nodes[i] if m != o]
+            else:
+                continue
+            touched.add(o)
+        for node in diff.nodes:
+            if node not in genome.nodes:
+                # Its connections were removed too, and are in the diff
+                plan.in_conns.pop(node, None)
+                plan.out_nodes.pop(node, None)
+                touched.add(node)
+            elif node in plan.node_groups and node not in touched:
+                if plan.node_groups[node] != plan.__group_key(genome, node):
+                    touched.add(node)
+                else:
+                    patched_nodes.append(node)
+
+        # Re-level the touched nodes and, wherever levels change, their successors
+        limit = len(genome.nodes)
+        queue = deque(touched)
+        while queue:
+            node = queue.popleft()
+            level = plan.__level(genome, node)
+            if level == plan.levels.get(node):
+                continue
+            if level is not None and level > limit:
+                # Only a cycle makes levels grow without bound: plan from scratch, leaving the cycle unevaluated
+                return PhenotypePlan.build(genome, self.input_ids, self.output_ids, self.dtype)
+            if level is None:
+                del plan.levels[node]
+            else:
+                plan.levels[node] = level
+            touched.add(node)
+            queue.extend(plan.out_nodes.get(node, ()))
+
+        # Move touched nodes between groups, and rebuild the groups they leave or join
+        dirty = set()
+        for node in touched:
+            old = plan.node_groups.pop(node, None)
+            new = plan.__group_key(genome, node) if plan.levels.get(node, 0) > 0 else None
+            if new is not None:
+                plan.node_groups[node] = new
+            dirty.update(k for k in (old, new) if k is not None)
+        members = {key: [n for n in plan.groups[key].nodes if plan.node_groups.get(n) == key]
+                   if key in plan.groups else [] for key in dirty}
+        for node in touched:
+            key = plan.node_groups.get(node)
+            if key is not None and (key not in plan.groups or node not in plan.groups[key].index):
+                members[key].append(node)
+        for key, nodes in members.items():
+            if nodes:
+                plan.groups[key] = plan.__build_group(genome, key, nodes)
+            else:
+                del plan.groups[key]
+
+        # Patch parameters in place, in copies of the groups not rebuilt
+        copied = set(dirty)
+        def writable(key) -> _GroupPlan:
+            if key not in copied:
+                plan.groups[key] = plan.groups[key].copy()
+                copied.add(key)
+            return plan.groups[key]
+        for key in patched_conns:
+            if (group_key := plan.node_groups.get(key[1])) is not None and group_key not in dirty:
+                gp = writable(group_key)
+                if gp.group.matrix is not None:
+                    gp.group.matrix[gp.links[key]] = genome.conns[key].weight
+                else:
+                    gp.group.weights[gp.links[key]] = genome.conns[key].weight
+        for node in patched_nodes:
+            if (group_key := plan.node_groups.get(node)) is not None and group_key not in dirty:
+                gp = writable(group_key)
+                ng = genome.nodes[node]
+                gp.group.bias[gp.index[node]] = ng.bias
+                gp.group.response[gp.index[node]] = ng.response
+
+        # Slots are never reused, so the slots of nodes removed or no longer evaluated pile up: re-slot by building
+        num_live = len(self.input_ids) + len(plan.node_groups) + sum(o not in plan.node_groups for o in self.output_ids)
+        if len(plan.slots) - num_live > _MAX_DEAD_SLOTS * num_live:
+            return PhenotypePlan.build(genome, self.input_ids, self.output_ids, self.dtype)
+        return plan
+
+    def __level(self, genome: Genome, node: int) -> int:
+        """ The node's level, or None if it can't be evaluated. """
+        if node in self.input_ids:
+            return 0
+        links = self.in_conns.get(node)
+        if not links or node not in genome.nodes:
+            return None
+        level = 0
+        for i, _ in links:
+            if (lvl := self.levels.get(i)) is None:
+                return None
+            level = max(level, lvl)
+        return level + 1
+
+    def network(self) -> BatchedNetwork:
+        """ The planned phenotype. """
+        if self.__network is None:
+            groups = [self.groups[k].group for k in sorted(self.groups, key=lambda k: k[0])]
+            self.__network = BatchedNetwork(self.input_ids, self.output_ids, len(self.slots), self.slots, groups,
+                                            dtype=self.dtype)
+        return self.__network
+
+
+class PhenotypeCache:
+    """
+    Builds genomes' batched phenotypes, deriving each from its parent's plan when the genome has a gene diff and
+    the parent's plan is still cached. Genomes must not be modified once their phenotype has been built.
+    """
+
+    def __init__(self, input_ids: list, output_ids: list, dtype=np.float64, max_size: int = 1000):
+        """ Keep the plans of the max_size most recently requested genomes. """
+        self.input_ids = input_ids
+        self.output_ids = output_ids
+        self.dtype = np.dtype(dtype)
+        self.max_size = max_size
+        self.num_built = 0
+        self.num_derived = 0
+        self.__plans: 'OrderedDict[int, Tuple[Genome, PhenotypePlan]]' = OrderedDict()
+
+    def get_plan(self, genome: Genome) -> PhenotypePlan:
+        entry = self.__plans.get(genome.id)
+        if entry is not None and entry[0] is genome:
+            self.__plans.move_to_end(genome.id)
+            return entry[1]
+
+        parent = None if genome.diff is None else self.__plans.get(genome.diff.parent)
+        if parent is not None:
+            plan = parent[1].derive(genome, genome.diff)
+            self.num_derived += 1
+        else:
+            plan = PhenotypePlan.build(genome, self.input_ids, self.output_ids, self.dtype)
+            self.num_built += 1
+
+        self.__plans[genome.id] = (genome, plan)
+        if len(self.__plans) > self.max_size:
+            self.__plans.popitem(last=False)
+        return plan
+
+    def get(self, genome: Genome) -> BatchedNetwork:
+        """ Return the genome's phenotype. """
+        return self.get_plan(genome).network()
@@ -0,0 +1,84 @@
+"""
+Phenotype minimization: rewrites a feed-forward network's node evaluations into a smaller, equivalent plan.
+
+The node evaluations built by FeedForwardNetwork.create already exclude nodes that are unreachable from the
+inputs or not required for the outputs, and disabled connections. On top of that, this pass:
+    - folds constant nodes (response of zero, or only constant or zero-weight inputs) into constants,
+      and folds their contributions into the bias of sum-aggregated consumers;
+    - folds linear chains, i.e. identity-activated nodes with a single input, into their sum-aggregated
+      consumers by linking the consumer directly to the chain's source;
+    - merges duplicate links from the same source into sum-aggregated nodes;
+    - drops nodes whose value is no longer used by any output.
+Outputs are equal to those of the original plan up to floating point rounding.
+"""
+
+from typing import *
+
+from neat.util.funcs import identity_activation, sum_aggregation
+
+
+def _is_summing(agg_func, links) -> bool:
+    """ All aggregations return their only value for a single input, so single-input nodes sum too. """
+    return agg_func is sum_aggregation or len(links) == 1
+
+
+def minimize_node_evals(node_evals: list, input_ids: list, output_ids: list) -> 'Tuple[list, dict]':
+    """
+    Minimize a topologically ordered list of (node, act_func, agg_func, bias, response, links) node evaluations.
+    Returns (node_evals, constants), where constants maps the ids of nodes folded to constants to their values.
+    """
+    constants = {}  # node -> constant value
+    linear = {}  # node -> (source, weight, bias, response) for identity nodes with a single link
+    minimized = []
+
+    for node, act_func, agg_func, bias, response, links in node_evals:
+        summing = _is_summing(agg_func, links)
+
+        # Rewrite links through constants and linear chains
+        new_links, const_values = [], []
+        for i, w in links:
+            if i in constants:
+                const_values.append(constants[i] * w)
+            elif w == 0.0 and summing:
+                continue
+            elif i in linear and summing:
+                src, w0, b0, r0 = linear[i]
+                const_values.append(b0 * w)
+                new_links.append((src, r0 * w0 * w))
+            else:
+                new_links.append((i, w))
+
+        if not new_links or response == 0.0:
+            # No variable inputs left, so the node's value is constant
+            constants[node] = act_func(bias + response * agg_func(const_values if const_values else [0.0] * len(links)))
+            continue
+
+        if summing:
+            bias += response * sum(const_values)
+            # Merge duplicate links from the same source
+            merged = {}
+            for i, w in new_links:
+                merged[i] = merged.get(i, 0.0) + w
+            new_links = list(merged.items())
+            agg_func = sum_aggregation
+        else:
+            # Nothing can be folded into a non-summing node; constant inputs stay links to the pre-set constant values
+            new_links = links
+
+        if act_func is identity_activation and len(new_links) == 1 and node not in output_ids:
+            (src, w0), = new_links
+            linear[node] = (src, w0, bias, response)
+
+        minimized.append((node, act_func, agg_func, bias, response, new_links))
+
+    # Drop evaluations (including folded linear nodes) whose values no output depends on any more
+    used = set(output_ids)
+    kept = []
+    for ev in reversed(minimized):
+        if ev[0] in used:
+            kept.append(ev)
+            used.update(i for i, _ in ev[5])
+    kept.reverse()
+
+    constants = {k: v for k, v in constants.items() if k in used}
+    return kept, constants
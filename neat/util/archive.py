@@ -0,0 +1,194 @@
+"""
+Append-only, memory-mapped genome archive, e.g. for keeping a hall of fame of the fittest genome of every generation.
+
+An archive is two files:
+    <path>      a fixed-size header (layout and string table) followed by packed gene records
+    <path>.idx  a fixed-width index entry per record (genome id, generation, fitness, offset, gene counts)
+Records are written before their index entries, so a crash can never leave an index entry pointing at missing data.
+Both files are memory-mapped for reading, so any genome can be loaded without reading the rest of the archive.
+"""
+
+from typing import *
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from neat.model import Genome
+from neat.blueprints.primitives import StringBP
+from neat.blueprints.genome import GenomeBP
+from neat.util.packing import GenomePacker
+
+
+MAGIC = b"NEATAR01"
+HEADER_SIZE = 4096
+
+INDEX_DTYPE = np.dtype([
+    ("id", "<i8"),
+    ("generation", "<i8"),
+    ("fitness", "<f8"),
+    ("offset", "<u8"),
+    ("num_nodes", "<u4"),
+    ("num_conns", "<u4"),
+])
+
+
+def _string_table(genome_bp: GenomeBP) -> 'list[str]':
+    """ All values StringBP attributes can take, in a deterministic order. """
+    strings = {}
+    for gene_bp in (genome_bp.node, genome_bp.conn):
+        for _, cfg in gene_bp.get_configs():
+            if isinstance(cfg, StringBP):
+                strings.update(dict.fromkeys(cfg.options))
+                if cfg.default is not None:
+                    strings[cfg.default] = None
+    return list(strings)
+
+
+class GenomeArchive:
+    """ Append-only genome store with random access by record index, genome id, or generation. """
+
+    def __init__(self, path: str, genome_bp: GenomeBP):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.packer = GenomePacker(genome_bp)
+
+        layout = {
+            "nodes": np.lib.format.dtype_to_descr(self.packer.node_layout.dtype),
+            "conns": np.lib.format.dtype_to_descr(self.packer.conn_layout.dtype),
+            "strings": _string_table(genome_bp),
+        }
+        # Round trip through JSON so that layouts read back from disk compare equal
+        layout = json.loads(json.dumps(layout))
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                header = f.read(HEADER_SIZE)
+            if header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a genome archive")
+            (n,) = struct.unpack_from("<Q", header, len(MAGIC))
+            stored = json.loads(header[len(MAGIC) + 8:len(MAGIC) + 8 + n])
+            if stored != layout:
+                raise ValueError(f"{path} was written with a different gene layout")
+        else:
+            data = json.dumps(layout).encode()
+            header = MAGIC + struct.pack("<Q", len(data)) + data
+            if len(header) > HEADER_SIZE:
+                raise ValueError("Gene layout does not fit in the archive header")
+            with open(path, "wb") as f:
+                f.write(header.ljust(HEADER_SIZE, b"\0"))
+            open(self.index_path, "wb").close()
+
+        self.strings = layout["strings"]
+        self.__string_index = {s: i for i, s in enumerate(self.strings)}
+
+        # Ignore a partially written trailing index entry, if any
+        self.__size = os.path.getsize(self.index_path) // INDEX_DTYPE.itemsize
+        with open(self.index_path, "r+b") as f:
+            f.truncate(self.__size * INDEX_DTYPE.itemsize)
+
+        self.__data_file = open(path, "ab")
+        self.__index_file = open(self.index_path, "ab")
+        self.__data_map = self.__index_map = None
+        self.__index = np.empty(0, dtype=INDEX_DTYPE)
+
+    # Accessors
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __refresh(self):
+        """ Re-map the files if records were appended since they were last mapped. """
+        if len(self.__index) == len(self):
+            return
+        self.flush()
+        with open(self.path, "rb") as f:
+            self.__data_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.index_path, "rb") as f:
+            self.__index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__index = np.frombuffer(self.__index_map, dtype=INDEX_DTYPE)
+
+    @property
+    def index(self) -> np.ndarray:
+        """
+        The index as a read-only structured array with one entry per record.
+        It is a view of the mapped index file, so copy it to keep it past close().
+        """
+        self.__refresh()
+        return self.__index
+
+    def get(self, i: int) -> Genome:
+        """ Load the genome of the i-th record. """
+        entry = self.index[i]
+        offset, num_nodes, num_conns = int(entry["offset"]), int(entry["num_nodes"]), int(entry["num_conns"])
+        node_dtype, conn_dtype = self.packer.node_layout.dtype, self.packer.conn_layout.dtype
+
+        nodes = np.frombuffer(self.__data_map, dtype=node_dtype, count=num_nodes, offset=offset)
+        offset += num_nodes * node_dtype.itemsize
+        conns = np.frombuffer(self.__data_map, dtype=conn_dtype, count=num_conns, offset=offset)
+        return self.packer.unpack_genome(int(entry["id"]), nodes, conns, self.strings)
+
+    def find(self, genome_id: int = None, generation: int = None) -> 'list[int]':
+        """ Return indices of the records matching the given genome id and/or generation. """
+        mask = np.ones(len(self.index), dtype=bool)
+        if genome_id is not None:
+            mask &= self.index["id"] == genome_id
+        if generation is not None:
+            mask &= self.index["generation"] == generation
+        return np.flatnonzero(mask).tolist()
+
+    def get_by_id(self, genome_id: int) -> Optional[Genome]:
+        """ Load the most recently archived genome with the given id, or None. """
+        found = self.find(genome_id=genome_id)
+        return self.get(found[-1]) if found else None
+
+    def get_by_generation(self, generation: int) -> 'list[Genome]':
+        """ Load all genomes archived at the given generation. """
+        return [self.get(i) for i in self.find(generation=generation)]
+
+    # Mutators
+
+    def append(self, genome: Genome, generation: int, fitness: float = None):
+        """ Append a genome to the archive. """
+        nodes = self.packer.node_layout.pack(list(genome.nodes.values()), self.__string_index)
+        conns = self.packer.conn_layout.pack(list(genome.conns.values()), self.__string_index)
+        if len(self.__string_index) != len(self.strings):
+            # A new string was added to the (fixed) table, so restore it and refuse the genome
+            self.__string_index = {s: i for i, s in enumerate(self.strings)}
+            raise ValueError("Genome has string attribute values that are not options of its blueprint")
+
+        offset = self.__data_file.tell()
+        self.__data_file.write(nodes.tobytes())
+        self.__data_file.write(conns.tobytes())
+
+        entry = np.array(
+            [(genome.id, generation, np.nan if fitness is None else fitness, offset, len(nodes), len(conns))],
+            dtype=INDEX_DTYPE)
+        self.__data_file.flush()
+        self.__index_file.write(entry.tobytes())
+        self.__index_file.flush()
+        self.__size += 1
+
+    def flush(self):
+        """ Flush pending appends to disk. """
+        self.__data_file.flush()
+        self.__index_file.flush()
+
+    def close(self):
+        """ Close the archive files and their memory maps. """
+        self.__data_file.close()
+        self.__index_file.close()
+        # Release the index view first, as a map can't be closed while arrays still view it
+        self.__index = np.empty(0, dtype=INDEX_DTYPE)
+        for m in (self.__data_map, self.__index_map):
+            if m is not None:
+                m.close()
+        self.__data_map = self.__index_map = None
+
+    def __enter__(self) -> 'GenomeArchive':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,176 @@
+"""
+Checkpointing of a population and its blueprint state (id counters, RNG state) in a compact binary format.
+Genomes are stored as packed gene arrays (see neat.util.packing) rather than pickled object graphs.
+"""
+
+from typing import *
+import math
+import os
+import random
+
+import numpy as np
+
+from neat.model import Agent, Population, Species, Lineage
+from neat.model.lineage import LineageChunk
+from neat.blueprints.population import PopulationBP
+from neat.util.packing import GenomePacker, PackedGenomes, dumps, loads
+
+
+FORMAT_VERSION = 1
+
+
+def _none_to_nan(x):
+    return math.nan if x is None else x
+
+
+def _nan_to_none(x):
+    return None if math.isnan(x) else x
+
+
+def dumps_checkpoint(bp: PopulationBP, population: Population) -> bytes:
+    """ Serialize a population and the blueprint counters to bytes. """
+
+    # Agents in the population come first, followed by agents only referenced as mascots or fittest/least fit
+    agents = dict.fromkeys(population.agents.values())
+    for species in population.species.values():
+        agents.setdefault(species.mascot)
+    for extra in (population.fittest, population.least_fit):
+        if extra is not None:
+            agents.setdefault(extra)
+    agents = list(agents)
+    index = {a: i for i, a in enumerate(agents)}
+
+    species_meta, members, history = [], [], []
+    for s in population.species.values():
+        species_meta.append({
+            "id": s.id,
+            "mascot": index[s.mascot],
+            "num_members": s.size(),
+            "num_history": len(s.fitness_history),
+            "created_at": s.created_at,
+            "last_improved": s.last_improved,
+            "fitness": s.fitness,
+            "best_fitness": s.best_fitness,
+            "adjusted_fitness": s.adjusted_fitness,
+        })
+        members.extend(index[m] for m in s.members.values())
+        history.extend(s.fitness_history)
+
+    rng_version, rng_internal, rng_gauss_next = random.getstate()
+    lineage = population.lineage
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "next_genome_id": bp.genome.get_next_id(),
+        "next_node_id": bp.genome.node.get_next_id(),
+        "next_species_id": bp.species.get_next_id(),
+        "num_live_agents": len(population.agents),
+        "compat_threshold": population.compat_threshold,
+        "ticks": population.ticks,
+        "replacements": population.replacements,
+        "fittest": index.get(population.fittest),
+        "least_fit": index.get(population.least_fit),
+        "species": species_meta,
+        "lineage": {
+            "max_rows": lineage.max_rows,
+            "spill_dir": lineage.spill_dir,
+            "max_cached_chunks": lineage.max_cached_chunks,
+            "chunks": [[c.path, c.first_child, c.last_child, c.num_rows] for c in lineage.chunks],
+        },
+        "rng": [rng_version, rng_gauss_next],
+    }
+
+    genome_meta, arrays = GenomePacker(bp.genome).pack(a.genome for a in agents).to_sections("genome_")
+    meta.update(genome_meta)
+    arrays.update({
+        "agent_species": np.array([-1 if a.species_id is None else a.species_id for a in agents], dtype="<i8"),
+        "agent_fitness": np.array([_none_to_nan(a.fitness) for a in agents], dtype="<f8"),
+        "agent_age": np.array([a.age for a in agents], dtype="<i8"),
+        "species_members": np.array(members, dtype="<i8"),
+        "species_history": np.array(history, dtype="<f8"),
+        "rng_internal": np.array(rng_internal, dtype="<u8"),
+    })
+    for name, col in zip(("child", "parent1", "parent2", "generation"), lineage.columns):
+        arrays["lineage_" + name] = np.frombuffer(col, dtype="<i8")
+
+    return dumps(meta, arrays)
+
+
+def loads_checkpoint(bp: PopulationBP, buf) -> Population:
+    """
+    Restore a population from bytes, resetting the blueprint counters and the global RNG state.
+    The blueprint must have the same gene configuration as the one the checkpoint was made with.
+    """
+    meta, arrays = loads(buf)
+    if meta["version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {meta['version']}")
+
+    genomes = GenomePacker(bp.genome).unpack(PackedGenomes.from_sections(meta, arrays, "genome_"))
+    agents = [
+        Agent(genome=g, fitness=_nan_to_none(f), age=age)
+        for g, f, age in zip(genomes, arrays["agent_fitness"].tolist(), arrays["agent_age"].tolist())]
+
+    species = {}
+    members = arrays["species_members"].tolist()
+    history = arrays["species_history"].tolist()
+    m = h = 0
+    for sm in meta["species"]:
+        s = Species(
+            id=sm["id"],
+            mascot=agents[sm["mascot"]],
+            created_at=sm["created_at"],
+            last_improved=sm["last_improved"],
+            fitness=sm["fitness"],
+            best_fitness=sm["best_fitness"],
+            fitness_history=history[h:h + sm["num_history"]],
+            adjusted_fitness=sm["adjusted_fitness"])
+        for i in members[m:m + sm["num_members"]]:
+            s.members[agents[i].genome.id] = agents[i]
+        species[s.id] = s
+        m += sm["num_members"]
+        h += sm["num_history"]
+
+    # Restore species ids exactly, including those of agents whose species has since been removed
+    for a, sid in zip(agents, arrays["agent_species"].tolist()):
+        a.species_id = None if sid < 0 else sid
+
+    lm = meta["lineage"]
+    lineage = Lineage(max_rows=lm["max_rows"], spill_dir=lm["spill_dir"],
+                      max_cached_chunks=lm.get("max_cached_chunks", Lineage.max_cached_chunks))
+    lineage.chunks = [LineageChunk(*c) for c in lm["chunks"]]
+    for col, name in zip(lineage.columns, ("child", "parent1", "parent2", "generation")):
+        col.frombytes(arrays["lineage_" + name].tobytes())
+
+    fittest, least_fit = meta["fittest"], meta["least_fit"]
+    population = Population(
+        agents={a.genome.id: a for a in agents[:meta["num_live_agents"]]},
+        compat_threshold=meta["compat_threshold"],
+        species=species,
+        ticks=meta["ticks"],
+        replacements=meta["replacements"],
+        lineage=lineage,
+        fittest=None if fittest is None else agents[fittest],
+        least_fit=None if least_fit is None else agents[least_fit])
+
+    bp.genome.set_next_id(meta["next_genome_id"])
+    bp.genome.node.set_next_id(meta["next_node_id"])
+    bp.species.set_next_id(meta["next_species_id"])
+
+    rng_version, rng_gauss_next = meta["rng"]
+    random.setstate((rng_version, tuple(arrays["rng_internal"].tolist()), rng_gauss_next))
+
+    return population
+
+
+def save_checkpoint(path: str, bp: PopulationBP, population: Population):
+    """ Write a checkpoint file. The file is replaced atomically, so a crash never leaves a torn checkpoint. """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dumps_checkpoint(bp, population))
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str, bp: PopulationBP) -> Population:
+    """ Read a checkpoint file. """
+    with open(path, "rb") as f:
+        return loads_checkpoint(bp, f.read())
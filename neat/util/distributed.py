@@ -0,0 +1,325 @@
+"""
+Distributed fitness evaluation over TCP: a DistributedEvaluator (the coordinator) ships batches of packed genomes
+to any number of Workers and collects their fitnesses.
+
+Every message is a frame: a uint64 payload length followed by a payload in the packing.dumps() format.
+    worker -> coordinator   hello    {node_dtype, conn_dtype}, checked against the coordinator's gene layouts
+    coordinator -> worker   task     {task_id} plus the sections of a PackedGenomes batch
+    worker -> coordinator   result   {task_id} plus a float64 "fitness" array, in the batch's order
+    worker -> coordinator   error    {task_id, message} if the fitness function raised
+    coordinator -> worker   stop     {reason}
+Workers may join or leave at any time. Batches held by a worker that disconnects are re-queued, and batches
+not finished within task_timeout are re-queued to another worker; whichever result arrives first is used.
+Workers run their own fitness function, so the fitness function passed to the simulation is not used.
+"""
+
+from typing import *
+from collections import deque
+import itertools
+import selectors
+import socket
+import struct
+import time
+import traceback
+
+import numpy as np
+
+from neat.model import Agent
+from neat.blueprints.genome import GenomeBP
+from neat.util.evaluation import Evaluator
+from neat.util.packing import GenomePacker, PackedGenomes, dumps, loads
+
+
+FRAME_HEADER = struct.Struct("<Q")
+
+
+def _frame(meta: dict, arrays: 'dict[str, np.ndarray]' = None) -> bytes:
+    payload = dumps(meta, arrays or {})
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> 'Optional[bytearray]':
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+
+def _recv_frame(sock: socket.socket) -> 'Optional[Tuple[dict, dict]]':
+    """ Block until a whole frame is received, returning (meta, arrays), or None if the peer closed. """
+    header = _recv_exactly(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exactly(sock, FRAME_HEADER.unpack(header)[0])
+    if payload is None:
+        return None
+    return loads(payload)
+
+
+def _layout_meta(packer: GenomePacker) -> dict:
+    return {
+        "node_dtype": str(packer.node_layout.dtype),
+        "conn_dtype": str(packer.conn_layout.dtype),
+    }
+
+
+# --------------- COORDINATOR ---------------
+
+class _Connection:
+    """ The coordinator's side of a worker connection. """
+
+    def __init__(self, sock: socket.socket, address):
+        self.sock = sock
+        self.address = address
+        self.buffer = bytearray()
+        self.ready = False  # Set once the worker's hello is accepted
+        self.task = None  # Id of the batch the worker is busy with
+
+    def frames(self) -> 'Iterator[Tuple[dict, dict]]':
+        """ Yield the complete frames received so far. """
+        while len(self.buffer) >= FRAME_HEADER.size:
+            (n,) = FRAME_HEADER.unpack_from(self.buffer)
+            if len(self.buffer) < FRAME_HEADER.size + n:
+                return
+            payload = bytes(self.buffer[FRAME_HEADER.size:FRAME_HEADER.size + n])
+            del self.buffer[:FRAME_HEADER.size + n]
+            yield loads(payload)
+
+
+class DistributedEvaluator(Evaluator):
+    """ Evaluates agents on remote workers; see neat.util.distributed. """
+
+    copyable = False
+    in_process = False
+
+    def __init__(self, genome_bp: GenomeBP, host: str = "127.0.0.1", port: int = 0, batch_size: int = 10,
+                 task_timeout: float = 60.0, wait_timeout: float = None, send_timeout: float = 10.0):
+        """
+        Listen for workers on (host, port); port 0 picks a free port, see self.address.
+        Genomes are sent in batches of batch_size. evaluate() raises a TimeoutError if no work completes
+        for wait_timeout seconds (e.g. because no workers are connected), or waits indefinitely if it is None.
+        """
+        self.packer = GenomePacker(genome_bp)
+        self.batch_size = batch_size
+        self.task_timeout = task_timeout
+        self.wait_timeout = wait_timeout
+        self.send_timeout = send_timeout
+
+        self.__listener = socket.create_server((host, port))
+        self.__listener.setblocking(False)
+        self.address = self.__listener.getsockname()
+        self.__selector = selectors.DefaultSelector()
+        self.__selector.register(self.__listener, selectors.EVENT_READ)
+        self.__connections: 'dict[socket.socket, _Connection]' = {}
+        self.__task_ids = itertools.count()
+
+    def num_workers(self) -> int:
+        return sum(1 for c in self.__connections.values() if c.ready)
+
+    # Evaluation
+
+    def evaluate(self, agents: 'list[Agent]', fitness_func=None):
+        batches = {next(self.__task_ids): agents[i:i + self.batch_size] for i in range(0, len(agents), self.batch_size)}
+        packed = {tid: self.packer.pack(a.genome for a in batch) for tid, batch in batches.items()}
+        pending = deque(batches)
+        deadlines = {}  # Task id -> time by which its latest assignment must finish
+        results = {}
+        last_progress = time.monotonic()
+
+        while len(results) < len(batches):
+            # Hand out pending batches to idle workers
+            for conn in list(self.__connections.values()):
+                while pending and pending[0] in results:
+                    pending.popleft()
+                if not pending:
+                    break
+                if conn.ready and conn.task is None:
+                    tid = pending.popleft()
+                    meta, arrays = packed[tid].to_sections()
+                    if self.__send(conn, dict(meta, type="task", task_id=tid), arrays):
+                        conn.task = tid
+                        deadlines[tid] = time.monotonic() + self.task_timeout
+                    else:
+                        pending.appendleft(tid)
+
+            now = time.monotonic()
+            timeout = min(deadlines.values(), default=now + 1.0) - now
+            if self.wait_timeout is not None:
+                timeout = min(timeout, last_progress + self.wait_timeout - now)
+            for key, _ in self.__selector.select(max(timeout, 0.0)):
+                if key.fileobj is self.__listener:
+                    self.__accept()
+                    continue
+                conn = self.__connections.get(key.fileobj)
+                if conn is None or not self.__receive(conn):
+                    continue
+                for meta, arrays in conn.frames():
+                    if self.__handle(conn, meta, arrays, batches, results):
+                        deadlines.pop(meta["task_id"], None)
+                        last_progress = time.monotonic()
+
+            # Re-queue batches of disconnected workers and stragglers
+            now = time.monotonic()
+            for tid, deadline in list(deadlines.items()):
+                if tid not in results and deadline <= now:
+                    del deadlines[tid]
+                    pending.append(tid)
+            busy = {c.task for c in self.__connections.values()}
+            for tid in list(deadlines):
+                if tid not in busy:
+                    del deadlines[tid]
+                    pending.append(tid)
+
+            if self.wait_timeout is not None and now - last_progress > self.wait_timeout:
+                raise TimeoutError("No batch completed in {0:g}s ({1:n} workers connected)".format(
+                    self.wait_timeout, self.num_workers()))
+
+        for tid, batch in batches.items():
+            for agent, fitness in zip(batch, results[tid].tolist()):
+                agent.fitness = fitness
+
+    # Connections
+
+    def __accept(self):
+        try:
+            sock, address = self.__listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        self.__connections[sock] = _Connection(sock, address)
+        self.__selector.register(sock, selectors.EVENT_READ)
+
+    def __receive(self, conn: _Connection) -> bool:
+        """ Read available data from a worker, dropping it if it disconnected. """
+        try:
+            data = conn.sock.recv(1 << 20)
+        except BlockingIOError:
+            return True
+        except OSError:
+            data = b""
+        if not data:
+            self.__drop(conn)
+            return False
+        conn.buffer += data
+        return True
+
+    def __send(self, conn: _Connection, meta: dict, arrays: dict = None) -> bool:
+        """ Send a frame to a worker, dropping it if it cannot be reached. """
+        try:
+            conn.sock.settimeout(self.send_timeout)
+            conn.sock.sendall(_frame(meta, arrays))
+            conn.sock.setblocking(False)
+            return True
+        except OSError:
+            self.__drop(conn)
+            return False
+
+    def __drop(self, conn: _Connection):
+        """ Forget a worker and close its connection. Dropping a worker that was already dropped does nothing. """
+        if self.__connections.pop(conn.sock, None) is None:
+            return
+        self.__selector.unregister(conn.sock)
+        conn.sock.close()
+
+    def __handle(self, conn: _Connection, meta: dict, arrays: dict, batches: dict, results: dict) -> bool:
+        """ Handle a frame from a worker. Returns whether it completed a batch of the current evaluation. """
+        kind = meta.get("type")
+        if kind == "hello":
+            expected = _layout_meta(self.packer)
+            if {k: meta.get(k) for k in expected} != expected:
+                self.__send(conn, {"type": "stop", "reason": "Gene layout does not match the coordinator's"})
+                self.__drop(conn)
+            else:
+                conn.ready = True
+            return False
+
+        if kind == "error":
+            # Free the worker first, so that it gets work again in later evaluations
+            if conn.task == meta["task_id"]:
+                conn.task = None
+            raise RuntimeError("Worker {0} failed to evaluate a batch:\n{1}".format(conn.address, meta["message"]))
+
+        if kind == "result":
+            tid = meta["task_id"]
+            if conn.task == tid:
+                conn.task = None
+            # Late results of re-queued batches or of earlier evaluations are ignored
+            if tid in results or tid not in batches:
+                return False
+            results[tid] = np.array(arrays["fitness"], dtype=np.float64)
+            return True
+        return False
+
+    # Lifecycle
+
+    def close(self):
+        """ Stop all workers and stop listening. """
+        for conn in list(self.__connections.values()):
+            self.__send(conn, {"type": "stop", "reason": "Coordinator closed"})
+            self.__drop(conn)
+        self.__selector.unregister(self.__listener)
+        self.__listener.close()
+        self.__selector.close()
+
+    def __enter__(self) -> 'DistributedEvaluator':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --------------- WORKER ---------------
+
+class Worker:
+    """ Evaluates batches of genomes sent by a DistributedEvaluator with a local fitness function. """
+
+    def __init__(self, address: 'Tuple[str, int]', genome_bp: GenomeBP, fitness_func, connect_timeout: float = 30.0):
+        """ fitness_func takes an Agent, as in GenerationalBP.evaluate. """
+        self.address = tuple(address)
+        self.packer = GenomePacker(genome_bp)
+        self.fitness_func = fitness_func
+        self.connect_timeout = connect_timeout
+
+    def __connect(self) -> socket.socket:
+        """ Connect to the coordinator, retrying until connect_timeout (it may not be listening yet). """
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return socket.create_connection(self.address)
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+
+    def run(self) -> int:
+        """ Evaluate batches until the coordinator stops the worker or disconnects. Returns the number of batches. """
+        num_batches = 0
+        with self.__connect() as sock:
+            sock.sendall(_frame(dict(_layout_meta(self.packer), type="hello")))
+            while True:
+                frame = _recv_frame(sock)
+                if frame is None:
+                    break
+                meta, arrays = frame
+                if meta["type"] == "stop":
+                    break
+                if meta["type"] != "task":
+                    continue
+
+                try:
+                    genomes = self.packer.unpack(PackedGenomes.from_sections(meta, arrays))
+                    fitness = np.array([self.fitness_func(Agent(genome=g)) for g in genomes], dtype=np.float64)
+                except Exception:
+                    sock.sendall(_frame({"type": "error", "task_id": meta["task_id"], "message": traceback.format_exc()}))
+                    continue
+                sock.sendall(_frame({"type": "result", "task_id": meta["task_id"]}, {"fitness": fitness}))
+                num_batches += 1
+        return num_batches
+
+
+def run_worker(host: str, port: int, genome_bp: GenomeBP, fitness_func, connect_timeout: float = 30.0) -> int:
+    """ Run a Worker for the coordinator at (host, port); see Worker.run. """
+    return Worker((host, port), genome_bp, fitness_func, connect_timeout).run()
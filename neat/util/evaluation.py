@@ -0,0 +1,32 @@
+"""
+Evaluators assign fitnesses to a generation's agents; see GenerationalBP.set_evaluator.
+The default evaluator calls the fitness function on every agent in turn, in the simulation's process.
+"""
+
+from typing import *
+
+from neat.model import Agent
+
+
+class Evaluator:
+    """ Evaluates agents serially. Subclass and override evaluate to evaluate them some other way. """
+
+    # Whether the evaluator can be deep-copied, e.g. into the blueprint of each trial of an experiment.
+    # Evaluators holding sockets, processes or shared memory can't be, and are replaced by serial evaluation.
+    copyable = True
+
+    # Whether the fitness function is called in the simulation's process, so that wrappers of it (e.g. the
+    # EvolutionProfiler's timing) see every call.
+    in_process = True
+
+    def evaluate(self, agents: 'list[Agent]', fitness_func):
+        """ Set the fitness of every agent. """
+        for agent in agents:
+            agent.fitness = fitness_func(agent)
+
+    def close(self):
+        """ Release any resources held by the evaluator. """
+        pass
+
+
+SERIAL_EVALUATOR = Evaluator()
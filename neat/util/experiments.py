@@ -0,0 +1,188 @@
+"""
+Parallel multi-trial experiments: independent runs of the same generational simulation, each in a worker
+process with its own copy of the blueprint (id counters included) and its own seed. Copies leave behind the
+reporters and instrumentation attached to the blueprint, which belong to this process, and evaluators that
+can't be copied (Evaluator.copyable), which trials replace by serial evaluation. Results stream back as
+trials finish, and are aggregated into an ExperimentReport.
+"""
+
+from typing import *
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+import copy
+import json
+import multiprocessing
+import random
+import statistics
+import time
+import traceback
+
+from neat.blueprints.generational import GenerationalBP
+from neat.util.evaluation import SERIAL_EVALUATOR
+from neat.util.instrumentation import NULL_INSTRUMENTATION
+from neat.util.reporting import NULL_REPORTER
+
+
+@dataclass
+class TrialResult:
+    """ The outcome of one trial. """
+    trial: int
+    seed: int
+    success: bool  # Whether the fitness threshold was reached
+    generations: int  # Number of generations evaluated
+    wall_time: float  # Seconds
+    final_fitness: float  # Fitness of the fittest agent of the last generation
+    best_fitness: float  # Best fitness seen in any generation
+    error: str = None  # Traceback, if the trial raised
+
+
+@dataclass
+class ExperimentReport:
+    """ Aggregate statistics over a set of trials. """
+    results: 'list[TrialResult]'
+
+    def successes(self) -> 'list[TrialResult]':
+        return [r for r in self.results if r.success]
+
+    def summary(self) -> dict:
+        """ Return a JSON-able dict of aggregate statistics. """
+        completed = [r for r in self.results if r.error is None]
+        successes = self.successes()
+        generations = [r.generations for r in successes]
+        return {
+            "trials": len(self.results),
+            "errors": len(self.results) - len(completed),
+            "successes": len(successes),
+            "success_rate": len(successes) / len(completed) if completed else 0.0,
+            "mean_generations": statistics.mean(generations) if generations else None,
+            "median_generations": statistics.median(generations) if generations else None,
+            "mean_wall_time": statistics.mean(r.wall_time for r in completed) if completed else None,
+            "mean_best_fitness": statistics.mean(r.best_fitness for r in completed) if completed else None,
+        }
+
+    def __str__(self) -> str:
+        s = self.summary()
+        lines = [f"{s['successes']}/{s['trials']} trials succeeded ({s['errors']} errors)"]
+        if s["mean_generations"] is not None:
+            lines.append(f"Generations to success: mean {s['mean_generations']:.1f}, median {s['median_generations']:g}")
+        if s["mean_wall_time"] is not None:
+            lines.append(f"Mean trial time: {s['mean_wall_time']:.2f}s, mean best fitness: {s['mean_best_fitness']:.4f}")
+        return "\n".join(lines)
+
+
+def _isolated_copy(bp: GenerationalBP, counters: 'Tuple[int, int, int]') -> GenerationalBP:
+    """
+    Copy a blueprint, restoring its genome, node and species id counters to the given starting values.
+    Reporters and instrumentation are not copied but reset to their null defaults, as they would write to this
+    process's outputs; so is the evaluator if it can't be copied (e.g. it holds sockets or worker processes).
+    """
+    pop_bp = bp.population
+    null_attachments = {
+        id(SERIAL_EVALUATOR): SERIAL_EVALUATOR,
+        id(bp.reporter): NULL_REPORTER,
+        id(pop_bp.reporter): NULL_REPORTER,
+        id(bp.instrumentation): NULL_INSTRUMENTATION,
+        id(pop_bp.instrumentation): NULL_INSTRUMENTATION,
+        id(pop_bp.genome.instrumentation): NULL_INSTRUMENTATION,
+    }
+    if not bp.evaluator.copyable:
+        null_attachments[id(bp.evaluator)] = SERIAL_EVALUATOR
+    bp = copy.deepcopy(bp, memo=null_attachments)
+    bp.population.genome.set_next_id(counters[0])
+    bp.population.genome.node.set_next_id(counters[1])
+    bp.population.species.set_next_id(counters[2])
+    return bp
+
+
+def run_trial(bp: GenerationalBP, fitness_func, trial: int, seed: int, max_generations: int,
+              fitness_threshold: float = None) -> TrialResult:
+    """ Run one trial with the given blueprint and seed until the fitness threshold or max_generations. """
+    random.seed(seed)
+    start = time.perf_counter()
+    generations, final_fitness, best_fitness = 0, None, None
+    try:
+        population = bp.population.create()
+        while True:
+            bp.evaluate(population, fitness_func)
+            generations += 1
+            final_fitness = population.fittest.fitness
+            best_fitness = final_fitness if best_fitness is None else max(best_fitness, final_fitness)
+            if fitness_threshold is not None and final_fitness >= fitness_threshold:
+                return TrialResult(trial, seed, True, generations, time.perf_counter() - start, final_fitness, best_fitness)
+            if generations >= max_generations:
+                return TrialResult(trial, seed, False, generations, time.perf_counter() - start, final_fitness, best_fitness)
+            bp.next_generation(population)
+    except Exception:
+        return TrialResult(trial, seed, False, generations, time.perf_counter() - start, final_fitness, best_fitness,
+                           error=traceback.format_exc())
+
+
+_experiment = None  # Set in each worker process by _init_worker
+
+
+def _init_worker(experiment: 'ExperimentRunner', counters: 'Tuple[int, int, int]'):
+    # Passed as initializer arguments, which a forked worker inherits rather than unpickles
+    global _experiment
+    _experiment = (experiment, counters)
+
+
+def _run_isolated_trial(trial: int) -> TrialResult:
+    experiment, counters = _experiment
+    return run_trial(_isolated_copy(experiment.bp, counters), experiment.fitness_func, trial, experiment.seed + trial,
+                     experiment.max_generations, experiment.fitness_threshold)
+
+
+class ExperimentRunner:
+    """ Runs independent trials of a generational simulation in parallel processes. """
+
+    def __init__(self, bp: GenerationalBP, fitness_func, num_trials: int = 50, max_generations: int = 1000,
+                 fitness_threshold: float = None, num_workers: int = None, seed: int = 0, mp_context: str = None):
+        """
+        Trial i runs on a fresh copy of bp, seeded with seed + i. num_workers processes (one per CPU by default)
+        run trials concurrently; with num_workers=1 trials run serially in this process.
+        mp_context selects the multiprocessing start method; unless it is "fork", bp and fitness_func
+        must be picklable.
+        """
+        self.bp = bp
+        self.fitness_func = fitness_func
+        self.num_trials = num_trials
+        self.max_generations = max_generations
+        self.fitness_threshold = fitness_threshold
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.seed = seed
+        self.context = multiprocessing.get_context(mp_context)
+
+    def run(self, on_result: 'Callable[[TrialResult], None]' = None, results_path: str = None) -> ExperimentReport:
+        """
+        Run all trials. As each finishes, its result is passed to on_result and, if results_path is given,
+        appended to that file as a JSON line. Returns the report, with results in trial order.
+        """
+        pop_bp = self.bp.population
+        counters = (pop_bp.genome.get_next_id(), pop_bp.genome.node.get_next_id(), pop_bp.species.get_next_id())
+        out = open(results_path, "a") if results_path is not None else None
+        results = []
+
+        def collect(result: TrialResult):
+            results.append(result)
+            if out is not None:
+                out.write(json.dumps(asdict(result)) + "\n")
+                out.flush()
+            if on_result is not None:
+                on_result(result)
+
+        try:
+            if self.num_workers == 1:
+                _init_worker(self, counters)
+                for t in range(self.num_trials):
+                    collect(_run_isolated_trial(t))
+            else:
+                with ProcessPoolExecutor(self.num_workers, mp_context=self.context,
+                                         initializer=_init_worker, initargs=(self, counters)) as executor:
+                    futures = [executor.submit(_run_isolated_trial, t) for t in range(self.num_trials)]
+                    for future in as_completed(futures):
+                        collect(future.result())
+        finally:
+            if out is not None:
+                out.close()
+
+        return ExperimentReport(sorted(results, key=lambda r: r.trial))
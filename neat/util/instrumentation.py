@@ -0,0 +1,89 @@
+"""
+Lightweight per-generation instrumentation: wall time per phase and event counters.
+Blueprints hold NULL_INSTRUMENTATION by default, whose methods do nothing, so instrumentation costs
+one no-op method call per hook when disabled.
+"""
+
+from typing import *
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+import time
+
+
+@dataclass
+class GenerationStats:
+    """ Timings and counters recorded over one generation (or one realtime tick). """
+    generation: int
+    phase_times: 'dict[str, float]' = field(default_factory=dict)  # Seconds spent in each phase
+    counters: 'Counter[str]' = field(default_factory=Counter)
+
+    def total_time(self) -> float:
+        """ Returns total time spent in all recorded phases. """
+        return sum(self.phase_times.values())
+
+
+class Instrumentation:
+    """ Collects GenerationStats records and passes each finished record to its listeners. """
+
+    enabled = True
+
+    def __init__(self, history_size: int = 1000, listeners: 'Iterable[Callable[[GenerationStats], None]]' = ()):
+        self.current: Optional[GenerationStats] = None
+        self.history: 'deque[GenerationStats]' = deque(maxlen=history_size)
+        self.listeners = list(listeners)
+
+    def add_listener(self, listener: 'Callable[[GenerationStats], None]'):
+        """ Register a callable to receive every finished GenerationStats record. """
+        self.listeners.append(listener)
+
+    def begin(self, generation: int):
+        """ Start a record for the given generation, finishing any open record of another generation. """
+        if self.current is not None:
+            if self.current.generation == generation:
+                return
+            self.end()
+        self.current = GenerationStats(generation=generation)
+
+    def end(self) -> Optional[GenerationStats]:
+        """ Finish the open record, if any, and pass it to the listeners. """
+        stats, self.current = self.current, None
+        if stats is not None:
+            self.history.append(stats)
+            for listener in self.listeners:
+                listener(stats)
+        return stats
+
+    @contextmanager
+    def phase(self, name: str):
+        """ Context manager adding the wall time spent inside it to the named phase. """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.current is not None:
+                times = self.current.phase_times
+                times[name] = times.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name: str, n: int = 1):
+        """ Increment the named counter. """
+        if self.current is not None:
+            self.current.counters[name] += n
+
+
+class NullInstrumentation(Instrumentation):
+    """ Instrumentation that records nothing. """
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__(history_size=0)
+        self.__null_phase = nullcontext()
+
+    def begin(self, generation: int): pass
+    def end(self): return None
+    def phase(self, name: str): return self.__null_phase
+    def count(self, name: str, n: int = 1): pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
@@ -0,0 +1,219 @@
+"""
+Island-model evolution: several populations evolve in separate processes, each driven by its own copy of a
+GenerationalBP, and every migration_interval generations each island sends copies of its fittest genomes to
+its neighbours in a migration topology. Immigrants replace random offspring of the receiving island's next
+generation, joining their species until the next speciation.
+
+Migrants travel in the compact packing format. Every island draws genome, node and species ids from its own
+namespace (see set_id_namespace), so ids never collide across islands; as connection genes are keyed by node
+ids, structure evolved independently on different islands is never mistaken for homologous.
+Islands only wait for each other at migration points, so throughput scales with the number of cores.
+If an island fails (e.g. its fitness function raises, or its population goes extinct), all islands are stopped
+and the coordinator raises a RuntimeError with the island's traceback.
+"""
+
+from typing import *
+from dataclasses import dataclass
+import multiprocessing
+import queue
+import random
+import traceback
+
+from neat.model import Agent, Genome, Population
+from neat.blueprints.population import PopulationBP
+from neat.blueprints.generational import GenerationalBP
+from neat.util.packing import GenomePacker, PackedGenomes, dumps, loads
+
+
+ID_NAMESPACE_STRIDE = 1 << 40  # Ids available to each namespace
+_POLL_INTERVAL = 1.0  # Seconds between checks that islands are still alive while waiting for them
+
+
+def set_id_namespace(bp: PopulationBP, namespace: int):
+    """ Make the blueprint draw genome, node and species ids from the given namespace. """
+    base = namespace * ID_NAMESPACE_STRIDE
+    bp.genome.set_next_id(base + bp.genome.get_next_id() % ID_NAMESPACE_STRIDE)
+    bp.genome.node.set_next_id(base + bp.genome.node.get_next_id() % ID_NAMESPACE_STRIDE)
+    bp.species.set_next_id(base + bp.species.get_next_id() % ID_NAMESPACE_STRIDE)
+
+
+def make_topology(topology: 'Union[str, dict]', num_islands: int) -> 'dict[int, list[int]]':
+    """
+    Return a map from each island to the islands it sends migrants to.
+    topology is "ring" (to the next island), "full" (to every other island) or such a map itself.
+    """
+    if topology == "ring":
+        return {i: [(i + 1) % num_islands] for i in range(num_islands) if num_islands > 1}
+    if topology == "full":
+        return {i: [j for j in range(num_islands) if j != i] for i in range(num_islands)}
+    return {i: list(topology.get(i, ())) for i in range(num_islands)}
+
+
+@dataclass
+class IslandResult:
+    """ The outcome of one island's run. """
+    island: int
+    generations: int
+    best_fitness: float  # None if the island evaluated no generation
+    best_genome: Genome  # None if the island evaluated no generation
+
+
+# --------------- ISLAND PROCESS ---------------
+
+def _immigrate(population: Population, genomes: 'list[Genome]'):
+    """ Replace random offspring (never mascots) of a new generation with immigrants not already present. """
+    genomes = [g for g in genomes if g.id not in population.agents]
+    candidates = [a for a in population.agents.values()
+                  if a.fitness is None and population.species[a.species_id].mascot is not a]
+    for old, genome in zip(random.sample(candidates, min(len(genomes), len(candidates))), genomes):
+        species = population.species[old.species_id]
+        species.remove(old)
+        del population.agents[old.genome.id]
+        agent = Agent(genome=genome)
+        population.agents[genome.id] = agent
+        species.add(agent)
+
+
+def _run_island(index: int, bp: GenerationalBP, fitness_func, max_generations: int, fitness_threshold: float,
+                migration_interval: int, num_migrants: int, seed, inbox, outbox, stop):
+    try:
+        _evolve_island(index, bp, fitness_func, max_generations, fitness_threshold, migration_interval, num_migrants,
+                       seed, inbox, outbox, stop)
+    except Exception:
+        outbox.put(("error", index, None, traceback.format_exc()))
+
+
+def _evolve_island(index: int, bp: GenerationalBP, fitness_func, max_generations: int, fitness_threshold: float,
+                   migration_interval: int, num_migrants: int, seed, inbox, outbox, stop):
+    random.seed(seed)
+    set_id_namespace(bp.population, index)
+    packer = GenomePacker(bp.population.genome)
+    population = bp.population.create()
+    best = None
+    generations = 0
+
+    for _ in range(max_generations):
+        if stop.is_set():
+            break
+        bp.evaluate(population, fitness_func)
+        generations += 1
+        if best is None or population.fittest.fitness > best.fitness:
+            best = Agent(genome=population.fittest.genome, fitness=population.fittest.fitness)
+        outbox.put(("generation", index, population.ticks, population.fittest.fitness))
+        if fitness_threshold is not None and population.fittest.fitness >= fitness_threshold:
+            break
+
+        migrate = migration_interval > 0 and (population.ticks + 1) % migration_interval == 0
+        if migrate:
+            emigrants = sorted(population.agents.values(), key=lambda a: a.fitness, reverse=True)[:num_migrants]
+            meta, arrays = packer.pack(a.genome for a in emigrants).to_sections()
+            outbox.put(("migrants", index, population.ticks, dumps(meta, arrays)))
+
+        bp.next_generation(population)
+
+        if migrate:
+            payloads = inbox.get()
+            if payloads is None:
+                break
+            for payload in payloads:
+                _immigrate(population, packer.unpack(PackedGenomes.from_sections(*loads(payload))))
+
+    if best is None:
+        outbox.put(("done", index, generations, None, None))
+        return
+    meta, arrays = packer.pack([best.genome]).to_sections()
+    outbox.put(("done", index, generations, best.fitness, dumps(meta, arrays)))
+
+
+# --------------- COORDINATION ---------------
+
+class IslandModel:
+    """ Runs copies of a generational simulation as islands in separate processes; see neat.util.islands. """
+
+    def __init__(self, bp: GenerationalBP, num_islands: int = 4, migration_interval: int = 10, num_migrants: int = 2,
+                 topology: 'Union[str, dict]' = "ring", seed: int = None, mp_context: str = None):
+        """
+        Every island runs its own copy of bp. Island i is seeded with seed + i, or from OS entropy if seed is None.
+        mp_context selects the multiprocessing start method; unless it is "fork", bp and the fitness function
+        must be picklable.
+        """
+        self.bp = bp
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+        self.topology = make_topology(topology, num_islands)
+        self.seed = seed
+        self.context = multiprocessing.get_context(mp_context)
+        self.history: 'list[Tuple[int, int, float]]' = []  # (island, generation, best fitness) per generation
+
+    def run(self, fitness_func, max_generations: int = 100, fitness_threshold: float = None) -> 'list[IslandResult]':
+        """
+        Evolve all islands for up to max_generations each, stopping all of them once any island
+        reaches fitness_threshold. Returns the result of every island.
+        Raises a RuntimeError if any island fails or dies.
+        """
+        packer = GenomePacker(self.bp.population.genome)
+        stop = self.context.Event()
+        outbox = self.context.Queue()
+        inboxes = [self.context.Queue() for _ in range(self.num_islands)]
+        sources = {i: [j for j, targets in self.topology.items() if i in targets] for i in range(self.num_islands)}
+
+        processes = []
+        for i in range(self.num_islands):
+            seed = None if self.seed is None else self.seed + i
+            processes.append(self.context.Process(
+                target=_run_island, name=f"Island-{i}", daemon=True,
+                args=(i, self.bp, fitness_func, max_generations, fitness_threshold, self.migration_interval,
+                      self.num_migrants, seed, inboxes[i], outbox, stop)))
+        for p in processes:
+            p.start()
+
+        active = set(range(self.num_islands))
+        rounds: 'dict[int, dict[int, bytes]]' = {}  # Generation -> island -> packed emigrants
+        results = {}
+        try:
+            while active:
+                try:
+                    kind, index, generation, *data = outbox.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    for i in active:
+                        if not processes[i].is_alive():
+                            raise RuntimeError("Island {0} exited unexpectedly (exit code {1})".format(
+                                i, processes[i].exitcode))
+                    continue
+                if kind == "error":
+                    raise RuntimeError("Island {0} failed:\n{1}".format(index, data[0]))
+                if kind == "generation":
+                    self.history.append((index, generation, data[0]))
+                    if fitness_threshold is not None and data[0] >= fitness_threshold and not stop.is_set():
+                        stop.set()
+                        for inbox in inboxes:
+                            inbox.put(None)
+                elif kind == "migrants":
+                    rounds.setdefault(generation, {})[index] = data[0]
+                elif kind == "done":
+                    fitness, payload = data
+                    genome = None if payload is None else packer.unpack(PackedGenomes.from_sections(*loads(payload)))[0]
+                    results[index] = IslandResult(index, generation, fitness, genome)
+                    active.discard(index)
+
+                # Route every migration round all active islands have sent emigrants for
+                for gen in sorted(rounds):
+                    emigrants = rounds[gen]
+                    if not active.issubset(emigrants):
+                        break
+                    for i in active:
+                        inboxes[i].put([emigrants[j] for j in sources[i] if j in emigrants])
+                    del rounds[gen]
+        finally:
+            # Wake islands waiting for migrants, so that they stop too
+            stop.set()
+            for inbox in inboxes:
+                inbox.put(None)
+                inbox.cancel_join_thread()
+            for p in processes:
+                p.join(timeout=10)
+                if p.is_alive():
+                    p.terminate()
+
+        return [results[i] for i in sorted(results)]
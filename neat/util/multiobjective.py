@@ -0,0 +1,172 @@
+"""
+Multi-objective selection in the style of NSGA-II: agents are ranked by Pareto front, and within a front by
+crowding distance, which favours agents in sparsely populated regions of objective space. All objectives
+are maximized; objectives to be minimized (e.g. network size) are negated.
+
+Fronts are found with the efficient non-dominated sort of Zhang et al. (ENS-BS): agents are visited in
+lexicographic order, so that none can be dominated by a later one, and each is placed by binary search in
+the first front holding no agent that dominates it. Checking a front costs O(1) with two objectives and
+O(log n) with three (against the front's 2-D staircase); with more it is a vectorized comparison against
+the front's members. Unlike the naive O(m n^2) sort this stays fast for populations of 10k and more.
+"""
+
+from typing import *
+import bisect
+
+import numpy as np
+
+from neat.model import Agent
+from neat.nn.graphs import feed_forward_layers
+
+
+# --------------- OBJECTIVES ---------------
+
+def fitness_objective(agent: Agent) -> float:
+    """ The agent's fitness, as assigned by the fitness function. """
+    return agent.fitness
+
+
+def size_objective(agent: Agent) -> float:
+    """ Minimize genome size (nodes + connections). """
+    return -agent.genome.size()
+
+
+def depth_objective(input_ids, output_ids) -> 'Callable[[Agent], float]':
+    """ Minimize the number of sequential layers of the feed-forward network, a proxy for inference latency. """
+    def objective(agent: Agent) -> float:
+        conns = [k for k, c in agent.genome.conns.items() if c.enabled]
+        return -len(feed_forward_layers(input_ids, output_ids, conns))
+    return objective
+
+
+def objective_matrix(agents: 'Sequence[Agent]', objectives: 'Sequence[Callable[[Agent], float]]') -> np.ndarray:
+    """ Return the (len(agents), len(objectives)) array of every agent's objective values. """
+    return np.array([[f(a) for f in objectives] for a in agents], dtype=np.float64).reshape(len(agents), len(objectives))
+
+
+# --------------- SORTING ---------------
+
+def non_dominated_sort(objectives: np.ndarray) -> np.ndarray:
+    """
+    Return the Pareto front index (0 = non-dominated) of every row of the (n, m) objectives array.
+    A row dominates another if it is no worse in every objective and better in at least one.
+    """
+    F = np.asarray(objectives, dtype=np.float64)
+    n, m = F.shape
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    # Equal rows share a front. Visiting the distinct rows in descending lexicographic order, an earlier row
+    # dominates a later one iff it is no worse in objectives 1..m-1 (it can't be worse in objective 0)
+    rows, inverse = np.unique(F, axis=0, return_inverse=True)
+    rows = rows[::-1]
+    if m == 1:
+        ranks = np.arange(len(rows))
+    elif m == 2:
+        ranks = _sort_2d(rows)
+    elif m == 3:
+        ranks = _sort_3d(rows)
+    else:
+        ranks = _sort_nd(rows)
+    return ranks[::-1][inverse.reshape(n)]
+
+
+def _first_front(num_fronts: int, dominated: 'Callable[[int], bool]') -> int:
+    """ Binary search for the first front not dominating a row; fronts dominating it form a prefix. """
+    lo, hi = 0, num_fronts
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if dominated(mid):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _sort_2d(rows: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(rows), dtype=np.int64)
+    best = []  # Best second objective of each front
+    for i, f in enumerate(rows[:, 1].tolist()):
+        k = _first_front(len(best), lambda k: best[k] >= f)
+        if k == len(best):
+            best.append(f)
+        else:
+            best[k] = max(best[k], f)
+        ranks[i] = k
+    return ranks
+
+
+def _sort_3d(rows: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(rows), dtype=np.int64)
+    # The staircase of each front: its members not dominated in objectives 1 and 2,
+    # by ascending objective 1 (so descending objective 2)
+    stairs1: 'list[list[float]]' = []
+    stairs2: 'list[list[float]]' = []
+
+    def dominated(k: int, f1: float, f2: float) -> bool:
+        j = bisect.bisect_left(stairs1[k], f1)
+        return j < len(stairs2[k]) and stairs2[k][j] >= f2
+
+    for i, (f1, f2) in enumerate(rows[:, 1:].tolist()):
+        k = _first_front(len(stairs1), lambda k: dominated(k, f1, f2))
+        if k == len(stairs1):
+            stairs1.append([])
+            stairs2.append([])
+        s1, s2 = stairs1[k], stairs2[k]
+        # Drop the steps the new row covers: those just before it with no greater objective 2
+        hi = bisect.bisect_right(s1, f1)
+        lo = hi
+        while lo > 0 and s2[lo - 1] <= f2:
+            lo -= 1
+        s1[lo:hi] = [f1]
+        s2[lo:hi] = [f2]
+        ranks[i] = k
+    return ranks
+
+
+def _sort_nd(rows: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(rows), dtype=np.int64)
+    fronts: 'list[np.ndarray]' = []  # Members of each front (objectives 1..m-1), in a buffer grown by doubling
+    sizes: 'list[int]' = []
+    for i, f in enumerate(rows[:, 1:]):
+        k = _first_front(len(fronts), lambda k: bool((fronts[k][:sizes[k]] >= f).all(axis=1).any()))
+        if k == len(fronts):
+            fronts.append(np.empty((16, len(f))))
+            sizes.append(0)
+        elif sizes[k] == len(fronts[k]):
+            fronts[k] = np.concatenate((fronts[k], np.empty_like(fronts[k])))
+        fronts[k][sizes[k]] = f
+        sizes[k] += 1
+        ranks[i] = k
+    return ranks
+
+
+def crowding_distance(objectives: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """
+    Return the crowding distance of every row within its front: the sum over objectives of the normalized
+    gap between its neighbours. The extremes of every front get infinite distance.
+    """
+    F = np.asarray(objectives, dtype=np.float64)
+    n, m = F.shape
+    distance = np.zeros(n)
+    if n == 0:
+        return distance
+    for j in range(m):
+        order = np.lexsort((F[:, j], ranks))
+        f, r = F[order, j], ranks[order]
+        boundary = np.flatnonzero(r[1:] != r[:-1])
+        starts, ends = np.r_[0, boundary + 1], np.r_[boundary, n - 1]
+        span = np.repeat(f[ends] - f[starts], ends - starts + 1)
+
+        gap = np.zeros(n)
+        gap[1:-1] = f[2:] - f[:-2]
+        contribution = np.divide(gap, span, out=np.zeros(n), where=span > 0)
+        contribution[starts] = contribution[ends] = np.inf
+        distance[order] += contribution
+    return distance
+
+
+def crowded_order(objectives: np.ndarray) -> np.ndarray:
+    """ Return row indices best first: by ascending front, then descending crowding distance. """
+    ranks = non_dominated_sort(objectives)
+    return np.lexsort((-crowding_distance(objectives, ranks), ranks))
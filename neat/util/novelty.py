@@ -0,0 +1,274 @@
+"""
+Novelty search: agents are scored by how far their behavior descriptors lie from those of the rest of the
+population and of an archive of past novel behaviors, measured as the mean distance to the k nearest neighbors.
+
+The archive is indexed for k-nearest-neighbor queries with KD-trees kept in the logarithmic method's layout
+(Bentley-Saxe): new behaviors go to a small unindexed buffer, and whenever it fills up it is merged with all
+trees of at most its size into one new tree, so trees have power-of-two sizes and insertion costs O(log^2 n)
+amortized. The archive can be bounded, evicting the oldest or random entries, which are dropped from queries
+immediately and from the trees at the next rebuild.
+"""
+
+from typing import *
+import heapq
+import math
+import random
+
+import numpy as np
+
+from neat.model import Agent
+from neat.util.evaluation import Evaluator
+
+
+# --------------- SPATIAL INDEX ---------------
+
+class KDTree:
+    """ A static KD-tree over points of a shared array, answering k-nearest-neighbor queries. """
+
+    def __init__(self, points: np.ndarray, ids: np.ndarray, leaf_size: int = 16):
+        """ Index the rows ids of points. """
+        self.points = points
+        self.leaf_size = leaf_size
+        # Node arrays: split dimension (-1 for leaves), split value, children, and leaf ranges into self.ids
+        self.dims, self.values, self.left, self.right, self.start, self.end = [], [], [], [], [], []
+        self.ids = np.array(ids, dtype=np.int64)
+        if len(self.ids):
+            self.__build(0, len(self.ids))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __build(self, lo: int, hi: int) -> int:
+        node = len(self.dims)
+        for lst in (self.dims, self.values, self.left, self.right):
+            lst.append(-1)
+        self.start.append(lo)
+        self.end.append(hi)
+        if hi - lo <= self.leaf_size:
+            return node
+
+        # Split at the median of the dimension of widest spread
+        pts = self.points[self.ids[lo:hi]]
+        dim = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        mid = (hi - lo) // 2
+        order = np.argpartition(pts[:, dim], mid)
+        self.ids[lo:hi] = self.ids[lo:hi][order]
+        self.dims[node] = dim
+        self.values[node] = float(self.points[self.ids[lo + mid], dim])
+        self.left[node] = self.__build(lo, lo + mid)
+        self.right[node] = self.__build(lo + mid, hi)
+        return node
+
+    def query(self, x: np.ndarray, k: int, heap: list = None, alive: np.ndarray = None) -> list:
+        """
+        Find the k nearest indexed points to x, skipping ids for which alive is False.
+        Returns a heap of (-squared distance, id), merged into the given heap if any.
+        """
+        heap = [] if heap is None else heap
+        if not len(self.ids):
+            return heap
+        x_list = x.tolist()
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            dim = self.dims[node]
+            if dim < 0:
+                ids = self.ids[self.start[node]:self.end[node]]
+                if alive is not None:
+                    ids = ids[alive[ids]]
+                d2 = ((self.points[ids] - x) ** 2).sum(axis=1)
+                for d, i in zip(d2.tolist(), ids.tolist()):
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d, i))
+                    elif d < -heap[0][0]:
+                        heapq.heapreplace(heap, (-d, i))
+                continue
+
+            diff = x_list[dim] - self.values[node]
+            near, far = (self.left[node], self.right[node]) if diff < 0 else (self.right[node], self.left[node])
+            # Visit the far side only if it could hold points nearer than the current k-th nearest
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                stack.append(far)
+            stack.append(near)
+        return heap
+
+
+class BehaviorArchive:
+    """ A growing, optionally bounded archive of behavior descriptors indexed for k-nearest-neighbor queries. """
+
+    def __init__(self, dim: int, max_size: int = None, eviction: str = "oldest", buffer_size: int = 64,
+                 leaf_size: int = 16):
+        """ When max_size is reached, adding a behavior evicts the oldest or a random one (eviction="random"). """
+        assert eviction in ("oldest", "random"), "eviction must be 'oldest' or 'random'"
+        self.dim = dim
+        self.max_size = max_size
+        self.eviction = eviction
+        self.buffer_size = buffer_size
+        self.leaf_size = leaf_size
+
+        self.points = np.empty((1024, dim))  # Row i holds the behavior of archive entry i
+        self.alive = np.zeros(1024, dtype=bool)
+        self.num_points = 0
+        self.num_alive = 0
+        self.trees: 'list[KDTree]' = []
+        self.buffer: 'list[int]' = []
+        self.__oldest = 0
+
+    def __len__(self) -> int:
+        return self.num_alive
+
+    def add(self, behavior) -> int:
+        """ Add a behavior, evicting one first if the archive is full. Returns its entry id. """
+        if self.max_size is not None and self.num_alive >= self.max_size:
+            self.__evict()
+        if self.num_points == len(self.points):
+            self.points = np.concatenate((self.points, np.empty_like(self.points)))
+            self.alive = np.concatenate((self.alive, np.zeros_like(self.alive)))
+            for tree in self.trees:
+                tree.points = self.points
+
+        i = self.num_points
+        self.points[i] = behavior
+        self.alive[i] = True
+        self.num_points += 1
+        self.num_alive += 1
+
+        self.buffer.append(i)
+        if len(self.buffer) >= self.buffer_size:
+            self.__merge()
+        return i
+
+    def __evict(self):
+        if self.eviction == "oldest":
+            while not self.alive[self.__oldest]:
+                self.__oldest += 1
+            i = self.__oldest
+        else:
+            i = random.choice(np.flatnonzero(self.alive[:self.num_points]).tolist())
+        self.alive[i] = False
+        self.num_alive -= 1
+
+        # Rebuild once most indexed entries are dead, so queries don't wade through them
+        if self.num_points - self.num_alive > self.num_alive:
+            self.__rebuild()
+
+    def __merge(self):
+        """ Merge the buffer and all trees no larger than the result into one tree. """
+        ids = self.buffer
+        self.buffer = []
+        while self.trees and len(self.trees[-1]) <= len(ids):
+            ids = np.concatenate((self.trees.pop().ids, ids))
+        ids = np.asarray(ids, dtype=np.int64)
+        ids = ids[self.alive[ids]]
+        self.trees.append(KDTree(self.points, ids, self.leaf_size))
+
+    def __rebuild(self):
+        """ Compact the storage to live entries and rebuild the index as a single tree. """
+        live = np.flatnonzero(self.alive[:self.num_points])
+        n = len(live)
+        self.points[:n] = self.points[live]
+        self.alive[:] = False
+        self.alive[:n] = True
+        self.num_points = n
+        self.__oldest = 0
+        self.buffer = []
+        self.trees = [KDTree(self.points, np.arange(n), self.leaf_size)] if n else []
+
+    def query(self, x, k: int, heap: list = None) -> list:
+        """ Find the k nearest live behaviors to x. Returns a heap of (-squared distance, id). """
+        x = np.asarray(x, dtype=np.float64)
+        heap = [] if heap is None else heap
+        for tree in self.trees:
+            tree.query(x, k, heap, self.alive)
+        if self.buffer:
+            ids = np.asarray(self.buffer, dtype=np.int64)
+            ids = ids[self.alive[ids]]
+            for d, i in zip(((self.points[ids] - x) ** 2).sum(axis=1).tolist(), ids.tolist()):
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d, i))
+                elif d < -heap[0][0]:
+                    heapq.heapreplace(heap, (-d, i))
+        return heap
+
+    def get_behaviors(self) -> np.ndarray:
+        """ Return a copy of all live behaviors. """
+        return self.points[:self.num_points][self.alive[:self.num_points]].copy()
+
+
+# --------------- EVALUATION ---------------
+
+class NoveltyEvaluator(Evaluator):
+    """ Scores agents by novelty, optionally blended with their objective fitness; see neat.util.novelty. """
+
+    def __init__(self, archive: BehaviorArchive, k: int = 15, fitness_weight: float = 0.0,
+                 add_threshold: float = 1.0, max_adds: int = 5, threshold_step: float = 1.25):
+        """
+        The fitness function passed to evaluate must return (objective, behavior), the behavior being a
+        sequence of archive.dim floats. Agents' fitness becomes their novelty, or if fitness_weight > 0,
+        (1 - fitness_weight) * novelty + fitness_weight * objective, both min-max scaled over the generation.
+        Agents whose novelty reaches add_threshold join the archive; the threshold is raised by threshold_step
+        after a generation adding more than max_adds agents and lowered after one adding none.
+        """
+        self.archive = archive
+        self.k = k
+        self.fitness_weight = fitness_weight
+        self.add_threshold = add_threshold
+        self.max_adds = max_adds
+        self.threshold_step = threshold_step
+
+        self.objectives: 'dict[int, float]' = {}  # Genome id -> objective fitness, for the last evaluation
+        self.novelties: 'dict[int, float]' = {}  # Genome id -> novelty, for the last evaluation
+        self.best_objective: 'Tuple[float, Agent]' = None  # Best (objective, agent) over all evaluations
+
+    def get_novelty(self, behaviors: np.ndarray) -> np.ndarray:
+        """ Mean distance of each behavior to its k nearest neighbors among the others and the archive. """
+        n = len(behaviors)
+        # Population neighbors by brute force, which costs O(n^2) regardless; the archive is the part that grows
+        sq = (behaviors ** 2).sum(axis=1)
+        d2 = np.maximum(sq[:, None] + sq[None, :] - 2 * behaviors @ behaviors.T, 0.0)
+        np.fill_diagonal(d2, np.inf)
+        kp = min(self.k, n - 1)
+        nearest = np.partition(d2, kp - 1, axis=1)[:, :kp] if kp > 0 else np.empty((n, 0))
+
+        novelty = np.empty(n)
+        for i in range(n):
+            heap = [(-d, -1) for d in nearest[i].tolist()]
+            heapq.heapify(heap)
+            self.archive.query(behaviors[i], self.k, heap)
+            novelty[i] = sum(math.sqrt(-d) for d, _ in heap) / len(heap) if heap else 0.0
+        return novelty
+
+    def evaluate(self, agents: 'list[Agent]', fitness_func):
+        objectives, behaviors = [], []
+        for agent in agents:
+            objective, behavior = fitness_func(agent)
+            objectives.append(objective)
+            behaviors.append(behavior)
+        behaviors = np.asarray(behaviors, dtype=np.float64).reshape(len(agents), self.archive.dim)
+        novelty = self.get_novelty(behaviors)
+
+        # Grow the archive, adapting the threshold to keep additions in check
+        added = 0
+        for i in np.flatnonzero(novelty >= self.add_threshold).tolist():
+            self.archive.add(behaviors[i])
+            added += 1
+        if added > self.max_adds:
+            self.add_threshold *= self.threshold_step
+        elif added == 0:
+            self.add_threshold /= self.threshold_step
+
+        scores = novelty
+        if self.fitness_weight > 0:
+            def scaled(v):
+                v = np.asarray(v, dtype=np.float64)
+                span = v.max() - v.min()
+                return (v - v.min()) / span if span > 0 else np.zeros_like(v)
+            scores = (1 - self.fitness_weight) * scaled(novelty) + self.fitness_weight * scaled(objectives)
+
+        self.objectives, self.novelties = {}, {}
+        for agent, objective, nov, score in zip(agents, objectives, novelty.tolist(), scores.tolist()):
+            agent.fitness = score
+            self.objectives[agent.genome.id] = objective
+            self.novelties[agent.genome.id] = nov
+            if self.best_objective is None or objective > self.best_objective[0]:
+                self.best_objective = (objective, agent)
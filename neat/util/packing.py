@@ -0,0 +1,219 @@
+"""
+Compact binary packing of genomes into flat NumPy arrays, and a simple sectioned container format.
+Gene array layouts are derived from the gene blueprints, so user-defined gene blueprints pack too:
+primary keys are stored as int64, FloatBP attributes as float64, BoolBP attributes as bool and
+StringBP attributes as uint16 indices into a string table.
+"""
+
+from dataclasses import dataclass, fields
+from typing import *
+import json
+import struct
+
+import numpy as np
+
+from neat.model import Gene, Genome
+from neat.blueprints.primitives import BoolBP, StringBP
+from neat.blueprints.genes import GeneBP
+from neat.blueprints.genome import GenomeBP
+
+
+MAGIC = b"NEATPK01"
+ALIGN = 8
+
+
+# --------------- GENE LAYOUTS ---------------
+
+class GeneLayout:
+    """ Structured array layout for one type of gene, in the order of the gene constructor's fields. """
+
+    def __init__(self, gene_bp: GeneBP):
+        self.constructor = gene_bp.__constructor__
+        configs = dict(gene_bp.get_configs())
+
+        self.names = [f.name for f in fields(self.constructor)]
+        assert set(self.names) == set(gene_bp.__primary_keys__) | set(configs), \
+            "Gene constructor fields must be exactly the blueprint's primary keys and configurable attributes"
+
+        self.string_names = {k for k, cfg in configs.items() if isinstance(cfg, StringBP)}
+        self.dtype = np.dtype([(k, self.__field_dtype(configs.get(k))) for k in self.names])
+
+    @staticmethod
+    def __field_dtype(cfg) -> str:
+        if cfg is None:
+            return "<i8"  # Primary key
+        if isinstance(cfg, BoolBP):
+            return "?"
+        if isinstance(cfg, StringBP):
+            return "<u2"
+        return "<f8"
+
+    def pack(self, genes: 'list[Gene]', string_index: 'dict[str, int]') -> np.ndarray:
+        """ Pack genes into a structured array, adding any new strings to string_index. """
+        arr = np.empty(len(genes), dtype=self.dtype)
+        for k in self.names:
+            col = [getattr(g, k) for g in genes]
+            if k in self.string_names:
+                col = [string_index.setdefault(v, len(string_index)) for v in col]
+            arr[k] = col
+        return arr
+
+    def unpack(self, arr: np.ndarray, strings: 'list[str]') -> 'list[Gene]':
+        """ Unpack a structured array back into gene objects. """
+        cols = []
+        for k in self.names:
+            col = arr[k].tolist()
+            if k in self.string_names:
+                col = [strings[i] for i in col]
+            cols.append(col)
+        constructor = self.constructor
+        return [constructor(*row) for row in zip(*cols)]
+
+
+# --------------- PACKED GENOMES ---------------
+
+@dataclass
+class PackedGenomes:
+    """ A batch of genomes stored as flat gene arrays plus per-genome counts. """
+    ids: np.ndarray  # int64 genome ids
+    node_counts: np.ndarray  # uint32 number of node genes per genome
+    conn_counts: np.ndarray  # uint32 number of connection genes per genome
+    nodes: np.ndarray  # Structured array of all node genes, genome by genome
+    conns: np.ndarray  # Structured array of all connection genes, genome by genome
+    strings: 'list[str]'  # String table for StringBP attributes
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def node_offsets(self) -> np.ndarray:
+        """ Return start offsets of each genome's node genes (with a trailing total). """
+        return np.concatenate(([0], np.cumsum(self.node_counts, dtype=np.int64)))
+
+    def conn_offsets(self) -> np.ndarray:
+        """ Return start offsets of each genome's connection genes (with a trailing total). """
+        return np.concatenate(([0], np.cumsum(self.conn_counts, dtype=np.int64)))
+
+    def to_sections(self, prefix: str = "") -> 'Tuple[dict, dict[str, np.ndarray]]':
+        """ Return (meta, arrays) for writing with dumps(). """
+        arrays = {
+            prefix + "ids": self.ids,
+            prefix + "node_counts": self.node_counts,
+            prefix + "conn_counts": self.conn_counts,
+            prefix + "nodes": self.nodes,
+            prefix + "conns": self.conns,
+        }
+        return {prefix + "strings": self.strings}, arrays
+
+    @staticmethod
+    def from_sections(meta: dict, arrays: 'dict[str, np.ndarray]', prefix: str = "") -> 'PackedGenomes':
+        """ Rebuild from (meta, arrays) as returned by loads(). """
+        return PackedGenomes(
+            ids=arrays[prefix + "ids"],
+            node_counts=arrays[prefix + "node_counts"],
+            conn_counts=arrays[prefix + "conn_counts"],
+            nodes=arrays[prefix + "nodes"],
+            conns=arrays[prefix + "conns"],
+            strings=meta[prefix + "strings"])
+
+
+class GenomePacker:
+    """ Packs and unpacks genomes created from a given genome blueprint. """
+
+    def __init__(self, genome_bp: GenomeBP):
+        self.node_layout = GeneLayout(genome_bp.node)
+        self.conn_layout = GeneLayout(genome_bp.conn)
+
+    def pack(self, genomes: 'Iterable[Genome]', strings: 'list[str]' = None) -> PackedGenomes:
+        """ Pack genomes into flat arrays. An existing string table may be passed in to be extended. """
+        genomes = list(genomes)
+        string_index = {s: i for i, s in enumerate(strings or ())}
+
+        nodes, conns = [], []
+        for g in genomes:
+            nodes.extend(g.nodes.values())
+            conns.extend(g.conns.values())
+
+        return PackedGenomes(
+            ids=np.fromiter((g.id for g in genomes), dtype="<i8", count=len(genomes)),
+            node_counts=np.fromiter((len(g.nodes) for g in genomes), dtype="<u4", count=len(genomes)),
+            conn_counts=np.fromiter((len(g.conns) for g in genomes), dtype="<u4", count=len(genomes)),
+            nodes=self.node_layout.pack(nodes, string_index),
+            conns=self.conn_layout.pack(conns, string_index),
+            strings=list(string_index))
+
+    def unpack(self, packed: PackedGenomes) -> 'list[Genome]':
+        """ Unpack all genomes. """
+        nodes = self.node_layout.unpack(packed.nodes, packed.strings)
+        conns = self.conn_layout.unpack(packed.conns, packed.strings)
+
+        genomes = []
+        n = c = 0
+        for gid, nn, nc in zip(packed.ids.tolist(), packed.node_counts.tolist(), packed.conn_counts.tolist()):
+            genomes.append(Genome(
+                id=gid,
+                nodes={g.id: g for g in nodes[n:n + nn]},
+                conns={g.key: g for g in conns[c:c + nc]}))
+            n += nn
+            c += nc
+        return genomes
+
+    def unpack_one(self, packed: PackedGenomes, i: int) -> Genome:
+        """ Unpack only the i-th genome. """
+        n0, c0 = int(packed.node_counts[:i].sum()), int(packed.conn_counts[:i].sum())
+        n1, c1 = n0 + int(packed.node_counts[i]), c0 + int(packed.conn_counts[i])
+        return self.unpack_genome(int(packed.ids[i]), packed.nodes[n0:n1], packed.conns[c0:c1], packed.strings)
+
+    def unpack_genome(self, gid: int, nodes: np.ndarray, conns: np.ndarray, strings: 'list[str]') -> Genome:
+        """ Unpack a single genome from its own slices of the node and connection arrays. """
+        return Genome(
+            id=gid,
+            nodes={g.id: g for g in self.node_layout.unpack(nodes, strings)},
+            conns={g.key: g for g in self.conn_layout.unpack(conns, strings)})
+
+
+# --------------- SECTIONED CONTAINER ---------------
+
+def _pad(n: int) -> int:
+    return -n % ALIGN
+
+
+def dumps(meta: dict, arrays: 'dict[str, np.ndarray]') -> bytes:
+    """
+    Serialize a JSON-able meta dict and named arrays.
+    Layout: MAGIC, uint64 header length, JSON header, then each array's raw bytes, all 8-byte aligned.
+    """
+    index, offset = [], 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        index.append([name, np.lib.format.dtype_to_descr(arr.dtype), list(arr.shape), offset])
+        offset += arr.nbytes + _pad(arr.nbytes)
+
+    header = json.dumps({"meta": meta, "arrays": index}).encode()
+    header += b" " * _pad(len(MAGIC) + 8 + len(header))
+
+    parts = [MAGIC, struct.pack("<Q", len(header)), header]
+    for arr in arrays.values():
+        data = np.ascontiguousarray(arr).tobytes()
+        parts.append(data)
+        parts.append(b"\0" * _pad(len(data)))
+    return b"".join(parts)
+
+
+def loads(buf) -> 'Tuple[dict, dict[str, np.ndarray]]':
+    """ Deserialize (meta, arrays) from a bytes-like object. Arrays are views into buf, not copies. """
+    buf = memoryview(buf)
+    if bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a packed NEAT file")
+
+    (header_len,) = struct.unpack_from("<Q", buf, len(MAGIC))
+    start = len(MAGIC) + 8
+    header = json.loads(bytes(buf[start:start + header_len]))
+    start += header_len
+
+    arrays = {}
+    for name, descr, shape, offset in header["arrays"]:
+        dtype = np.lib.format.descr_to_dtype(descr)
+        count = int(np.prod(shape, dtype=np.int64))
+        arr = np.frombuffer(buf, dtype=dtype, count=count, offset=start + offset)
+        arrays[name] = arr.reshape(shape)
+    return header["meta"], arrays
@@ -0,0 +1,166 @@
+"""
+Opt-in profiling of a generational simulation, separating time spent in user fitness code from framework overhead.
+
+Two modes are available:
+    "cprofile"  deterministic profiling with cProfile; dumps .pstats files
+    "sampling"  a background thread samples the simulation thread's stack every interval seconds;
+                dumps flamegraph-compatible collapsed stacks ("frame;frame;frame count" per line)
+In both modes, the wall time of each generation and the time spent inside fitness_func calls are
+recorded per generation, and everything aggregated since the last dump is written every dump_every generations.
+"""
+
+from typing import *
+from collections import Counter
+from dataclasses import dataclass, asdict
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+
+
+@dataclass
+class GenerationProfile:
+    """ Time split of one generation. """
+    generation: int
+    wall_time: float  # Seconds for evaluation plus creating the next generation
+    fitness_time: float  # Seconds spent inside fitness_func calls
+    fitness_calls: int
+
+    @property
+    def framework_time(self) -> float:
+        return self.wall_time - self.fitness_time
+
+    @property
+    def fitness_share(self) -> float:
+        return self.fitness_time / self.wall_time if self.wall_time > 0 else 0.0
+
+
+class EvolutionProfiler:
+    """ Profiles generations of a simulation; see GenerationalBP.run(profiler=...). """
+
+    def __init__(self, out_dir: str, mode: str = "sampling", dump_every: int = 10, interval: float = 0.005):
+        assert mode in ("cprofile", "sampling"), "mode must be 'cprofile' or 'sampling'"
+        self.out_dir = out_dir
+        self.mode = mode
+        self.dump_every = dump_every
+        self.interval = interval  # Seconds between stack samples (sampling mode)
+
+        self.generations: 'list[GenerationProfile]' = []
+        self.__pending: 'list[GenerationProfile]' = []
+        self.__fitness_time = 0.0
+        self.__fitness_calls = 0
+        self.__start = None
+
+        self.__profile = None
+        self.__samples = Counter()
+        self.__samples_lock = threading.Lock()  # Guards __samples between the sampler thread and dump()
+        self.__sampling = threading.Event()
+        self.__sampler = None
+        self.__target_thread = None
+
+        os.makedirs(out_dir, exist_ok=True)
+
+    # Fitness wrapping
+
+    def wrap_fitness(self, fitness_func):
+        """
+        Return fitness_func wrapped to accumulate time spent in it.
+        Only calls made in this process are measured, so evaluators that call fitness_func in other processes
+        (DistributedEvaluator, SharedMemoryEvaluator) can't be profiled; GenerationalBP.run refuses them.
+        """
+        def profiled_fitness_func(agent):
+            start = time.perf_counter()
+            try:
+                return fitness_func(agent)
+            finally:
+                self.__fitness_time += time.perf_counter() - start
+                self.__fitness_calls += 1
+        return profiled_fitness_func
+
+    # Generation boundaries
+
+    def start_generation(self, generation: int):
+        """ Start profiling a generation. """
+        self.__fitness_time, self.__fitness_calls = 0.0, 0
+        if self.mode == "cprofile":
+            if self.__profile is None:
+                self.__profile = cProfile.Profile()
+            self.__profile.enable()
+        else:
+            self.__start_sampler()
+        self.__start = time.perf_counter()
+
+    def end_generation(self, generation: int) -> GenerationProfile:
+        """ Stop profiling a generation, dumping aggregated results every dump_every generations. """
+        wall_time = time.perf_counter() - self.__start
+        if self.mode == "cprofile":
+            self.__profile.disable()
+        else:
+            self.__sampling.clear()
+
+        profile = GenerationProfile(generation, wall_time, self.__fitness_time, self.__fitness_calls)
+        self.generations.append(profile)
+        self.__pending.append(profile)
+        if len(self.__pending) >= self.dump_every:
+            self.dump()
+        return profile
+
+    # Sampling
+
+    def __start_sampler(self):
+        self.__target_thread = threading.get_ident()
+        self.__sampling.set()
+        if self.__sampler is None or not self.__sampler.is_alive():
+            self.__sampler = threading.Thread(target=self.__sample_loop, name="EvolutionProfiler", daemon=True)
+            self.__sampler.start()
+
+    def __sample_loop(self):
+        while True:
+            self.__sampling.wait()
+            time.sleep(self.interval)
+            if not self.__sampling.is_set():
+                continue
+            frame = sys._current_frames().get(self.__target_thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                with self.__samples_lock:
+                    self.__samples[";".join(reversed(stack))] += 1
+
+    # Output
+
+    def dump(self):
+        """ Write everything aggregated since the last dump, and start aggregating afresh. """
+        if not self.__pending:
+            return
+        first, last = self.__pending[0].generation, self.__pending[-1].generation
+        name = os.path.join(self.out_dir, f"gen-{first:06d}-{last:06d}")
+
+        if self.mode == "cprofile" and self.__profile is not None:
+            self.__profile.dump_stats(name + ".pstats")
+            self.__profile = None
+        elif self.mode == "sampling":
+            with self.__samples_lock:
+                samples, self.__samples = self.__samples, Counter()
+            with open(name + ".collapsed", "w") as f:
+                for stack, count in samples.most_common():
+                    f.write(f"{stack} {count}\n")
+
+        with open(os.path.join(self.out_dir, "generations.jsonl"), "a") as f:
+            for p in self.__pending:
+                f.write(json.dumps(dict(asdict(p), framework_time=p.framework_time, fitness_share=p.fitness_share)) + "\n")
+        self.__pending.clear()
+
+    def close(self):
+        """ Stop profiling any unfinished generation, and dump everything aggregated since the last dump. """
+        if self.mode == "cprofile":
+            if self.__profile is not None:
+                self.__profile.disable()
+        else:
+            self.__sampling.clear()
+        self.dump()
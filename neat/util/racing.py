@@ -0,0 +1,109 @@
+"""
+Racing evaluation for noisy fitness: the fitness function is treated as one noisy episode, and instead of
+averaging a fixed number of episodes for every agent, all agents start with a few episodes and only those
+still in contention get more, up to max_episodes. Agents race within their species, as reproduction selects
+within species: in each, the agents that may still be among its top max(num_survivors,
+ceil(survival_threshold * size)) stay in contention, so set these to at least the simulation's elitism and
+survival_threshold. Two elimination rules are available:
+    "confidence"  after each round, drop agents whose upper confidence bound is below the lower confidence
+                  bound of the last agent to keep, and multiply the budget by eta
+    "halving"     successive halving: after each round, keep the best 1/eta of agents by mean score (and at
+                  least those to keep), and multiply the episode budget by eta
+Every agent's fitness is the mean of the episodes it was given. Agents dropped early get rougher estimates,
+biased downwards: they are dropped precisely because their first episodes went badly, whether by merit or by
+bad luck. Species' adjusted fitnesses, being averaged over all members, are biased downwards too, about
+equally for similar species. The agents selected from each species get the full budget.
+
+Savings depend on how noisy episodes are compared to how much agents differ. On a 150-agent task in 10 species
+(keeping the top 20% of each), confidence racing selected each species' top agents as well as a full 32-episode
+budget in 1.8x fewer episodes when episode noise was as large as the spread of agents' true fitness, 2.5x at half
+that and 3.1x at a quarter. Halving saved 3.6x throughout, but selected less reliably (0.80 vs 0.87 of the top
+agents at the highest noise). Savings are bounded by the agents kept in contention, which all get the full
+budget: 3.8x in this setting. So the 3-10x savings sought for racing are only met with low noise, or by
+keeping fewer agents per species.
+"""
+
+from typing import *
+import math
+import statistics
+
+from neat.model import Agent
+from neat.util.evaluation import Evaluator
+
+
+class RacingEvaluator(Evaluator):
+    """ Evaluates agents on a growing number of episodes, dropping hopeless agents early; see neat.util.racing. """
+
+    def __init__(self, min_episodes: int = 2, max_episodes: int = 32, eta: float = 2.0, num_survivors: int = 2,
+                 survival_threshold: float = 0.2, mode: str = "confidence", z: float = 1.96):
+        """
+        Every agent gets min_episodes episodes; in each species, at least the top max(num_survivors,
+        ceil(survival_threshold * size)) agents get max_episodes. survival_threshold may be None to only keep
+        num_survivors. z is the number of standard errors in confidence bounds (confidence mode).
+        """
+        assert mode in ("halving", "confidence"), "mode must be 'halving' or 'confidence'"
+        assert num_survivors >= 1, "num_survivors must be positive"
+        assert survival_threshold is None or 0 < survival_threshold <= 1, "survival_threshold must be in (0, 1]"
+        assert 1 <= min_episodes <= max_episodes and eta > 1
+        self.min_episodes = min_episodes
+        self.max_episodes = max_episodes
+        self.eta = eta
+        self.num_survivors = num_survivors
+        self.survival_threshold = survival_threshold
+        self.mode = mode
+        self.z = z
+
+        self.last_episodes = 0  # Episodes run in the last evaluation
+        self.total_episodes = 0
+
+    def get_num_survivors(self, species_size: int) -> int:
+        """ The number of agents of a species of the given size that get the full episode budget. """
+        if self.survival_threshold is None:
+            return self.num_survivors
+        return max(self.num_survivors, int(math.ceil(self.survival_threshold * species_size)))
+
+    def evaluate(self, agents: 'list[Agent]', fitness_func):
+        species = {}
+        for agent in agents:
+            species.setdefault(agent.species_id, []).append(agent)
+        races = [(members, self.get_num_survivors(len(members))) for members in species.values()]
+
+        scores = {id(a): [] for a in agents}
+        budget = self.min_episodes
+        episodes = 0
+
+        while True:
+            for alive, _ in races:
+                for agent in alive:
+                    s = scores[id(agent)]
+                    while len(s) < budget:
+                        s.append(fitness_func(agent))
+                        episodes += 1
+            if budget >= self.max_episodes:
+                break
+            races = [(self.__eliminate(alive, scores, n) if len(alive) > n else alive, n) for alive, n in races]
+            budget = min(self.max_episodes, int(math.ceil(budget * self.eta)))
+
+        for agent in agents:
+            agent.fitness = statistics.fmean(scores[id(agent)])
+        self.last_episodes = episodes
+        self.total_episodes += episodes
+
+    def __eliminate(self, alive: 'list[Agent]', scores: dict, num_survivors: int) -> 'list[Agent]':
+        """ Return the agents of a species still in contention for its top num_survivors. """
+        means = {id(a): statistics.fmean(scores[id(a)]) for a in alive}
+        ranked = sorted(alive, key=lambda a: means[id(a)], reverse=True)
+        if self.mode == "halving":
+            return ranked[:max(num_survivors, int(math.ceil(len(alive) / self.eta)))]
+
+        def half_width(a: Agent) -> float:
+            s = scores[id(a)]
+            return self.z * statistics.stdev(s) / math.sqrt(len(s)) if len(s) > 1 else math.inf
+
+        # The lower bound a contender must beat: that of the num_survivors-th best agent
+        threshold = sorted((means[id(a)] - half_width(a) for a in alive), reverse=True)[num_survivors - 1]
+        return [a for a in ranked if means[id(a)] + half_width(a) >= threshold]
+
+    def full_budget_episodes(self, num_agents: int) -> int:
+        """ The number of episodes a fixed max_episodes budget would cost, for comparison. """
+        return num_agents * self.max_episodes
@@ -0,0 +1,196 @@
+"""
+Reporter hooks for simulation events, replacing print() calls in the evolution loop.
+Blueprints hold NULL_REPORTER by default, whose hooks do nothing.
+"""
+
+from typing import *
+import json
+import sys
+
+from neat.model import Agent, Population, Species
+from neat.util.instrumentation import GenerationStats
+
+
+class Reporter:
+    """ Base class for reporters. Every hook is a no-op; override the ones of interest. """
+
+    def start_generation(self, population: Population):
+        """ Called before a generation is evaluated. """
+
+    def post_evaluate(self, population: Population):
+        """ Called after a generation is evaluated and fitnesses are assigned. """
+
+    def end_generation(self, population: Population, stats: Optional[GenerationStats]):
+        """ Called after the next generation is created. stats is None unless instrumentation is enabled. """
+
+    def tick(self, population: Population, stats: Optional[GenerationStats]):
+        """
+        Called after every realtime simulation tick, so should be cheap. Realtime simulations call the generation
+        hooks only every pop_size replacements. stats is None unless instrumentation is enabled.
+        """
+
+    def replacement(self, population: Population, removed: Agent, child: Agent):
+        """ Called when a realtime simulation replaces an agent with a new offspring. """
+
+    def reorganization(self, population: Population):
+        """ Called when a realtime simulation reassigns agents to species. """
+
+    def extinction(self, population: Population):
+        """ Called when the population is reset on total extinction. """
+
+    def species_created(self, population: Population, species: Species):
+        """ Called when a new species is created. """
+
+    def species_removed(self, population: Population, species: Species):
+        """ Called when a species is removed, e.g. due to stagnation. """
+
+    def close(self):
+        """ Flush and release any resources held by the reporter. """
+
+
+NULL_REPORTER = Reporter()
+
+
+class ReporterSet(Reporter):
+    """ Forwards every event to a list of reporters. """
+
+    def __init__(self, reporters: 'Iterable[Reporter]' = ()):
+        self.reporters = list(reporters)
+
+    def add(self, reporter: Reporter):
+        self.reporters.append(reporter)
+
+    def start_generation(self, population):
+        for r in self.reporters: r.start_generation(population)
+
+    def post_evaluate(self, population):
+        for r in self.reporters: r.post_evaluate(population)
+
+    def end_generation(self, population, stats):
+        for r in self.reporters: r.end_generation(population, stats)
+
+    def tick(self, population, stats):
+        for r in self.reporters: r.tick(population, stats)
+
+    def replacement(self, population, removed, child):
+        for r in self.reporters: r.replacement(population, removed, child)
+
+    def reorganization(self, population):
+        for r in self.reporters: r.reorganization(population)
+
+    def extinction(self, population):
+        for r in self.reporters: r.extinction(population)
+
+    def species_created(self, population, species):
+        for r in self.reporters: r.species_created(population, species)
+
+    def species_removed(self, population, species):
+        for r in self.reporters: r.species_removed(population, species)
+
+    def close(self):
+        for r in self.reporters: r.close()
+
+
+# --------------- INCLUDED REPORTERS ---------------
+
+class StdOutReporter(Reporter):
+    """ Prints human-readable progress, buffering lines and writing them once per generation. """
+
+    def __init__(self, verbose_species: bool = False, max_buffered_lines: int = 1000, stream=None):
+        self.verbose_species = verbose_species  # Also report species creation and removal
+        self.max_buffered_lines = max_buffered_lines
+        self.stream = stream
+        self.__lines = []
+
+    def __write(self, line: str):
+        self.__lines.append(line)
+        if len(self.__lines) >= self.max_buffered_lines:
+            self.flush()
+
+    def flush(self):
+        """ Write buffered lines. """
+        if self.__lines:
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(self.__lines) + "\n")
+            stream.flush()
+            self.__lines.clear()
+
+    def start_generation(self, population):
+        self.__write(f"Generation {population.ticks}")
+
+    def post_evaluate(self, population):
+        self.__write(f"Best fitness: {population.fittest.fitness} Avg: {population.get_average_fitness()}")
+        self.__write(f"Species: {len(population.species)}")
+
+    def end_generation(self, population, stats):
+        if stats is not None:
+            phases = ", ".join(f"{k} {v * 1000:.1f}ms" for k, v in stats.phase_times.items())
+            self.__write(f"Generation time: {stats.total_time() * 1000:.1f}ms ({phases})")
+        self.flush()
+
+    def replacement(self, population, removed, child):
+        self.__write("Replacement")
+
+    def reorganization(self, population):
+        self.__write("Reorganization")
+
+    def extinction(self, population):
+        self.__write("Reset on total extinction")
+
+    def species_created(self, population, species):
+        if self.verbose_species:
+            self.__write(f"Species {species.id} created")
+
+    def species_removed(self, population, species):
+        if self.verbose_species:
+            self.__write(f"Species {species.id} removed")
+
+    def close(self):
+        self.flush()
+
+
+class JsonLinesReporter(Reporter):
+    """ Writes one JSON object per event to a file. """
+
+    def __init__(self, path: str):
+        self.__file = open(path, "a", buffering=1 << 16)
+
+    def __write(self, event: str, population: Population, **fields):
+        fields.update(event=event, generation=population.ticks)
+        self.__file.write(json.dumps(fields) + "\n")
+
+    def start_generation(self, population):
+        self.__write("start_generation", population)
+
+    def post_evaluate(self, population):
+        self.__write("post_evaluate", population,
+                     best_fitness=population.fittest.fitness,
+                     mean_fitness=population.get_average_fitness(),
+                     num_agents=len(population.agents),
+                     num_species=len(population.species),
+                     species_sizes={s.id: s.size() for s in population.species.values()})
+
+    def end_generation(self, population, stats):
+        fields = {}
+        if stats is not None:
+            fields.update(phase_times=stats.phase_times, counters=stats.counters)
+        self.__write("end_generation", population, **fields)
+        self.__file.flush()
+
+    def replacement(self, population, removed, child):
+        self.__write("replacement", population, removed=removed.genome.id, child=child.genome.id)
+
+    def reorganization(self, population):
+        self.__write("reorganization", population, num_species=len(population.species))
+
+    def extinction(self, population):
+        self.__write("extinction", population)
+
+    def species_created(self, population, species):
+        self.__write("species_created", population, species=species.id)
+
+    def species_removed(self, population, species):
+        self.__write("species_removed", population, species=species.id)
+
+    def close(self):
+        self.__file.close()
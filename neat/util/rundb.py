@@ -0,0 +1,192 @@
+"""
+SQLite-backed store for run statistics: per-generation population stats, species sizes and fitness history,
+and optionally the champion genome of each generation.
+Stats are snapshotted on the calling thread and written by a background thread, one transaction per generation,
+so logging never blocks the evolution loop on disk I/O.
+"""
+
+from typing import *
+import queue
+import sqlite3
+import threading
+import time
+
+from neat.model import Population
+from neat.blueprints.population import PopulationBP
+from neat.util.packing import GenomePacker, dumps, loads, PackedGenomes
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    generation INTEGER PRIMARY KEY,
+    time REAL,
+    num_agents INTEGER,
+    num_species INTEGER,
+    compat_threshold REAL,
+    best_fitness REAL,
+    mean_fitness REAL,
+    worst_fitness REAL
+);
+CREATE TABLE IF NOT EXISTS species (
+    generation INTEGER,
+    species_id INTEGER,
+    size INTEGER,
+    fitness REAL,
+    adjusted_fitness REAL,
+    best_fitness REAL,
+    created_at INTEGER,
+    last_improved INTEGER,
+    PRIMARY KEY (generation, species_id)
+);
+CREATE TABLE IF NOT EXISTS champions (
+    generation INTEGER PRIMARY KEY,
+    genome_id INTEGER,
+    fitness REAL,
+    genome BLOB
+);
+"""
+
+
+class RunDatabase:
+    """
+    Writes run statistics to a local SQLite file from a background thread.
+    Pass it to GenerationalBP.run(run_db=...) to record every evaluated generation.
+    """
+
+    def __init__(self, path: str, population_bp: PopulationBP, store_champions: bool = False, max_pending: int = 1000):
+        """
+        population_bp must be the blueprint of the recorded run: species fitness is measured with its
+        species_fitness_func, and champion genomes are packed with its genome blueprint.
+        If store_champions is set, the champion genome of every recorded generation is stored as well.
+        At most max_pending generations are queued before record() blocks.
+        """
+        self.path = path
+        self.population_bp = population_bp
+        self.packer = GenomePacker(population_bp.genome) if store_champions else None
+
+        self.__queue = queue.Queue(maxsize=max_pending)
+        self.__error = None
+        self.__thread = threading.Thread(target=self.__write_loop, name="RunDatabase", daemon=True)
+
+        # Create the schema up front so that errors surface in the caller
+        with sqlite3.connect(path) as conn:
+            conn.executescript(SCHEMA)
+        conn.close()
+
+        self.__thread.start()
+
+    # Writer thread
+
+    def __write_loop(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        while True:
+            item = self.__queue.get()
+            try:
+                if item is None:
+                    break
+                generation, species, champion = item
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO generations VALUES (?, ?, ?, ?, ?, ?, ?, ?)", generation)
+                    conn.executemany("INSERT OR REPLACE INTO species VALUES (?, ?, ?, ?, ?, ?, ?, ?)", species)
+                    if champion is not None:
+                        conn.execute("INSERT OR REPLACE INTO champions VALUES (?, ?, ?, ?)", champion)
+            except Exception as e:
+                # Keep consuming the queue, so flush() doesn't block; the error is raised on flush/close
+                self.__error = e
+            finally:
+                self.__queue.task_done()
+        conn.close()
+
+    # Recording
+
+    def record(self, population: Population):
+        """
+        Snapshot the stats of an evaluated population and queue them for writing.
+        Pre-condition: agents' fitnesses must be populated.
+        """
+        if self.__error is not None:
+            raise self.__error
+
+        fitnesses = [a.fitness for a in population.agents.values()]
+        generation = (
+            population.ticks,
+            time.time(),
+            len(population.agents),
+            len(population.species),
+            population.compat_threshold,
+            max(fitnesses),
+            sum(fitnesses) / len(fitnesses),
+            min(fitnesses),
+        )
+
+        species = []
+        for s in population.species.values():
+            fitness, best_fitness, last_improved = self.__species_fitness(s, population.ticks)
+            species.append((population.ticks, s.id, s.size(), fitness, s.adjusted_fitness, best_fitness,
+                            s.created_at, last_improved))
+
+        champion = None
+        if self.packer is not None and population.fittest is not None:
+            meta, arrays = self.packer.pack([population.fittest.genome]).to_sections()
+            champion = (population.ticks, population.fittest.genome.id, population.fittest.fitness, dumps(meta, arrays))
+
+        self.__queue.put((generation, species, champion))
+
+    def __species_fitness(self, species, ticks: int) -> 'Tuple[float, float, int]':
+        """
+        Return (fitness, best fitness, last improved) of a species for the evaluated generation.
+        The stagnation check only updates these after recording, so compute them from the current members alike.
+        """
+        fitness = self.population_bp.species.get_species_fitness(species)
+        best, last_improved = species.best_fitness, species.last_improved
+        if best is None or fitness > best:
+            best, last_improved = fitness, ticks
+        return fitness, best, last_improved
+
+    # Reading
+
+    def get_champion(self, generation: int):
+        """ Load the champion genome stored for a generation, or None. """
+        self.flush()
+        with sqlite3.connect(self.path) as conn:
+            row = conn.execute("SELECT genome FROM champions WHERE generation = ?", (generation,)).fetchone()
+        conn.close()
+        if row is None or self.packer is None:
+            return None
+        meta, arrays = loads(row[0])
+        return self.packer.unpack(PackedGenomes.from_sections(meta, arrays))[0]
+
+    def get_species_history(self, species_id: int) -> 'list[Tuple[int, int, float]]':
+        """ Return (generation, size, fitness) rows for a species. """
+        self.flush()
+        with sqlite3.connect(self.path) as conn:
+            rows = conn.execute(
+                "SELECT generation, size, fitness FROM species WHERE species_id = ? ORDER BY generation",
+                (species_id,)).fetchall()
+        conn.close()
+        return rows
+
+    # Lifecycle
+
+    def flush(self):
+        """ Block until all queued generations are written. """
+        self.__queue.join()
+        if self.__error is not None:
+            raise self.__error
+
+    def close(self):
+        """ Write all queued generations and stop the writer thread. """
+        if self.__thread.is_alive():
+            self.__queue.put(None)
+            self.__thread.join()
+        if self.__error is not None:
+            raise self.__error
+
+    def __enter__(self) -> 'RunDatabase':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
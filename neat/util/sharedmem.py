@@ -0,0 +1,217 @@
+"""
+Multi-process evaluation without pickling genomes: each generation is packed once into a shared memory block
+(the packing format's node and connection arrays, per-genome offset tables and a fitness array), which worker
+processes attach to and read as NumPy views. Tasks are just index ranges, and workers write fitnesses straight
+into the shared fitness array, so only a short completion message travels back per task.
+"""
+
+from typing import *
+from multiprocessing import resource_tracker, shared_memory
+import math
+import multiprocessing
+import os
+import queue
+import traceback
+
+import numpy as np
+
+from neat.model import Agent, Genome
+from neat.blueprints.genome import GenomeBP
+from neat.util.evaluation import Evaluator
+from neat.util.packing import GenomePacker, dumps, loads
+
+
+class SharedGenomeBuffer:
+    """ A batch of packed genomes in a shared memory block, reused across batches and grown as needed. """
+
+    def __init__(self, packer: GenomePacker):
+        self.packer = packer
+        self.shm = None
+        self.size = 0  # Bytes in use
+        self.version = 0  # Incremented on every write, so readers know when to re-read the header
+
+    def write(self, genomes: 'Iterable[Genome]') -> 'Tuple[str, int, int]':
+        """ Pack genomes into the block, with a zeroed fitness array. Returns (name, size, version) for readers. """
+        packed = self.packer.pack(genomes)
+        meta, arrays = packed.to_sections()
+        arrays["node_offsets"] = packed.node_offsets()
+        arrays["conn_offsets"] = packed.conn_offsets()
+        arrays["fitness"] = np.zeros(len(packed), dtype=np.float64)
+        buf = dumps(meta, arrays)
+
+        if self.shm is None or self.shm.size < len(buf):
+            old_size = 0 if self.shm is None else self.shm.size
+            self.close()
+            self.shm = shared_memory.SharedMemory(create=True, size=max(len(buf), 2 * old_size))
+        self.shm.buf[:len(buf)] = buf
+        self.size = len(buf)
+        self.version += 1
+        return self.shm.name, self.size, self.version
+
+    def read_fitness(self) -> np.ndarray:
+        """ Return a copy of the fitness array. """
+        _, arrays = loads(self.shm.buf[:self.size])
+        fitness = arrays["fitness"].copy()
+        del arrays
+        return fitness
+
+    def close(self):
+        """ Release and unlink the block. """
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block without tracking it, so that exiting readers never unlink it.
+    Before Python 3.13 attaching always registers the block with the resource tracker, which is harmless
+    as long as readers share the creating process's tracker (see SharedMemoryEvaluator).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedGenomeReader:
+    """ A worker's read-only view of a SharedGenomeBuffer, attached once per block. """
+
+    def __init__(self, packer: GenomePacker):
+        self.packer = packer
+        self.shm = None
+        self.version = None
+        self.meta = None
+        self.arrays = None
+
+    def attach(self, name: str, size: int, version: int):
+        """ Attach to the block with the given name, if not already, and read the current batch's header. """
+        if version == self.version and self.shm is not None and self.shm.name == name:
+            return
+        self.meta = self.arrays = None  # Views must be released before the block is closed
+        if self.shm is None or self.shm.name != name:
+            if self.shm is not None:
+                self.shm.close()
+            self.shm = _attach(name)
+        self.meta, self.arrays = loads(self.shm.buf[:size])
+        self.version = version
+
+    def get_genome(self, i: int) -> Genome:
+        a = self.arrays
+        n0, n1 = a["node_offsets"][i:i + 2].tolist()
+        c0, c1 = a["conn_offsets"][i:i + 2].tolist()
+        return self.packer.unpack_genome(int(a["ids"][i]), a["nodes"][n0:n1], a["conns"][c0:c1], self.meta["strings"])
+
+    def set_fitness(self, start: int, values):
+        self.arrays["fitness"][start:start + len(values)] = values
+
+    def close(self):
+        self.meta = self.arrays = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+
+def _run_worker(genome_bp: GenomeBP, fitness_func, tasks, done):
+    reader = SharedGenomeReader(GenomePacker(genome_bp))
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            name, size, version, start, stop = task
+            try:
+                reader.attach(name, size, version)
+                reader.set_fitness(start, [fitness_func(Agent(genome=reader.get_genome(i))) for i in range(start, stop)])
+                done.put((version, start, None))
+            except Exception:
+                done.put((version, start, traceback.format_exc()))
+    finally:
+        reader.close()
+
+
+class SharedMemoryEvaluator(Evaluator):
+    """ Evaluates agents in a pool of local worker processes reading genomes from shared memory. """
+
+    copyable = False
+    in_process = False
+
+    def __init__(self, genome_bp: GenomeBP, num_workers: int = None, chunk_size: int = None, mp_context: str = None):
+        """
+        Start num_workers processes (one per CPU by default) on the first evaluation, and again whenever the
+        fitness function changes. Genomes are handed out in chunks of chunk_size (about four per worker by default).
+        mp_context selects the multiprocessing start method; unless it is "fork", genome_bp and the fitness
+        function must be picklable.
+        """
+        self.genome_bp = genome_bp
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.context = multiprocessing.get_context(mp_context)
+        self.buffer = SharedGenomeBuffer(GenomePacker(genome_bp))
+
+        self.__fitness_func = None
+        self.__workers = []
+        self.__tasks = None
+        self.__done = None
+
+    def __start(self, fitness_func):
+        self.__stop()
+        self.__fitness_func = fitness_func
+        resource_tracker.ensure_running()  # Workers must inherit this process's tracker rather than start their own
+        self.__tasks = self.context.Queue()
+        self.__done = self.context.Queue()
+        self.__workers = [
+            self.context.Process(target=_run_worker, name=f"SharedMemoryWorker-{i}", daemon=True,
+                                 args=(self.genome_bp, fitness_func, self.__tasks, self.__done))
+            for i in range(self.num_workers)]
+        for w in self.__workers:
+            w.start()
+
+    def __stop(self):
+        for _ in self.__workers:
+            self.__tasks.put(None)
+        for w in self.__workers:
+            w.join(timeout=10)
+            if w.is_alive():
+                w.terminate()
+        self.__workers = []
+
+    def evaluate(self, agents: 'list[Agent]', fitness_func):
+        if fitness_func is not self.__fitness_func or not self.__workers:
+            self.__start(fitness_func)
+
+        name, size, version = self.buffer.write(a.genome for a in agents)
+        chunk_size = self.chunk_size or max(1, math.ceil(len(agents) / (4 * self.num_workers)))
+        starts = range(0, len(agents), chunk_size)
+        for start in starts:
+            self.__tasks.put((name, size, version, start, min(start + chunk_size, len(agents))))
+
+        remaining = set(starts)
+        while remaining:
+            try:
+                v, start, error = self.__done.get(timeout=1.0)
+            except queue.Empty:
+                if not all(w.is_alive() for w in self.__workers):
+                    self.__stop()
+                    raise RuntimeError("A shared memory worker died during evaluation")
+                continue
+            if v != version:
+                continue
+            if error is not None:
+                raise RuntimeError("A shared memory worker failed to evaluate agents:\n" + error)
+            remaining.discard(start)
+
+        for agent, fitness in zip(agents, self.buffer.read_fitness().tolist()):
+            agent.fitness = fitness
+
+    def close(self):
+        """ Stop the workers and free the shared memory block. """
+        self.__stop()
+        self.buffer.close()
+
+    def __enter__(self) -> 'SharedMemoryEvaluator':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
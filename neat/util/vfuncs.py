@@ -0,0 +1,238 @@
+"""
+Vectorized counterparts of the built-in activation and aggregation functions in neat.util.funcs.
+
+Activations take an array and return an array of the same shape and dtype, applying the same clamping as
+their scalar versions. Aggregations are segment reductions over CSR-style segments: they take values of
+shape (..., n) and offsets of shape (m + 1,), and return shape (..., m), where segment j is
+values[..., offsets[j]:offsets[j + 1]]. Leading axes (e.g. a batch axis) are reduced independently.
+
+Both registries use the same names as neat.util.funcs, so batched engines can look functions up by the
+genes' activation/aggregation strings. Results equal the scalar versions up to floating point rounding, except:
+    - an empty segment aggregates to 0.0 (1.0 for product) instead of raising;
+    - overflow gives inf instead of raising OverflowError (e.g. square or cube of huge values).
+"""
+
+from typing import *
+import numpy as np
+
+from neat.util import funcs
+
+
+# ACTIVATIONS
+
+def sigmoid_activation(x: np.ndarray) -> np.ndarray:
+    x = np.clip(5 * x, -60, 60)
+    with np.errstate(over="ignore"):  # exp overflows to inf in small dtypes, giving the correct limit of 0
+        return 1.0 / (1.0 + np.exp(-x))
+
+
+def tanh_activation(x: np.ndarray) -> np.ndarray:
+    x = np.clip(2.5 * x, -60, 60)
+    return np.tanh(x)
+
+
+def sin_activation(x: np.ndarray) -> np.ndarray:
+    x = np.clip(5 * x, -60, 60)
+    return np.sin(x)
+
+
+def gauss_activation(x: np.ndarray) -> np.ndarray:
+    x = np.clip(x, -3.4, 3.4)
+    return np.exp(-5.0 * x ** 2)
+
+
+def relu_activation(x: np.ndarray) -> np.ndarray:
+    return np.where(x > 0.0, x, 0.0).astype(x.dtype, copy=False)
+
+
+def softplus_activation(x: np.ndarray) -> np.ndarray:
+    x = np.clip(5 * x, -60, 60)
+    return 0.2 * np.log(1 + np.exp(x))
+
+
+def identity_activation(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+def clamped_activation(x: np.ndarray) -> np.ndarray:
+    return np.clip(x, -1.0, 1.0)
+
+
+def inv_activation(x: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        return np.divide(1.0, x, out=np.zeros_like(x), where=x != 0.0)
+
+
+def log_activation(x: np.ndarray) -> np.ndarray:
+    x = np.maximum(x, 1e-7)
+    return np.log(x)
+
+
+def exp_activation(x: np.ndarray) -> np.ndarray:
+    x = np.clip(x, -60, 60)
+    return np.exp(x)
+
+
+def abs_activation(x: np.ndarray) -> np.ndarray:
+    return np.abs(x)
+
+
+def hat_activation(x: np.ndarray) -> np.ndarray:
+    return np.maximum(1 - np.abs(x), 0.0)
+
+
+def square_activation(x: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        return x ** 2
+
+
+def cube_activation(x: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        return x ** 3
+
+
+# AGGREGATIONS
+
+def _reduceat(ufunc, values: np.ndarray, offsets: np.ndarray, empty: float) -> np.ndarray:
+    """ Reduce values[..., offsets[j]:offsets[j + 1]] with a binary ufunc, giving empty segments the given value. """
+    starts, ends = offsets[:-1], offsets[1:]
+    n = values.shape[-1]
+    if n == 0:
+        return np.full(values.shape[:-1] + (len(starts),), empty, dtype=values.dtype)
+    # ufunc.reduceat returns values[start] for empty segments and rejects start == n, so patch those up after
+    out = ufunc.reduceat(values, np.minimum(starts, n - 1), axis=-1)
+    is_empty = ends == starts
+    if is_empty.any():
+        out[..., is_empty] = empty
+    return out
+
+
+def _segment_ids(offsets: np.ndarray) -> np.ndarray:
+    """ The segment index of every value position. """
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def product_aggregation(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    return _reduceat(np.multiply, values, offsets, 1.0)
+
+
+def sum_aggregation(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    return _reduceat(np.add, values, offsets, 0.0)
+
+
+def max_aggregation(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    return _reduceat(np.maximum, values, offsets, 0.0)
+
+
+def min_aggregation(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    return _reduceat(np.minimum, values, offsets, 0.0)
+
+
+def maxabs_aggregation(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    # Like max(values, key=abs), pick the first value of largest magnitude in each segment
+    n = values.shape[-1]
+    magnitude = np.abs(values)
+    largest = _reduceat(np.maximum, magnitude, offsets, 0.0)
+    if n == 0:
+        return largest
+    candidates = np.where(magnitude == largest[..., _segment_ids(offsets)], np.arange(n), n - 1)
+    first = _reduceat(np.minimum, candidates, offsets, 0)
+    out = np.take_along_axis(values, first, axis=-1)
+    out[..., offsets[1:] == offsets[:-1]] = 0.0
+    return out
+
+
+def _by_length(reduce, values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """ Apply an axis reduction to segments by gathering equal-length segments into one dense block each. """
+    lengths = np.diff(offsets)
+    out = np.zeros(values.shape[:-1] + (len(lengths),), dtype=values.dtype)
+    for length in np.unique(lengths):
+        if length == 0:
+            continue
+        segments = np.flatnonzero(lengths == length)
+        index = offsets[segments][:, None] + np.arange(length)
+        out[..., segments] = reduce(values[..., index], axis=-1)
+    return out
+
+
+def median_aggregation(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    return _by_length(np.median, values, offsets)
+
+
+def mean_aggregation(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    return _by_length(np.mean, values, offsets)
+
+
+# Activations take an array and return an array of the same shape.
+activation_defs = {
+    "sigmoid": sigmoid_activation,
+    "tanh": tanh_activation,
+    "sin": sin_activation,
+    "gauss": gauss_activation,
+    "relu": relu_activation,
+    "softplus": softplus_activation,
+    "identity": identity_activation,
+    "clamped": clamped_activation,
+    "inv": inv_activation,
+    "log": log_activation,
+    "exp": exp_activation,
+    "abs": abs_activation,
+    "hat": hat_activation,
+    "square": square_activation,
+    "cube": cube_activation,
+}
+
+
+# Aggregations take values and CSR segment offsets and return one value per segment.
+aggregation_defs = {
+    "product": product_aggregation,
+    "sum": sum_aggregation,
+    "max": max_aggregation,
+    "min": min_aggregation,
+    "maxabs": maxabs_aggregation,
+    "median": median_aggregation,
+    "mean": mean_aggregation
+}
+
+assert activation_defs.keys() == funcs.activation_defs.keys(), "Vectorized activations out of sync with funcs"
+assert aggregation_defs.keys() == funcs.aggregation_defs.keys(), "Vectorized aggregations out of sync with funcs"
+
+
+# LOOKUP
+
+def vectorize_activation(func: Callable[[float], float]) -> Callable[[np.ndarray], np.ndarray]:
+    """ Wrap a scalar activation (e.g. a user-defined one) to apply elementwise, at Python speed. """
+    ufunc = np.frompyfunc(func, 1, 1)
+
+    def vectorized_activation(x: np.ndarray) -> np.ndarray:
+        return ufunc(x).astype(x.dtype, copy=False)
+    return vectorized_activation
+
+
+def vectorize_aggregation(func: Callable[[list], float]) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """ Wrap a scalar aggregation (e.g. a user-defined one) to reduce segments one by one, at Python speed. """
+    def vectorized_aggregation(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        out = np.zeros(values.shape[:-1] + (len(offsets) - 1,), dtype=values.dtype)
+        for index in np.ndindex(*values.shape[:-1]):
+            row = values[index]
+            for j in range(len(offsets) - 1):
+                if offsets[j + 1] > offsets[j]:
+                    out[index + (j,)] = func(row[offsets[j]:offsets[j + 1]].tolist())
+        return out
+    return vectorized_aggregation
+
+
+def get_activation(name: str) -> Callable[[np.ndarray], np.ndarray]:
+    """ The vectorized activation with the given name, falling back to wrapping a scalar one in funcs. """
+    func = activation_defs.get(name)
+    if func is None:
+        func = activation_defs[name] = vectorize_activation(funcs.activation_defs[name])
+    return func
+
+
+def get_aggregation(name: str) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """ The vectorized aggregation with the given name, falling back to wrapping a scalar one in funcs. """
+    func = aggregation_defs.get(name)
+    if func is None:
+        func = aggregation_defs[name] = vectorize_aggregation(funcs.aggregation_defs[name])
+    return func
@@ -0,0 +1,89 @@
+"""
+Loopback tests of distributed evaluation: a DistributedEvaluator and its Workers run in this process, in threads,
+talking over 127.0.0.1. Runs under pytest.
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from benchmarks.blueprints import make_blueprint, xor_fitness_func
+from neat.model import Agent
+from neat.util.distributed import DistributedEvaluator, Worker, _frame
+
+
+def start_worker(evaluator: DistributedEvaluator, genome_bp, fitness_func) -> threading.Thread:
+    def run():
+        try:
+            Worker(evaluator.address, genome_bp, fitness_func, connect_timeout=5.0).run()
+        except OSError:
+            pass  # The coordinator closed while the worker was busy
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def setup():
+    bp = make_blueprint(pop_size=30)
+    g = bp.population.genome
+    agents = list(bp.population.create().agents.values())
+    xor = xor_fitness_func(g)
+    expected = [xor(a) for a in agents]
+    return g, agents, xor, expected
+
+
+def test_results(setup):
+    g, agents, xor, expected = setup
+    with DistributedEvaluator(g, batch_size=4, wait_timeout=10.0) as evaluator:
+        for _ in range(2):
+            start_worker(evaluator, g, xor)
+        # A worker with a different gene layout is turned away, without disturbing the others
+        rogue = socket.create_connection(evaluator.address)
+        rogue.sendall(_frame({"type": "hello", "node_dtype": "bogus", "conn_dtype": "bogus"}))
+        for _ in range(2):
+            evaluator.evaluate(agents)
+            assert [a.fitness for a in agents] == expected
+        rogue.close()
+
+
+def test_stragglers_are_requeued(setup):
+    g, agents, xor, expected = setup
+    stalled = threading.Event()
+
+    def fitness_func(agent: Agent):
+        # The first batch's worker stalls well past the task timeout, so the batch must go to the other worker
+        if agent.genome.id == agents[0].genome.id and not stalled.is_set():
+            stalled.set()
+            time.sleep(3.0)
+        return xor(agent)
+
+    with DistributedEvaluator(g, batch_size=10, task_timeout=0.5, wait_timeout=10.0) as evaluator:
+        for _ in range(2):
+            start_worker(evaluator, g, fitness_func)
+        start = time.monotonic()
+        evaluator.evaluate(agents)
+        assert time.monotonic() - start < 2.5
+        assert stalled.is_set()
+        assert [a.fitness for a in agents] == expected
+
+
+def test_errors_are_raised_and_workers_kept(setup):
+    g, agents, xor, expected = setup
+    failed = threading.Event()
+
+    def fitness_func(agent: Agent):
+        if not failed.is_set():
+            failed.set()
+            raise ValueError("bad genome")
+        return xor(agent)
+
+    with DistributedEvaluator(g, batch_size=10, wait_timeout=5.0) as evaluator:
+        start_worker(evaluator, g, fitness_func)
+        with pytest.raises(RuntimeError, match="(?s)failed to evaluate a batch.*bad genome"):
+            evaluator.evaluate(agents)
+        # The only worker must still be given work
+        evaluator.evaluate(agents)
+        assert [a.fitness for a in agents] == expected
@@ -0,0 +1,61 @@
+"""
+Checks that experiment trials run on isolated copies of the blueprint, keeping the evaluator set on it.
+Runs under pytest.
+"""
+
+import random
+
+from benchmarks.blueprints import make_blueprint, xor_fitness_func, XOR_INPUTS
+from neat.nn import FeedForwardNetwork
+from neat.util.distributed import DistributedEvaluator
+from neat.util.evaluation import SERIAL_EVALUATOR
+from neat.util.experiments import ExperimentRunner, _isolated_copy
+from neat.util.novelty import BehaviorArchive, NoveltyEvaluator
+from neat.util.racing import RacingEvaluator
+from neat.util.reporting import NULL_REPORTER, StdOutReporter
+
+
+def run_trials(bp, fitness_func, num_workers: int):
+    report = ExperimentRunner(bp, fitness_func, num_trials=2, max_generations=3, num_workers=num_workers,
+                              mp_context="fork").run()
+    for r in report.results:
+        assert r.error is None, r.error
+        assert r.generations == 3
+    return report
+
+
+def test_trials_keep_racing_evaluator():
+    bp = make_blueprint()
+    xor = xor_fitness_func(bp.population.genome)
+    bp.set_evaluator(RacingEvaluator(min_episodes=2, max_episodes=4, num_survivors=3))
+    bp.add_reporter(StdOutReporter())
+
+    copied = _isolated_copy(bp, (0, 1, 0))
+    assert type(copied.evaluator) is RacingEvaluator and copied.evaluator is not bp.evaluator
+    assert copied.reporter is NULL_REPORTER
+
+    run_trials(bp, lambda agent: xor(agent) + random.gauss(0.0, 0.1), num_workers=1)
+    assert bp.evaluator.total_episodes == 0, "trials must race on their own copy of the evaluator"
+    run_trials(bp, lambda agent: xor(agent) + random.gauss(0.0, 0.1), num_workers=2)
+
+
+def test_trials_keep_novelty_evaluator():
+    bp = make_blueprint()
+    g = bp.population.genome
+    xor = xor_fitness_func(g)
+    bp.set_evaluator(NoveltyEvaluator(BehaviorArchive(dim=len(XOR_INPUTS)), k=5))
+
+    def fitness_func(agent):
+        brain = FeedForwardNetwork.create(agent.genome, g.input_ids, g.output_ids)
+        return xor(agent), [brain.activate(x)[0] for x in XOR_INPUTS]
+
+    run_trials(bp, fitness_func, num_workers=1)
+    run_trials(bp, fitness_func, num_workers=2)
+
+
+def test_trials_fall_back_to_serial_evaluation():
+    bp = make_blueprint()
+    with DistributedEvaluator(bp.population.genome) as evaluator:
+        bp.set_evaluator(evaluator)
+        assert _isolated_copy(bp, (0, 1, 0)).evaluator is SERIAL_EVALUATOR
+        run_trials(bp, xor_fitness_func(bp.population.genome), num_workers=1)
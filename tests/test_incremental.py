@@ -0,0 +1,73 @@
+"""
+Equivalence check for incremental phenotypes (neat.nn.incremental): over evolution runs with every combination
+of feed-forward mutation, genome hygiene and copy-on-write genes, every phenotype the cache derives must give
+the same outputs as FeedForwardNetwork built from scratch. Runs under pytest or as a script.
+"""
+
+import itertools
+import random
+
+import numpy as np
+
+from benchmarks.blueprints import make_blueprint, grow_genome
+from neat.nn import FeedForwardNetwork
+from neat.nn.incremental import PhenotypeCache, PhenotypePlan
+
+
+def run_evolution(seed: int, feed_forward: bool, prune: bool, copy_on_write: bool, generations: int = 15,
+                  pop_size: int = 50) -> 'Tuple[int, int]':
+    """ Evolve while checking every phenotype. Returns the numbers of plans built and derived. """
+    random.seed(seed)
+    bp = make_blueprint(pop_size=pop_size)
+    g = bp.population.genome
+    g.record_diffs = True
+    g.feed_forward = feed_forward
+    g.copy_on_write = copy_on_write
+    g.prune_unexpressed_after = 5 if prune else None
+    g.conn_add_prob, g.node_add_prob = 0.5, 0.3
+    g.conn.weight.mutate_rate = g.node.bias.mutate_rate = 0.2
+    g.node.activation.options = ["sigmoid", "tanh", "relu", "identity"]
+    g.node.activation.mutate_rate = 0.1
+    g.node.aggregation.options = ["sum", "product", "max"]
+    g.node.aggregation.mutate_rate = 0.1
+
+    cache = PhenotypeCache(g.input_ids, g.output_ids, max_size=2 * pop_size)
+    X = np.random.default_rng(seed).uniform(-1, 1, (8, len(g.input_ids)))
+
+    def fitness_func(agent):
+        got = cache.get(agent.genome).activate_batch(X)
+        ref = FeedForwardNetwork.create(agent.genome, g.input_ids, g.output_ids)
+        expected = np.array([ref.activate(x) for x in X.tolist()])
+        assert np.allclose(got, expected, rtol=1e-9, atol=1e-12), f"genome {agent.genome.id} differs"
+        return -float(np.sum((got[:, 0] - 0.5) ** 2))
+
+    population = bp.population.create()
+    for _ in range(generations):
+        bp.evaluate(population, fitness_func)
+        bp.next_generation(population)
+    return cache.num_built, cache.num_derived
+
+
+def test_derived_phenotypes_match_feed_forward():
+    for feed_forward, prune, copy_on_write in itertools.product((False, True), repeat=3):
+        for seed in range(2):
+            built, derived = run_evolution(seed, feed_forward, prune, copy_on_write)
+            assert derived > built, "offspring phenotypes should mostly be derived"
+
+
+def test_slots_stay_bounded_along_a_lineage():
+    # Structural mutations only, so that plans are derived rather than built, and nodes come and go
+    random.seed(0)
+    g = make_blueprint().population.genome
+    g.record_diffs = True
+    g.conn.weight.mutate_rate = g.node.bias.mutate_rate = 0.0
+    g.node_add_prob = g.node_delete_prob = 0.5
+    g.conn_add_prob = g.conn_delete_prob = 0.3
+    genome = grow_genome(g, g.create(), 30)
+    plan = PhenotypePlan.build(genome, g.input_ids, g.output_ids)
+    for _ in range(2000):
+        child = g.crossover(genome, genome)
+        g.mutate(child)
+        plan, genome = plan.derive(child, child.diff), child
+        # Slots are only held by inputs and evaluated nodes, plus at most half as many dead ones
+        assert len(plan.slots) <= 1.5 * (len(g.input_ids) + len(genome.nodes))
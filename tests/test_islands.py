@@ -0,0 +1,59 @@
+"""
+Checks that island-model runs finish, and fail promptly rather than hang when an island fails. Runs under pytest.
+"""
+
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from benchmarks.blueprints import make_blueprint, xor_fitness_func
+from neat.util.islands import IslandModel
+
+
+def make_model(num_islands: int = 2) -> IslandModel:
+    return IslandModel(make_blueprint(pop_size=30), num_islands=num_islands, migration_interval=2, seed=0,
+                       mp_context="fork")
+
+
+def failing_on(island: str, generation: int, fail):
+    """ An XOR fitness function that calls fail() in the given island once it reaches the given generation. """
+    bp = make_blueprint(pop_size=30)
+    xor = xor_fitness_func(bp.population.genome)
+    calls = [0]
+
+    def fitness_func(agent):
+        calls[0] += 1
+        if multiprocessing.current_process().name == island and calls[0] > generation * 30:
+            fail()
+        return xor(agent)
+
+    return fitness_func
+
+
+def test_islands_run_and_migrate():
+    model = make_model()
+    results = model.run(xor_fitness_func(make_blueprint().population.genome), max_generations=6)
+    assert [r.generations for r in results] == [6, 6]
+    assert all(r.best_genome is not None for r in results)
+
+
+def test_no_generations():
+    results = make_model().run(xor_fitness_func(make_blueprint().population.genome), max_generations=0)
+    assert [(r.generations, r.best_genome) for r in results] == [(0, None), (0, None)]
+
+
+def test_island_error_is_raised():
+    def fail():
+        raise ValueError("bad fitness")
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="(?s)Island 1 failed.*bad fitness"):
+        make_model().run(failing_on("Island-1", 3, fail), max_generations=20)
+    assert time.monotonic() - start < 10, "the other islands should have been woken up"
+
+
+def test_island_death_is_raised():
+    with pytest.raises(RuntimeError, match="Island 0 exited unexpectedly"):
+        make_model().run(failing_on("Island-0", 3, lambda: os._exit(3)), max_generations=20)
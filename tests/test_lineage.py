@@ -0,0 +1,29 @@
+"""
+Checks that lineage pruning keeps the ancestry of living genomes whatever their id order, and that lineages
+sharing a spill directory don't overwrite each other's chunks. Runs under pytest.
+"""
+
+from neat.model import Lineage
+
+
+def test_prune_keeps_parents_with_larger_ids():
+    lineage = Lineage()
+    # Genome 5 was born from an immigrant, 1000, whose own parents were born here later, as on an island
+    lineage.record(5, 1000, 3, generation=1)
+    lineage.record(6, 5, 5, generation=2)
+    lineage.record(7, 6, 6, generation=3)
+    lineage.record(1000, 2, 2, generation=4)
+    lineage.prune([7])
+    assert list(lineage.columns[0]) == [5, 6, 7, 1000]
+    assert lineage.get_ancestors(7) == [6, 5, 1000, 3, 2]
+
+
+def test_shared_spill_dir_keeps_chunks_apart(tmp_path):
+    lineages = [Lineage(spill_dir=str(tmp_path)), Lineage(spill_dir=str(tmp_path))]
+    for offset, lineage in enumerate(lineages):
+        for child in range(1, 11):
+            lineage.record(child, 100 * offset, 100 * offset, generation=child)
+        lineage.spill(10)
+    assert lineages[0].chunks[0].path != lineages[1].chunks[0].path
+    for offset, lineage in enumerate(lineages):
+        assert lineage.get_parents(10) == (100 * offset, 100 * offset)
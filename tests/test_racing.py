@@ -0,0 +1,48 @@
+"""
+Checks that racing evaluation gives the agents in contention in every species the full episode budget. Runs under pytest.
+"""
+
+import collections
+import random
+
+import pytest
+
+from neat.model import Agent, Genome
+from neat.util.racing import RacingEvaluator
+
+
+def make_agents(sizes):
+    agents = []
+    for sid, size in enumerate(sizes):
+        for _ in range(size):
+            agent = Agent(genome=Genome(id=len(agents), nodes={}, conns={}))
+            agent.species_id = sid
+            agents.append(agent)
+    return agents
+
+
+@pytest.mark.parametrize("mode", ["confidence", "halving"])
+def test_species_top_agents_get_full_budget(mode):
+    random.seed(0)
+    # One strong species, whose members would take every survivor slot of a population-wide race
+    agents = make_agents([20, 12, 6])
+    quality = {a.genome.id: 10.0 * (a.species_id == 0) + random.gauss(0, 1) for a in agents}
+    episodes = collections.Counter()
+
+    def fitness_func(agent):
+        episodes[agent.genome.id] += 1
+        return quality[agent.genome.id] + random.gauss(0, 1)
+
+    evaluator = RacingEvaluator(max_episodes=16, num_survivors=2, survival_threshold=0.2, mode=mode)
+    evaluator.evaluate(agents, fitness_func)
+    assert evaluator.last_episodes == sum(episodes.values()) < evaluator.full_budget_episodes(len(agents))
+    for sid, size in enumerate([20, 12, 6]):
+        full = [a for a in agents if a.species_id == sid and episodes[a.genome.id] == 16]
+        assert len(full) >= evaluator.get_num_survivors(size)
+
+
+def test_invalid_survivors():
+    with pytest.raises(AssertionError):
+        RacingEvaluator(num_survivors=0)
+    with pytest.raises(AssertionError):
+        RacingEvaluator(survival_threshold=1.5)
@@ -5,6 +5,7 @@ from neat.model import Agent, Population
 from neat.blueprints import *
 from neat.nn import FeedForwardNetwork
 from neat.util.vis import *
+from neat.util.experiments import ExperimentRunner
 
 
 xor_bp = GenerationalBP(
@@ -140,8 +141,8 @@ def run_trial(population: Population, fitness_threshold=3.9, max_generations=Non
             # print()
 
         if plot_genomes and population.ticks % 10 == 0:
-            # print([len(s.members) for s in population.species.values()])
-            best_agents = [max(s.members, key=lambda a: a.fitness) for s in population.species.values()]
+            # print([s.size() for s in population.species.values()])
+            best_agents = [s.get_best() for s in population.species.values()]
             best_agents = sorted(best_agents, key=lambda a: a.fitness, reverse=True)
             plt_genomes({a.species_id: a.genome for a in best_agents}, xor_bp.population.genome.input_ids, xor_bp.population.genome.output_ids)
 
@@ -169,8 +170,14 @@ if __name__ == '__main__':
     verbose = True  # default False
     plot_genomes = True  # default False
 
-    for t in range(num_trials):
-        print(f"Trial #{t+1}")
+    if num_trials > 1:
+        # Independent trials in parallel processes, each with its own blueprint copy and seed
+        runner = ExperimentRunner(xor_bp, eval_fitness, num_trials, max_generations=20000, fitness_threshold=fitness_threshold)
+        report = runner.run(on_result=lambda r: print(f"Trial #{r.trial+1}:", "success" if r.success else "failure",
+                                                      f"after {r.generations} generation(s) in {r.wall_time:.2f}s"))
+        print(report)
+    else:
+        print("Trial #1")
         start_time = time.time()
 
         # Create population and run